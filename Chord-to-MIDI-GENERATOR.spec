@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('loading.png', '.'), ('pro_theme.json', '.'), ('repository/metadata/root.json', '.')],
-    hiddenimports=[],
+    hiddenimports=['mido.backends.rtmidi', 'rtmidi'],  # mido가 백엔드를 동적으로 불러오므로 직접 넣어 줍니다
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
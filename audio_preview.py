@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Offline audio preview: renders a chart to a WAV file with a small NumPy wavetable synth.
+
+Meant for machines with no MIDI output or soft synth. Chord blocks are read
+from a CompiledScore, so voicings, slot lengths ('duration_ticks_for_n') and
+tempo changes are exactly those of the MIDI export. Every chord block is
+synthesized in one vectorized table lookup over all of its notes at once.
+The output is cut into fixed-size chunks, and each chunk is mixed on its own
+from the blocks that overlap it. Chunks therefore render in parallel on a
+thread pool (NumPy releases the GIL inside its kernels), the file is still
+written in order, and memory stays bounded by the chunks in flight.
+
+Needs NumPy (listed in requirements.txt), which the MIDI export does not.
+"""
+
+import bisect
+import os
+import wave
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from chord_engine import CompiledScore, ScoreCompiler
+
+SAMPLE_RATE = 44100
+CHUNK_FRAMES = 1 << 15
+TABLE_SIZE = 2048
+ATTACK_SECONDS = 0.005
+RELEASE_SECONDS = 0.08
+NOTE_GAIN = 0.12  # 7음 코드를 최대 세기로 쳐도 잘리지 않을 정도
+HARMONICS = ((1, 1.0), (2, 0.35), (3, 0.15), (4, 0.06))  # (배음 번호, 크기): 부드러운 오르간 소리
+
+
+def _build_wavetable() -> np.ndarray:
+    phase = np.arange(TABLE_SIZE) * (2 * np.pi / TABLE_SIZE)
+    table = sum(amp * np.sin(n * phase) for n, amp in HARMONICS)
+    # 마지막 칸 뒤에 첫 칸을 덧붙여 선형 보간이 경계를 넘지 않게 합니다.
+    return np.append(table / np.abs(table).max(), table[0] / np.abs(table).max()).astype(np.float32)
+
+
+WAVETABLE = _build_wavetable()
+
+
+class AudioBlock(NamedTuple):
+    start: int          # 시작 샘플
+    length: int         # 울리는 길이(샘플), 릴리스 꼬리 제외
+    steps: np.ndarray   # 음마다 샘플당 웨이브테이블 진행량 (float64)
+    gain: float
+
+
+def score_blocks(score: CompiledScore, sample_rate: int = SAMPLE_RATE) -> Tuple[List[AudioBlock], int]:
+    """Returns a compiled score's blocks in sample time and its length in samples.
+
+    A block is a run of rows struck together for the same length: a whole
+    block chord, or one hit of a comping pattern (those blocks may overlap).
+    """
+    def samples_at(tick: int) -> int:
+        return round(score.seconds_at(tick) * sample_rate)
+
+    blocks: List[AudioBlock] = []
+    steps_cache = {}
+    starts, durations, pitches, velocities = score.start, score.duration, score.pitch, score.velocity
+    row, n_rows = 0, len(score)
+    while row < n_rows:
+        tick, length, velocity = starts[row], durations[row], velocities[row]
+        end = row + 1
+        while end < n_rows and starts[end] == tick and durations[end] == length and velocities[end] == velocity: end += 1
+        notes = tuple(pitches[row:end])
+        steps = steps_cache.get(notes)
+        if steps is None:
+            freqs = 440.0 * 2.0 ** ((np.array(notes, dtype=np.float64) - 69) / 12)
+            steps = steps_cache[notes] = freqs * (TABLE_SIZE / sample_rate)
+        start = samples_at(tick)
+        blocks.append(AudioBlock(start, samples_at(tick + length) - start, steps, NOTE_GAIN * velocity / 127))
+        row = end
+    return blocks, samples_at(score.length)
+
+
+def _render_chunk(blocks: List[AudioBlock], starts: List[int], first: int, last: int, sample_rate: int, reach: int) -> np.ndarray:
+    """Mixes frames [first, last) from every block that sounds in them (release tails included).
+
+    `reach` is the longest any block sounds, tail included; it bounds how far back a block can still be heard.
+    """
+    out = np.zeros(last - first, dtype=np.float32)
+    attack = max(1, int(ATTACK_SECONDS * sample_rate))
+    release = max(1, int(RELEASE_SECONDS * sample_rate))
+    # 릴리스 꼬리까지 따져도 이 구간에 닿을 수 있는 블록만 훑습니다(블록은 시작 순서로 정렬돼 있음).
+    i = bisect.bisect_right(starts, last - 1)
+    while i > 0:
+        i -= 1
+        block = blocks[i]
+        # 반주 패턴의 블록은 서로 겹치므로, 가장 긴 블록도 닿지 못할 만큼 앞이면 멈춥니다.
+        if block.start + reach <= first: break
+        end = block.start + block.length + release
+        if end <= first: continue
+        lo, hi = max(first, block.start), min(last, end)
+        t = np.arange(lo - block.start, hi - block.start, dtype=np.float64)
+        # 모든 음을 한 번에: (음 수, 샘플 수) 위상 배열에서 웨이브테이블을 선형 보간으로 읽습니다.
+        phase = np.outer(block.steps, t)
+        phase %= TABLE_SIZE
+        index = phase.astype(np.intp)
+        frac = (phase - index).astype(np.float32)
+        wave_ = WAVETABLE[index]
+        wave_ += frac * (WAVETABLE[index + 1] - wave_)
+        mixed = wave_.sum(axis=0)
+        envelope = np.minimum(1.0, (t + 1) / attack)
+        tail = t - block.length
+        envelope = np.where(tail >= 0, np.maximum(0.0, 1.0 - tail / release), envelope)
+        out[lo - first:hi - first] += mixed * (envelope * block.gain).astype(np.float32)
+    return out
+
+
+def render_chunks(blocks: List[AudioBlock], total_frames: int, sample_rate: int = SAMPLE_RATE, chunk_frames: int = CHUNK_FRAMES,
+                  executor: Optional[Executor] = None, window: int = 8) -> Iterator[np.ndarray]:
+    """Yields the mix as float32 chunks of `chunk_frames` frames (the last may be shorter), in order.
+
+    With an `executor`, at most `window` chunks are submitted ahead of the one being yielded.
+    """
+    release = max(1, int(RELEASE_SECONDS * sample_rate))
+    if blocks: total_frames = max(total_frames, max(b.start + b.length for b in blocks) + release)
+    starts = [b.start for b in blocks]
+    reach = max((b.length for b in blocks), default=0) + release
+    bounds = [(first, min(first + chunk_frames, total_frames)) for first in range(0, total_frames, chunk_frames)]
+    if executor is None:
+        for first, last in bounds: yield _render_chunk(blocks, starts, first, last, sample_rate, reach)
+        return
+    # 한꺼번에 제출하지 않고 window 개만 미리 돌려 메모리를 묶어 둡니다.
+    pending = []
+    for first, last in bounds:
+        pending.append(executor.submit(_render_chunk, blocks, starts, first, last, sample_rate, reach))
+        if len(pending) >= max(1, window): yield pending.pop(0).result()
+    for future in pending: yield future.result()
+
+
+def write_score_wav(f: Union[str, BinaryIO], score: CompiledScore, sample_rate: int = SAMPLE_RATE, chunk_frames: int = CHUNK_FRAMES,
+                    workers: Optional[int] = None) -> int:
+    """Renders a compiled score to a 16-bit mono WAV; returns the number of frames written.
+
+    `workers` threads render chunks in parallel (default: one per core, 1 renders inline).
+    """
+    blocks, total = score_blocks(score, sample_rate)
+    workers = workers or os.cpu_count() or 1
+    frames = 0
+    with wave.open(f, 'wb') as out:
+        out.setnchannels(1); out.setsampwidth(2); out.setframerate(sample_rate)
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            # 작업자마다 두 청크씩 미리 돌립니다.
+            for chunk in render_chunks(blocks, total, sample_rate, chunk_frames, executor, window=2 * workers):
+                np.clip(chunk, -1.0, 1.0, out=chunk)
+                out.writeframes((chunk * 32767).astype('<i2').tobytes())
+                frames += len(chunk)
+        finally:
+            if executor is not None: executor.shutdown(cancel_futures=True)
+    return frames
+
+
+def write_wav(f: Union[str, BinaryIO], measures: Iterable[tuple], omit5_on_conflict: bool = True, omit_duplicated_bass: bool = False,
+              bpm: float = 120, sample_rate: int = SAMPLE_RATE, ticks_per_beat: int = 480, log: Optional[Callable[[str], None]] = None,
+              chunk_frames: int = CHUNK_FRAMES, workers: Optional[int] = None, pattern: Optional[str] = None) -> int:
+    """Compiles (measure text, key[, Timing]) items (with an optional comping `pattern`) and renders them with write_score_wav."""
+    score = ScoreCompiler().compile(measures, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, bpm, log=log, pattern=pattern)
+    return write_score_wav(f, score, sample_rate, chunk_frames, workers)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Throughput and allocation benchmarks for the chord engine.
+
+Generates a reproducible chord-symbol corpus over every key, quality,
+tension, slash bass and roman degree, times the engine's hot functions and
+writes the numbers to JSON so a release can be compared with the previous one:
+
+    python benchmarks/bench_engine.py                      # writes benchmarks/results/bench-<version>.json
+    python benchmarks/bench_engine.py --baseline benchmarks/results/bench-1.2.6.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from chord_engine import ChordEngine as App, LRUCache, ScoreCompiler  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+
+def read_app_version() -> str:
+    # main.py는 Tk를 불러오므로 import 하지 않고 버전 문자열만 읽습니다.
+    with open(os.path.join(ROOT_DIR, 'main.py'), encoding='utf-8') as f:
+        m = re.search(r'^CURRENT_VERSION = "([^"]+)"', f.read(), re.MULTILINE)
+    return m.group(1) if m else 'unknown'
+
+
+def generate_corpus(size: int, seed: int = 1) -> List[Tuple[str, str]]:
+    """Returns `size` (symbol, key) pairs shaped like what the chord builder and users type."""
+    rng = random.Random(seed)
+    romans = App.ROMAN_DEGREES_BUILDER
+    letters = App.NOTE_NAMES_SHARP + App.NOTE_NAMES_FLAT
+    corpus = []
+    for _ in range(size):
+        key = rng.choice(App.KEYS)
+        use_roman = rng.random() < 0.35
+        root = rng.choice(romans) if use_roman else rng.choice(letters)
+        qual = rng.choice(App.QUALITY_SYMBOLS)
+        qual_txt = {'Major': '', 'Minor': 'm'}.get(qual, qual)
+        if use_roman and qual == 'Minor' and rng.random() < 0.5: root, qual_txt = root.lower(), ''
+
+        tensions = rng.sample(App.TENSIONS_LIST, rng.choice((0, 0, 0, 1, 1, 2)))
+        paren = [t for t in tensions if t[0] in 'b#']
+        plain = sorted((t for t in tensions if t[0] not in 'b#'), key=int)
+        tens_txt = ''.join(plain)
+        if tensions and not tens_txt and not any(c in qual_txt for c in '7Mmdas'): tens_txt = '7'
+        paren_txt = f"({','.join(paren)})" if paren else ''
+
+        bass_txt = ''
+        if rng.random() < 0.2:
+            bass_txt = '/' + (rng.choice(romans) if use_roman and rng.random() < 0.5 else rng.choice(letters))
+        corpus.append((f"{root}{qual_txt}{tens_txt}{paren_txt}{bass_txt}", key))
+    return corpus
+
+
+def generate_export_charts(corpus: List[Tuple[str, str]], seed: int = 1) -> List[List[tuple]]:
+    """Splits the corpus into 32-measure charts of (measure text, key, Timing) items that exercise every export feature.
+
+    Each chart has several parts with their own key, meter and tempo, '%' repeats (including a leading one, which is a rest) and empty measures.
+    """
+    rng = random.Random(seed)
+    meters = [(4, 4), (3, 4), (6, 8), (7, 8), (5, 4), (2, 2)]
+    charts, chart, pos = [], [], 0
+    part_key, timing = 'C', App.Timing()
+    while pos < len(corpus):
+        if len(chart) % 8 == 0:
+            # 8마디마다 새 파트: 조, 박자, 템포가 바뀝니다(템포는 가끔 그대로 둡니다).
+            part_key = rng.choice(App.KEYS)
+            timing = App.Timing(rng.choice(meters), rng.choice((None, 72, 96.5, 140)))
+        roll = rng.random()
+        if roll < 0.08: text = ''
+        elif roll < 0.16: text = '%'
+        else:
+            n = rng.randint(1, 4)
+            symbols = [sym for sym, _ in corpus[pos:pos + n]]
+            pos += n
+            if rng.random() < 0.2: symbols.insert(rng.randrange(len(symbols) + 1), '%')
+            text = ' '.join(symbols)
+        chart.append((text, part_key, timing))
+        if len(chart) == 32: charts.append(chart); chart = []
+    if chart: charts.append(chart)
+    return charts
+
+
+def compare_export_backends(charts: List[List[tuple]]) -> List[str]:
+    """Encodes every chart with the native writer and the mido reference, with and without each comping pattern; returns the mismatches."""
+    mismatches = []
+    for i, chart in enumerate(charts):
+        for pattern in (None,) + tuple(App.COMPING_PATTERNS):
+            for omit5, omit_bass in ((True, False), (False, True)):
+                options = dict(initial_key=chart[0][1], bpm=110, pattern=pattern)
+                native = App.encode_smf(chart, omit5, omit_bass, **options)
+                reference = io.BytesIO()
+                App.render_midi(chart, omit5, omit_bass, **options).save(file=reference)
+                if native != reference.getvalue():
+                    mismatches.append(f"chart {i} (pattern={pattern}, omit5={omit5}, omit_bass={omit_bass}): "
+                                      f"native {len(native)} bytes != mido {len(reference.getvalue())} bytes")
+    return mismatches
+
+
+def clear_engine_caches() -> None:
+    for value in vars(App).values():
+        if isinstance(value, LRUCache): value.clear()
+
+
+def time_calls(fn: Callable[[Any], Any], args: List[Any], repeat: int, setup: Optional[Callable[[], None]] = None) -> float:
+    """Best-of-`repeat` nanoseconds per call over the whole argument list."""
+    best = float('inf')
+    for _ in range(repeat):
+        if setup: setup()
+        start = time.perf_counter_ns()
+        for a in args: fn(a)
+        best = min(best, (time.perf_counter_ns() - start) / len(args))
+    return best
+
+
+def measure_allocations(fn: Callable[[Any], Any], args: List[Any], setup: Optional[Callable[[], None]] = None) -> Tuple[float, float]:
+    """Average transient peak and retained bytes per call, measured with tracemalloc."""
+    if setup: setup()
+    tracemalloc.start()
+    peak_total = retained_total = 0
+    try:
+        for a in args:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn(a)
+            current, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+            retained_total += current - before
+    finally:
+        tracemalloc.stop()
+    return peak_total / len(args), retained_total / len(args)
+
+
+def measure_import_ms(module: str, repeat: int) -> Dict[str, float]:
+    """Best-of-`repeat` cold import time of `module` in a fresh interpreter, minus the bare interpreter start-up."""
+    def best(code: str) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, check=True)
+            times.append((time.perf_counter() - start) * 1000)
+        return min(times)
+    startup = best('pass')
+    total = best(f'import {module}')
+    return {'import_ms': round(total - startup, 2), 'interpreter_startup_ms': round(startup, 2)}
+
+
+def _parse_or_none(item: Tuple[str, str]) -> Optional['App.ParsedChord']:
+    try: return App.parse_chord_symbol(*item)
+    except ValueError: return None
+
+
+def build_cases(corpus: List[Tuple[str, str]]) -> Dict[str, Tuple[Callable[[Any], Any], List[Any], Optional[Callable[[], None]]]]:
+    parsed = [(p, key) for p, key in ((_parse_or_none(item), item[1]) for item in corpus) if p is not None]
+    build_args = [(p, i % 2 == 0, key) for i, (p, key) in enumerate(parsed)]
+    voicing_args = [(p, i % 2 == 0, i % 3 == 0) for i, (p, _) in enumerate(parsed)]
+    duration_args = [(n, 480) for n in range(1, 9)] * max(1, len(corpus) // 8)
+    # 64마디짜리 차트 묶음: 한 마디에 1~4개 코드
+    rng = random.Random(len(corpus))
+    measures, pos = [], 0
+    while pos < len(corpus):
+        n = rng.randint(1, 4)
+        measures.append((' '.join(sym for sym, _ in corpus[pos:pos + n]), corpus[pos][1]))
+        pos += n
+    charts = [measures[i:i + 64] for i in range(0, len(measures), 64)]
+
+    def parse(item): return _parse_or_none(item)
+    def build(args): return App.build_string_from_parsed(*args)
+    def voice(args): return App.build_voicing(*args)
+    def durations(args): return App.duration_ticks_for_n(*args)
+    def export_mido(chart): return App.render_midi(chart, True, False).save(file=io.BytesIO())
+    def export_native(chart): return App.encode_smf(chart, True, False)
+    def export_score(chart): return ScoreCompiler().compile(chart, True, False).write_smf(io.BytesIO())
+    def export_bossa(chart): return App.encode_smf(chart, True, False, pattern='bossa')
+    def import_midi(data): return App.import_midi(io.BytesIO(data))
+
+    warm_parse = lambda: [parse(item) for item in corpus]
+    warm_build = lambda: [build(args) for args in build_args]
+    smf_files = [App.encode_smf(chart, True, False) for chart in charts]
+    # cold: 캐시를 모두 비운 상태에서 실제 파싱/문자열 생성 비용을 잽니다. warm: 같은 차트를 다시 변환할 때의 비용입니다.
+    return {
+        'parse_chord_symbol.cold': (parse, corpus, clear_engine_caches),
+        'parse_chord_symbol.warm': (parse, corpus, warm_parse),
+        'build_string_from_parsed.cold': (build, build_args, clear_engine_caches),
+        'build_string_from_parsed.warm': (build, build_args, warm_build),
+        'build_voicing': (voice, voicing_args, None),
+        'duration_ticks_for_n': (durations, duration_args, None),
+        'midi_export.mido': (export_mido, charts, None),
+        'midi_export.native': (export_native, charts, None),
+        'midi_export.score': (export_score, charts, None),
+        'midi_export.pattern': (export_bossa, charts, None),
+        # 인식 색인은 처음 한 번만 만들어지므로 미리 만들어 두고 마디 인식 비용만 잽니다.
+        'midi_import': (import_midi, smf_files, lambda: App.chord_index(True)),
+    }
+
+
+def run(size: int, seed: int, repeat: int, alloc_sample: int) -> Dict[str, Any]:
+    corpus = generate_corpus(size, seed)
+    results = {}
+    for name, (fn, args, setup) in build_cases(corpus).items():
+        ns = time_calls(fn, args, repeat, setup)
+        peak, retained = measure_allocations(fn, args[:alloc_sample], setup)
+        results[name] = {'calls': len(args), 'ns_per_op': round(ns, 1), 'ops_per_sec': round(1e9 / ns) if ns else None,
+                         'peak_bytes_per_call': round(peak, 1), 'retained_bytes_per_call': round(retained, 1)}
+    return {
+        'version': read_app_version(),
+        'import': {'chord_engine': measure_import_ms('chord_engine', repeat)},
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpus': {'size': size, 'seed': seed, 'repeat': repeat, 'alloc_sample': alloc_sample},
+        'results': results,
+    }
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    lines = [f"Chord engine benchmarks v{report['version']} (Python {report['python']}, corpus {report['corpus']['size']})"]
+    for module, r in report.get('import', {}).items():
+        line = f"cold import {module}: {r['import_ms']:.1f} ms"
+        base = (baseline or {}).get('import', {}).get(module)
+        if base: line += f" (was {base['import_ms']:.1f} ms)"
+        lines.append(line)
+    header = f"{'case':32} {'ops/sec':>12} {'ns/op':>12} {'peak B':>10} {'kept B':>9}"
+    if baseline: header += f" {'vs ' + baseline['version']:>12}"
+    lines.append(header)
+    for name, r in report['results'].items():
+        line = f"{name:32} {r['ops_per_sec']:>12,} {r['ns_per_op']:>12.1f} {r['peak_bytes_per_call']:>10.1f} {r['retained_bytes_per_call']:>9.1f}"
+        base = (baseline or {}).get('results', {}).get(name)
+        if base: line += f" {base['ns_per_op'] / r['ns_per_op']:>11.2f}x"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the chord engine and store the results as JSON.")
+    parser.add_argument('--size', type=int, default=5000, help="number of generated chord symbols")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5, help="timing passes per case (best is kept)")
+    parser.add_argument('--alloc-sample', type=int, default=1000, help="calls traced with tracemalloc per case")
+    parser.add_argument('--output', help="result file (default: benchmarks/results/bench-<version>.json)")
+    parser.add_argument('--baseline', help="previous result file to compare against")
+    args = parser.parse_args(argv)
+
+    # 네이티브 인코더는 mido 경로와 바이트 단위로 같아야 합니다. 다르면 시간을 재지 않고 실패합니다.
+    mismatches = compare_export_backends(generate_export_charts(generate_corpus(args.size, args.seed), args.seed))
+    if mismatches:
+        print(f"Native MIDI export differs from the mido reference in {len(mismatches)} case(s):", file=sys.stderr)
+        for m in mismatches[:20]: print(f"  {m}", file=sys.stderr)
+        return 1
+
+    report = run(args.size, args.seed, args.repeat, args.alloc_sample)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f: baseline = json.load(f)
+    print(format_report(report, baseline))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{report['version']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f: json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
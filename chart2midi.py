@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Batch converter: chart .txt files -> MIDI, without the GUI.
+
+Charts are read with the same rules as the app's "Load Chart" and rendered
+with the same engine as "Save MIDI". Files are converted in parallel across
+a process pool; each file gets a status line with its timing, and the exit
+status is nonzero if any file failed.
+
+    python chart2midi.py charts/ -o out/
+    python chart2midi.py "charts/**/*.txt" --jobs 8 --omit-bass
+    python chart2midi.py song.txt --tracks parts     # type-1 file, one track per part
+    python chart2midi.py song.txt --wav              # audio preview instead of MIDI (needs NumPy)
+    python chart2midi.py song.txt --pattern bossa    # comp the chords instead of holding them
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from chord_engine import ChordEngine
+
+
+class ConvertResult(NamedTuple):
+    source: str
+    output: Optional[str]
+    ok: bool
+    seconds: float
+    measures: int = 0
+    warnings: Tuple[str, ...] = ()
+    error: Optional[str] = None
+
+
+def collect_inputs(inputs: List[str], recursive: bool, extensions: Tuple[str, ...] = ('.txt',)) -> List[str]:
+    """Expands files, directories (their files with one of `extensions`) and glob patterns into a sorted, de-duplicated list."""
+    found: List[str] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for ext in extensions:
+                pattern = os.path.join(item, '**', '*' + ext) if recursive else os.path.join(item, '*' + ext)
+                found.extend(glob.glob(pattern, recursive=recursive))
+        elif glob.has_magic(item):
+            found.extend(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+        else:
+            found.append(item)
+    return sorted(set(os.path.normpath(p) for p in found))
+
+
+def output_path_for(source: str, output_dir: Optional[str], ext: str = '.mid') -> str:
+    base = os.path.splitext(os.path.basename(source))[0] + ext
+    return os.path.join(output_dir, base) if output_dir else os.path.splitext(source)[0] + ext
+
+
+def convert_chart(task: Tuple[str, str, Dict[str, Any]]) -> ConvertResult:
+    """Converts one chart file; runs inside the worker processes, so it never raises."""
+    source, output, options = task
+    start = time.perf_counter()
+    warnings: List[str] = []
+    try:
+        with open(source, 'r', encoding='utf-8') as f:
+            content = f.read()
+        parts = ChordEngine.group_chart_rows(ChordEngine.parse_chart_text(content))
+        if not parts:
+            raise ValueError("No chart data found")
+        measures = ChordEngine.chart_measures(parts)
+        initial_key = parts[0].get('key') or 'C'
+        # 차트의 첫 (Tempo:..) 값이 있으면 --bpm 보다 우선합니다.
+        bpm = measures[0][2].bpm if measures and measures[0][2].bpm is not None else options['bpm']
+        if options['wav']:
+            # 워커 프로세스가 이미 파일 단위로 나눠 돌므로 파일 안에서는 스레드를 더 띄우지 않습니다.
+            from audio_preview import write_wav
+            write_wav(output, measures, omit5_on_conflict=options['omit5_on_conflict'], omit_duplicated_bass=options['omit_duplicated_bass'],
+                      bpm=bpm, log=warnings.append, workers=1 if options['parallel'] else None, pattern=options['pattern'])
+        elif options['tracks'] == 'single':
+            ChordEngine.export_midi(output, measures, omit5_on_conflict=options['omit5_on_conflict'],
+                                    omit_duplicated_bass=options['omit_duplicated_bass'],
+                                    initial_key=initial_key, ticks_per_beat=options['ppq'], bpm=bpm, log=warnings.append,
+                                    backend=options['backend'], pattern=options['pattern'])
+        else:
+            # 파일 단위로 이미 프로세스 풀에 나눠 돌므로 트랙은 워커 안에서 차례로 그립니다(executor 없음).
+            ChordEngine.export_midi_tracks(output, ChordEngine.chart_sections(parts), omit5_on_conflict=options['omit5_on_conflict'],
+                                           omit_duplicated_bass=options['omit_duplicated_bass'], initial_key=initial_key,
+                                           ticks_per_beat=options['ppq'], bpm=bpm, log=warnings.append, split=options['tracks'],
+                                           pattern=options['pattern'])
+        return ConvertResult(source, output, True, time.perf_counter() - start, len(measures), tuple(warnings))
+    except Exception as e:
+        return ConvertResult(source, None, False, time.perf_counter() - start, warnings=tuple(warnings), error=f"{type(e).__name__}: {e}")
+
+
+def run_batch(tasks: List[Tuple[str, str, Dict[str, Any]]], jobs: int, convert: Callable[[tuple], ConvertResult] = convert_chart):
+    """Yields results in input order, converting in a process pool when jobs > 1 (`convert` must be a module-level function)."""
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks: yield convert(task)
+        return
+    # 파일 수천 개를 넘길 때 작업 전달 비용을 줄이려고 여러 파일을 한 묶음으로 보냅니다.
+    chunksize = max(1, len(tasks) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(convert, tasks, chunksize=chunksize)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert chord chart .txt files to MIDI (or WAV previews).")
+    parser.add_argument('inputs', nargs='+', help="chart files, directories or glob patterns")
+    parser.add_argument('-o', '--output-dir', help="directory for the .mid files (default: next to each chart)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="worker processes (default: all cores)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="search directories recursively")
+    parser.add_argument('--bpm', type=float, default=120, help="tempo for charts without a (Tempo:..) tag (default: %(default)s)")
+    parser.add_argument('--ppq', type=int, default=480, help="ticks per quarter note (default: %(default)s)")
+    parser.add_argument('--backend', choices=ChordEngine.MIDI_EXPORT_BACKENDS, default=ChordEngine.MIDI_EXPORT_BACKEND,
+                        help="MIDI writer: built-in byte encoder or the mido reference (default: %(default)s)")
+    parser.add_argument('--tracks', choices=ChordEngine.MIDI_TRACK_MODES, default='single',
+                        help="one track, a type-1 track per part, or separate bass/chord tracks (default: %(default)s)")
+    parser.add_argument('--pattern', choices=tuple(ChordEngine.COMPING_PATTERNS),
+                        help="comping pattern to play each chord with (default: block chords held for their whole slot)")
+    parser.add_argument('--wav', action='store_true', help="render a WAV audio preview instead of MIDI (needs NumPy)")
+    parser.add_argument('--no-omit5', dest='omit5_on_conflict', action='store_false', help="keep the 5th when it clashes with #11/b13")
+    parser.add_argument('--omit-bass', dest='omit_duplicated_bass', action='store_true', help="drop chord tones that double the bass")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only print failures and the summary")
+    parser.add_argument('-v', '--verbose', action='store_true', help="also print skipped chords")
+    args = parser.parse_args(argv)
+    if args.tracks != 'single' and args.backend != 'native':
+        parser.error("--tracks parts/roles needs the native backend")
+    if args.wav and args.tracks != 'single':
+        parser.error("--wav renders a single mix; it cannot be combined with --tracks")
+    if not 0 < args.ppq < 0x8000:
+        parser.error("--ppq must be between 1 and 32767")
+    if args.wav:
+        # 파일마다 워커 안에서 실패하기 전에, NumPy 가 없으면 여기서 한 번만 알려 줍니다.
+        try:
+            import audio_preview  # noqa: F401
+        except ImportError as e:
+            print(f"--wav needs NumPy ({e}); install it with: pip install numpy", file=sys.stderr)
+            return 2
+
+    sources = collect_inputs(args.inputs, args.recursive)
+    if not sources:
+        print("No chart files found.", file=sys.stderr)
+        return 2
+    if args.output_dir: os.makedirs(args.output_dir, exist_ok=True)
+
+    options = {'omit5_on_conflict': args.omit5_on_conflict, 'omit_duplicated_bass': args.omit_duplicated_bass, 'bpm': args.bpm,
+               'backend': args.backend, 'tracks': args.tracks, 'ppq': args.ppq, 'wav': args.wav, 'pattern': args.pattern}
+    jobs = max(1, min(args.jobs, len(sources)))
+    options['parallel'] = jobs > 1
+    ext = '.wav' if args.wav else '.mid'
+    tasks = [(src, output_path_for(src, args.output_dir, ext), options) for src in sources]
+    outputs: Dict[str, str] = {}
+    for src, out, _ in tasks:
+        if out in outputs:
+            print(f"Both {outputs[out]} and {src} would be written to {out}.", file=sys.stderr)
+            return 2
+        outputs[out] = src
+
+    start = time.perf_counter()
+    failed = 0
+    for result in run_batch(tasks, jobs):
+        if result.ok:
+            if not args.quiet:
+                note = f", {len(result.warnings)} skipped" if result.warnings else ""
+                print(f"OK    {result.seconds * 1000:8.1f} ms  {result.source} -> {result.output} ({result.measures} measures{note})")
+        else:
+            failed += 1
+            print(f"FAIL  {result.seconds * 1000:8.1f} ms  {result.source}: {result.error}", file=sys.stderr)
+        if args.verbose:
+            for w in result.warnings: print(f"      {w}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(tasks) - failed}/{len(tasks)} charts converted in {elapsed:.2f} s with {jobs} worker(s); {failed} failed.")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""GUI-free chord engine: symbol parsing, notation rendering, voicing, durations and MIDI rendering.
+
+Importing this module pulls in no Tk/customtkinter code, so batch workers and
+scripts can use it without a display. The GUI's `App` class inherits every
+engine method and table from `ChordEngine`.
+"""
+
+import bisect
+import io
+import itertools
+import math
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+import theory_tables
+
+
+class ExportCancelled(Exception):
+    """Raised from an export's progress callback to stop it; the partial file is removed."""
+
+
+class LRUCache:
+    """Size-capped mapping that evicts the least recently used entry first.
+
+    Keeps hit/miss/eviction counters so callers can verify how often the
+    expensive computation behind the cache actually runs.
+    """
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(1, int(maxsize))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, LRUCache._MISSING)
+            if value is LRUCache._MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def format_stats(self) -> str:
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({rate:.1f}% hit rate), {self.evictions} evictions, {len(self._data)}/{self.maxsize} entries"
+
+
+class PitchClassSet(int):
+    """Set of pitch classes 0..11 packed into the low 12 bits of an int (bit n = pitch class n).
+
+    Being an int, equality and hashing come for free; transposition is a
+    12-bit rotation and omissions are plain masks.
+    """
+    __slots__ = ()
+    FULL = 0xFFF
+    _PCS: Tuple[Tuple[int, ...], ...] = ()  # mask -> 오름차순 피치클래스 튜플 (모듈 로드 시 채움)
+
+    def __new__(cls, mask: int = 0):
+        return super().__new__(cls, mask & PitchClassSet.FULL)
+
+    @classmethod
+    def from_pcs(cls, pcs) -> 'PitchClassSet':
+        mask = 0
+        for pc in pcs: mask |= 1 << (pc % 12)
+        return cls(mask)
+
+    def pcs(self) -> Tuple[int, ...]:
+        return PitchClassSet._PCS[self]
+
+    def __iter__(self):
+        return iter(PitchClassSet._PCS[self])
+
+    def __len__(self) -> int:
+        return len(PitchClassSet._PCS[self])
+
+    def __contains__(self, pc: int) -> bool:
+        return bool(self >> (pc % 12) & 1)
+
+    def __or__(self, other: int) -> 'PitchClassSet':
+        return PitchClassSet(int(self) | other)
+
+    def __and__(self, other: int) -> 'PitchClassSet':
+        return PitchClassSet(int(self) & other)
+
+    def without(self, other: int) -> 'PitchClassSet':
+        return PitchClassSet(int(self) & ~other)
+
+    def transpose(self, semitones: int) -> 'PitchClassSet':
+        n = semitones % 12
+        mask = int(self)
+        return PitchClassSet((mask << n) | (mask >> (12 - n)))
+
+    def __repr__(self) -> str:
+        return f"PitchClassSet({{{', '.join(map(str, PitchClassSet._PCS[self]))}}})"
+
+
+def _build_pcs_table() -> Tuple[Tuple[int, ...], ...]:
+    # 최하위 비트를 뗀 마스크의 결과 앞에 그 비트의 피치클래스를 붙이면 오름차순이 유지됩니다.
+    table: List[Tuple[int, ...]] = [()]
+    for mask in range(1, PitchClassSet.FULL + 1):
+        low = mask & -mask
+        table.append((low.bit_length() - 1,) + table[mask ^ low])
+    return tuple(table)
+
+
+PitchClassSet._PCS = _build_pcs_table()
+
+
+class ChordEngine:
+    BASE_OCTAVE = 48
+    # 음이름/도수/조 테이블은 theory_tables 모듈에 한 번만 만들어 두고 여기서는 별칭으로 씁니다. (위젯용 목록은 list 사본)
+    NOTE_NAMES_SHARP = list(theory_tables.NOTE_NAMES_SHARP)
+    NOTE_NAMES_FLAT  = list(theory_tables.NOTE_NAMES_FLAT)
+    KEYS = list(theory_tables.KEYS)
+    KEY_PREFERS_SHARPS = theory_tables.KEY_PREFERS_SHARPS
+    MAJOR_DEGREE_TO_SEMITONES = theory_tables.MAJOR_DEGREE_TO_SEMITONES
+    SEMITONES_TO_MAJOR_DEGREE = theory_tables.SEMITONES_TO_MAJOR_DEGREE
+    MAJOR_SCALE_PCS = PitchClassSet.from_pcs(MAJOR_DEGREE_TO_SEMITONES.values())
+    TENSIONS_LIST = list(theory_tables.TENSIONS_LIST)
+    QUALITY_SYMBOLS = ["Major", "Minor", "7", "M7", "m7", "7b5", "M7b5", "m7b5", "dim", "dim7", "aug", "blk", "sus2", "sus4", "omit3", "omit5"]
+    ROMAN_DEGREES_BUILDER = list(theory_tables.ROMAN_DEGREES_BUILDER)
+    KEY_PCS = theory_tables.KEY_PCS
+    KEY_SPELLINGS = theory_tables.KEY_SPELLINGS
+    KEY_INTERVALS = theory_tables.KEY_INTERVALS
+
+    @staticmethod
+    def roman_degrees_for_key(key: str) -> List[str]:
+        return list(theory_tables.DEGREE_BY_INTERVAL[ChordEngine.prefers_sharps(key)])
+
+    ROMAN_PATTERN = r'(?:VII|VI|V|IV|III|II|I)'
+    ROMAN_RE = re.compile(fr'(?i)^([b#]?)({ROMAN_PATTERN})$')
+    PAREN_TENSION_RE = re.compile(r'(?:b|#)?(?:5|6|9|11|13)')
+
+    # 코드 심볼 토크나이저: 유니코드 임시표를 한 번에 정규화한 뒤, 근음 전(head)/후(suffix) 두 패턴으로 한 번만 훑습니다.
+    CHORD_CHAR_FOLD = str.maketrans({'♭': 'b', '♯': '#', '♮': '', '𝄪': '##', '𝄫': 'bb', '＃': '#', 'ｂ': 'b'})
+    CHORD_HEAD_RE = re.compile(fr'''
+        (?P<ws>\s+)
+      | (?P<blk>(?i:blk))
+      | (?P<omit>omit[35])
+      | (?P<paren>\([^/]*\))
+      | (?P<slash>/.*)
+      | (?P<roman>(?i:[b\#]?{ROMAN_PATTERN}))
+      | (?P<note>(?i:[A-G](?:\#|b(?!lk))?))
+      | (?P<other>.)
+    ''', re.VERBOSE | re.DOTALL)
+    CHORD_SUFFIX_RE = re.compile(r'''
+        (?P<ws>\s+)
+      | (?P<blk>(?i:blk))
+      | (?P<omit>omit[35])
+      | (?P<paren>\([^/]*\))
+      | (?P<slash>/.*)
+      | (?P<maj7>M7|[Mm]aj7)
+      | (?P<dim7>dim7|°7)
+      | (?P<min7>(?:min|m|-)7)
+      | (?P<halfdim>ø)
+      | (?P<seventh>7)
+      | (?P<dim>dim|°)
+      | (?P<sus4>sus4)
+      | (?P<sus2>sus2)
+      | (?P<flat5>[b-]5)
+      | (?P<sharp5>[\#+]5)
+      | (?P<tension>(?:[b\#]|\+(?=9|11)|-(?=9|13))?(?:13|11|9|6))
+      | (?P<majext>M(?=13|11|9))
+      | (?P<aug>aug|\+)
+      | (?P<minor>min|m|-)
+      | (?P<other>.)
+    ''', re.VERBOSE | re.DOTALL)
+    CHORD_PAREN_OMIT_RE = re.compile(r'omit([35])')
+    CHORD_SEVENTH_TOKENS = {'maj7': 'M7', 'min7': 'm7', 'dim7': 'dim7', 'seventh': '7', 'halfdim': 'm7'}
+    
+    # 파싱 결과는 캐시와 여러 마디가 공유하므로 불변 튜플 기반 값 객체로 둡니다.
+    # 인스턴스 딕셔너리가 없어 가볍고, 값이 같으면 해시도 같아 보이싱/렌더링 캐시의 키로 바로 쓸 수 있습니다.
+    class ParsedChord(NamedTuple):
+        root: str
+        quality: str
+        tensions: Tuple[str, ...] = ()
+        paren_contents: Tuple[str, ...] = ()
+        bass_note_str: Optional[str] = None
+        bass_note: Optional[str] = None
+        bass_degree: Optional[str] = None
+        bass_interval: Optional[int] = None
+        omissions: Tuple[int, ...] = ()
+        is_roman: bool = False
+        roman_symbol: Optional[str] = None
+        seventh: Optional[str] = None
+        alterations: Tuple[str, ...] = ()
+
+    CHORD_INTERN = LRUCache(maxsize=8192)
+
+    @staticmethod
+    def intern_chord(parsed: 'ChordEngine.ParsedChord') -> 'ChordEngine.ParsedChord':
+        """Returns the shared instance equal to `parsed` so identical chords across a chart are stored once."""
+        shared = ChordEngine.CHORD_INTERN.get(parsed)
+        if shared is None:
+            ChordEngine.CHORD_INTERN.put(parsed, parsed)
+            return parsed
+        return shared
+
+    PARSE_CACHE = LRUCache(maxsize=4096)
+
+    @staticmethod
+    def prefers_sharps(key: str) -> bool: return ChordEngine.KEY_PREFERS_SHARPS.get(key, True)
+    
+    @staticmethod
+    def name_to_pc(name: str) -> int:
+        tbl = theory_tables.NOTE_TO_PC
+        pc = tbl.get(name)
+        if pc is not None: return pc
+        n = name.strip()
+        if len(n)>1 and n[1] in ('b','#'): n = n[0].upper() + n[1:]
+        else: n = n[0].upper() + n[1:].lower()
+        if n not in tbl: raise ValueError(f"Unknown note name: {n}")
+        return tbl[n]
+
+    @staticmethod
+    def pc_to_name(pc: int, use_sharps: bool) -> str: return theory_tables.NOTE_NAMES_SHARP[pc%12] if use_sharps else theory_tables.NOTE_NAMES_FLAT[pc%12]
+    
+    @staticmethod
+    def parse_tensions(text: str) -> List[str]:
+        if not text: return []
+        inner = text.strip()
+        if inner.startswith('(') and inner.endswith(')'): inner = inner[1:-1]
+        if not inner: return []
+        parts = [p.strip() for p in inner.split(',') if p.strip()]
+        norm = [t for t in (p.replace('+', '#').replace('-', 'b') for p in parts) if ChordEngine.PAREN_TENSION_RE.fullmatch(t)]
+        seen, out = set(), []
+        for t in norm:
+            core_num = ''.join(filter(str.isdigit, t))
+            if core_num not in seen: out.append(t); seen.add(core_num)
+        return out
+        
+    @staticmethod
+    def roman_to_pc_offset(key_root: str, roman: str) -> int:
+        semis = theory_tables.ROMAN_TO_SEMITONES.get(roman)
+        if semis is not None: return (ChordEngine.name_to_pc(key_root) + semis) % 12
+        m = ChordEngine.ROMAN_RE.fullmatch(roman)
+        if not m: raise ValueError(f"Invalid roman: {roman}")
+        acc, deg = m.groups(); semis = ChordEngine.MAJOR_DEGREE_TO_SEMITONES[deg.upper()]
+        if acc.lower() == 'b': semis -= 1
+        elif acc == '#': semis += 1
+        return (ChordEngine.name_to_pc(key_root) + semis) % 12
+
+    @staticmethod
+    def parse_chord_symbol(text: str, key: str) -> 'ChordEngine.ParsedChord':
+        """Parses a chord symbol, reusing the cached result for a previously seen (text, key) pair."""
+        cache_key = ((text or '').strip(), key)
+        parsed = ChordEngine.PARSE_CACHE.get(cache_key)
+        if parsed is None:
+            parsed = ChordEngine.intern_chord(ChordEngine._parse_chord_symbol_uncached(cache_key[0], key))
+            ChordEngine.PARSE_CACHE.put(cache_key, parsed)
+        return parsed
+
+    @staticmethod
+    def tokenize_chord_symbol(text: str) -> List[Tuple[str, str]]:
+        """Splits a chord symbol into (kind, text) tokens in a single left-to-right pass.
+
+        Everything up to the root (blk, omit, parentheses) is scanned with CHORD_HEAD_RE,
+        the rest with CHORD_SUFFIX_RE. A 'slash' token carries the raw bass text and ends the scan.
+        """
+        s = text if text.isascii() else text.translate(ChordEngine.CHORD_CHAR_FOLD)
+        head_match = ChordEngine.CHORD_HEAD_RE.match
+        tokens: List[Tuple[str, str]] = []
+        pos, end = 0, len(s)
+        while pos < end:
+            m = head_match(s, pos)
+            kind = m.lastgroup
+            tokens.append((kind, m.group()))
+            pos = m.end()
+            if kind == 'roman' or kind == 'note':
+                tokens += [(m.lastgroup, m.group()) for m in ChordEngine.CHORD_SUFFIX_RE.finditer(s, pos)]
+                break
+        return tokens
+
+    @staticmethod
+    def _parse_chord_symbol_uncached(text: str, key: str) -> 'ChordEngine.ParsedChord':
+        s = (text or '').strip()
+        if not s:
+            return ChordEngine.ParsedChord(root='C', quality='Major')
+        return ChordEngine._reduce_chord_tokens(ChordEngine.tokenize_chord_symbol(s), text, key)
+
+    @staticmethod
+    def _reduce_chord_tokens(tokens: List[Tuple[str, str]], text: str, key: str, allow_paren_fallback: bool = True) -> 'ChordEngine.ParsedChord':
+        seen = set()
+        omit_set, tension_set = set(), set()
+        paren_contents: List[str] = []
+        paren_inner = ''
+        bass_note_str = None
+        head, seventh_tok = None, None
+        is_roman_flag = has_rest = major_ext = half_dim = False
+        prev_kind = None
+
+        for kind, tok in tokens:
+            if kind == 'ws': prev_kind = None; continue
+            if kind == 'omit': omit_set.add(int(tok[-1])); continue
+            if kind == 'slash': bass_note_str = tok[1:].strip(); continue
+            if kind == 'paren':
+                # '(omit3,b9)'처럼 괄호 안에 적은 생략음도 괄호 밖과 똑같이 읽습니다.
+                if 'omit' in tok:
+                    omit_set.update(int(n) for n in ChordEngine.CHORD_PAREN_OMIT_RE.findall(tok))
+                    tok = ChordEngine.CHORD_PAREN_OMIT_RE.sub('', tok)
+                paren_contents = ChordEngine.parse_tensions(tok)
+                paren_inner = tok[1:-1].strip()
+                continue
+            if kind == 'blk': seen.add(kind); continue
+            if head is None:
+                if (kind == 'roman' or kind == 'note') and 'other' not in seen: head, is_roman_flag = tok, kind == 'roman'
+                else: seen.add('other')
+                continue
+
+            # 근음 뒤의 접미 토큰: 7화음, 성질(sus/aug/dim/m), 변화음(b5/#5), 텐션 숫자
+            if kind == 'tension': tension_set.add(tok.lstrip('b#+-'))
+            elif kind in ChordEngine.CHORD_SEVENTH_TOKENS:
+                if seventh_tok is None: seventh_tok = ChordEngine.CHORD_SEVENTH_TOKENS[kind]
+            elif kind == 'flat5' and prev_kind == 'min7': half_dim = True
+            elif kind == 'majext' and not has_rest: major_ext = True
+            seen.add(kind); has_rest, prev_kind = True, kind
+
+        half_dim = half_dim or 'halfdim' in seen
+
+        if head is None and allow_paren_fallback and 'other' not in seen and paren_inner and not paren_contents:
+            # '(Am7)'처럼 괄호 안에 텐션이 아닌 코드 자체가 들어 있으면 괄호를 벗겨서 다시 해석합니다.
+            carried = [t for t in tokens if t[0] in ('blk', 'slash')] + [('omit', f"omit{n}") for n in sorted(omit_set)]
+            return ChordEngine._reduce_chord_tokens(ChordEngine.tokenize_chord_symbol(paren_inner) + carried, text, key, allow_paren_fallback=False)
+
+        bass_note = None
+        if bass_note_str is not None:
+            try:
+                bass_note = ChordEngine.pc_to_name(ChordEngine.name_to_pc(bass_note_str), ChordEngine.prefers_sharps(key))
+            except ValueError: bass_note_str, bass_note = None, None
+
+        if head is None:
+            raise ValueError(f"Unrecognized chord symbol '{text}'")
+        if is_roman_flag:
+            root = theory_tables.KEY_ROMAN_TO_ROOT.get((key, head)) or ChordEngine.pc_to_name(ChordEngine.roman_to_pc_offset(key, head), ChordEngine.prefers_sharps(key))
+        else:
+            root = head[0].upper() + head[1:]
+
+        bass_interval, bass_degree = None, None
+        if bass_note_str and is_roman_flag:
+            # 도수 모드에서 베이스음이 도수 표기(예: I, V)일 경우에만 bass_degree로 저장합니다.
+            # 알파벳 베이스음은 절대음으로 취급하여 bass_degree를 설정하지 않습니다.
+            m_bass_roman = ChordEngine.ROMAN_RE.fullmatch(bass_note_str)
+            if m_bass_roman:
+                bass_degree = m_bass_roman.group(0)
+            else:
+                try:
+                    # build_string_from_parsed의 도수 변환 로직을 재사용하여 정확도와 일관성을 높입니다.
+                    bass_degree = ChordEngine.build_string_from_parsed(ChordEngine.ParsedChord(root=bass_note_str, quality='Major'), is_roman=True, key=key)
+                except ValueError:
+                    bass_note_str, bass_note, bass_degree = None, None, None
+
+        # CM9, CM11, CM13과 같은 형태를 M7 + 텐션으로 처리
+        if major_ext: seventh_tok = 'M7'
+        tensions = [t for t in ('13', '11', '9', '6') if t in tension_set] if tension_set else []
+
+        quality, seventh = 'Major', None
+        if seventh_tok is not None:
+            seventh = 'm7' if seventh_tok == '7' else seventh_tok
+            if seventh_tok == 'm7': quality = 'Minor'
+            elif seventh_tok == 'dim7': quality = 'dim'
+        elif tensions and tensions[0] != '6':
+            # 괄호 밖의 9, 11, 13은 7음을 포함하는 것으로 해석합니다. (괄호 안의 텐션은 add 음)
+            seventh = 'm7'
+
+        if 'blk' in seen: quality = 'blk'
+        elif 'sus4' in seen: quality = 'sus4'
+        elif 'sus2' in seen: quality = 'sus2'
+        elif 'aug' in seen: quality = 'aug'
+        elif 'dim' in seen: quality = 'dim'
+        elif 'minor' in seen: quality = 'Minor'
+
+        if is_roman_flag and head.islower() and not has_rest:
+             if head.upper() in ['II','III','VI']: quality = 'Minor'
+             elif head.upper() == 'VII': quality = 'dim'
+
+        alterations = ()
+        if 'flat5' in seen: alterations += ('b5',)
+        if 'sharp5' in seen: alterations += ('#5',)
+        if half_dim: quality, seventh, alterations = 'dim', 'm7', ()
+
+        return ChordEngine.ParsedChord(root=root, quality=quality, tensions=tuple(tensions), paren_contents=tuple(paren_contents), bass_note_str=bass_note_str,
+                               bass_note=bass_note, bass_degree=bass_degree, bass_interval=bass_interval, omissions=tuple(sorted(omit_set)) if omit_set else (),
+                               is_roman=is_roman_flag, roman_symbol=head, seventh=seventh, alterations=alterations)
+
+    BUILD_CACHE = LRUCache(maxsize=8192)
+    CANONICAL_CACHE = LRUCache(maxsize=8192)
+
+    @staticmethod
+    def build_string_from_parsed(p: 'ChordEngine.ParsedChord', is_roman: bool, key: str) -> str:
+        """Renders a parsed chord, reusing the cached string for a previously seen (chord, is_roman, key)."""
+        cache_key = (p, is_roman, key)
+        result = ChordEngine.BUILD_CACHE.get(cache_key)
+        if result is None:
+            result = ChordEngine._build_string_from_parsed_uncached(p, is_roman, key)
+            ChordEngine.BUILD_CACHE.put(cache_key, result)
+        return result
+
+    @staticmethod
+    def canonicalize(text: str, key: str, is_roman: bool) -> str:
+        """Returns the canonical alphabet/degree spelling of one symbol, skipping parse and build for a symbol seen before."""
+        cache_key = (text, key, is_roman)
+        result = ChordEngine.CANONICAL_CACHE.get(cache_key)
+        if result is None:
+            result = ChordEngine.build_string_from_parsed(ChordEngine.parse_chord_symbol(text, key), is_roman, key)
+            ChordEngine.CANONICAL_CACHE.put(cache_key, result)
+        return result
+
+    @staticmethod
+    def builder_symbol(root: str, quality: str, tensions: Iterable[str]) -> str:
+        """Composes the symbol the chord builder inserts for a root, a QUALITY_SYMBOLS entry and a selection of tensions."""
+        tensions = list(tensions)
+        qual_txt = quality if quality not in ["Major", "Minor"] else ('m' if quality == "Minor" else '')
+        # 변화 텐션(b9, #11 ...)은 괄호 안에, 나머지는 성질 뒤에 붙입니다.
+        paren_tensions = [t for t in tensions if re.search(r'[b#]', t)]
+        text_tensions = [t for t in tensions if not re.search(r'[b#]', t)]
+        tens_txt = "".join(sorted(text_tensions, key=lambda x: int(re.sub(r'[^0-9]', '', x))))
+        if tensions and not any(c in qual_txt for c in ['7','M','m','d','a','s']):
+            if not tens_txt: tens_txt = '7'
+        paren_txt = f"({','.join(paren_tensions)})" if paren_tensions else ''
+        return f"{root}{qual_txt}{tens_txt}{paren_txt}"
+
+    @staticmethod
+    def _build_string_from_parsed_uncached(p: 'ChordEngine.ParsedChord', is_roman: bool, key: str) -> str:
+        # self._log(f"Building string for '{p.root}' in key '{key}', is_roman={is_roman}")
+        if is_roman:
+            if p.is_roman and p.roman_symbol is not None: base = p.roman_symbol
+            else:
+                root_pc = ChordEngine.name_to_pc(p.root)
+                base = theory_tables.KEY_PC_TO_ROMAN.get((key, root_pc))
+                if base is None:
+                    base = theory_tables.DEGREE_BY_INTERVAL[ChordEngine.prefers_sharps(key)][(root_pc - ChordEngine.name_to_pc(key)) % 12]
+        else: base = p.root
+ 
+        core_qual_str = ''
+        sus_str = ''
+        if p.quality == 'Minor': core_qual_str = 'm'
+        elif p.quality == 'dim' and not (p.seventh == 'm7' or p.seventh == 'dim7'): core_qual_str = 'dim'
+        elif p.quality == 'aug': core_qual_str = 'aug'
+        elif p.quality == 'blk': core_qual_str = 'blk'
+        elif p.quality == 'sus2': sus_str = 'sus2'
+        elif p.quality == 'sus4': sus_str = 'sus4'
+
+        has_6 = '6' in p.tensions
+        other_tensions = [t for t in p.tensions if t != '6']
+
+        highest_tension_num = 0
+        if other_tensions:
+            highest_tension_num = max([int(re.sub(r'[^0-9]','',t)) for t in other_tensions])
+
+        six_part = '6' if has_6 else ''
+        num_part = ''
+        sev_prefix = ''
+        if highest_tension_num > 7:
+            num_part = str(highest_tension_num)
+            if p.seventh == 'M7': sev_prefix = 'M'
+        elif p.seventh:
+            num_part = '7'
+            if p.seventh == 'M7': sev_prefix = 'M'
+            elif p.seventh == 'dim7': core_qual_str, num_part = '', 'dim7'
+
+        if p.quality == 'dim' and p.seventh == 'm7':
+            core_qual_str, sev_prefix, num_part, alt_str, six_part = '', 'm', '7b5', '', ''
+            sus_str = ''
+        else:
+            alt_str = ''.join(p.alterations)
+            # 근음 글자 바로 뒤의 b5/#5 는 근음의 임시표로 다시 읽히므로('Cb5' = Cb 3화음) -5/+5 로 적습니다.
+            if alt_str and not is_roman and not (core_qual_str or six_part or sev_prefix or num_part):
+                alt_str = alt_str.replace('b5', '-5').replace('#5', '+5')
+
+        paren_str = f"({','.join(p.paren_contents)})" if p.paren_contents else ''
+        om_str = ''.join([f"omit{o}" for o in p.omissions])
+        
+        bass_display = None
+        if is_roman and p.bass_degree:
+            # bass_degree를 사용하여 새로운 키에 맞는 베이스음을 계산합니다. (가장 높은 우선순위)
+            bass_display = theory_tables.KEY_ROMAN_TO_ROOT.get((key, p.bass_degree))
+            if bass_display is None: bass_display = ChordEngine.pc_to_name(ChordEngine.roman_to_pc_offset(key, p.bass_degree), ChordEngine.prefers_sharps(key))
+            # 조가 그대로라 같은 음이면 적힌 철자를 둡니다: 'I7/Bb'가 한 번 더 바꿀 때 'I7/A#'가 되지 않게.
+            if p.bass_note_str is not None and ChordEngine.name_to_pc(p.bass_note_str) == ChordEngine.name_to_pc(bass_display): bass_display = p.bass_note_str
+        elif p.bass_note_str is not None: # bass_degree가 없을 때, 원본 문자열을 사용합니다.
+            bass_display = p.bass_note_str
+        
+        # 사용자가 베이스음을 명시적으로 입력했다면(p.bass_note_str is not None), 근음과 같더라도 생략하지 않습니다.
+        show_bass = bass_display and (p.bass_note_str is not None or bass_display != p.root)
+        bass_str = f"/{bass_display}" if show_bass else ""
+ 
+        result = f"{base}{core_qual_str}{six_part}{sev_prefix}{num_part}{alt_str}{sus_str}{om_str}{paren_str}{bass_str}"
+        # self._log(f"  -> Built: {result}")
+        return result
+
+    # --- 조옮김 테이블 ---
+    # 15개 조 x 12 피치클래스의 표기(샵/플랫)와 조 사이의 음정차(theory_tables)로 파싱된 코드를 문자열 재해석 없이 옮깁니다.
+    KEY_BY_PC = theory_tables.KEY_BY_PC
+    TRANSPOSE_CACHE = LRUCache(maxsize=4096)
+
+    @staticmethod
+    def transpose_chord(parsed: 'ChordEngine.ParsedChord', old_key: str, new_key: str) -> 'ChordEngine.ParsedChord':
+        """Moves a chord parsed in old_key to new_key; degrees stay the same, letter names move with the key."""
+        if old_key == new_key: return parsed
+        cache_key = (parsed, old_key, new_key)
+        moved = ChordEngine.TRANSPOSE_CACHE.get(cache_key)
+        if moved is not None: return moved
+
+        shift, spell = ChordEngine.KEY_INTERVALS[(old_key, new_key)], ChordEngine.KEY_SPELLINGS[new_key]
+        root = spell[(ChordEngine.name_to_pc(parsed.root) + shift) % 12]
+        bass_note, bass_note_str = parsed.bass_note, parsed.bass_note_str
+        # 슬래시 베이스는 파싱에서 음이름으로만 남으므로(도수 베이스 'V/VII'는 버려짐) 근음과 함께 옮깁니다.
+        if bass_note is not None: bass_note = bass_note_str = spell[(ChordEngine.name_to_pc(bass_note) + shift) % 12]
+        moved = parsed._replace(root=root, bass_note=bass_note, bass_note_str=bass_note_str,
+                                roman_symbol=parsed.roman_symbol if parsed.is_roman else root)
+        moved = ChordEngine.intern_chord(moved)
+        ChordEngine.TRANSPOSE_CACHE.put(cache_key, moved)
+        return moved
+
+    @staticmethod
+    def transpose_measure_text(text: str, old_key: str, new_key: str, is_roman: bool) -> str:
+        """Transposes one measure of space-separated symbols; '%' and unparseable symbols are kept as written."""
+        output_parts = []
+        for part_text in ChordEngine.split_measure_text(text):
+            if part_text == '%': output_parts.append(part_text); continue
+            try:
+                moved = ChordEngine.transpose_chord(ChordEngine.parse_chord_symbol(part_text, old_key), old_key, new_key)
+                output_parts.append(ChordEngine.build_string_from_parsed(moved, is_roman=is_roman, key=new_key))
+            except ValueError:
+                output_parts.append(part_text)
+        return " ".join(output_parts)
+
+    @staticmethod
+    def transpose_part(part: Dict[str, Any], new_key: str, is_roman: bool) -> Dict[str, Any]:
+        """Returns the part moved to new_key; a part already in new_key is returned unchanged (same object)."""
+        old_key = part.get('key') or 'C'
+        if old_key == new_key: return part
+        measures = [ChordEngine.transpose_measure_text(m, old_key, new_key, is_roman) if m else m for m in part.get('measures', [])]
+        return {**part, 'key': new_key, 'measures': measures}
+
+    # --- 보이싱 테이블 ---
+    # (성질, 7음, b5/#5, omit3/omit5, 6/b6, 5음 생략) 조합은 유한하므로 근음 기준 음정을 미리 계산해 둡니다.
+    # 9/11/13 계열 텐션은 코드톤 최고음(top)과 텐션 비트마스크에 따라 배치가 정해지므로 별도 표로 둡니다.
+    VOICING_QUALITIES = ('Major', 'Minor', 'dim', 'aug', 'sus2', 'sus4')
+    VOICING_SEVENTHS = (None, 'm7', 'M7', 'dim7')
+    VOICING_TENSION_INTERVALS = theory_tables.TENSION_INTERVALS
+    VOICING_UPPER_TENSIONS = ('b9', '9', '#9', '11', '#11', 'b13', '13')  # 음정 오름차순, 비트 0..6
+    VOICING_TENSION_BITS = {**{t: 1 << i for i, t in enumerate(VOICING_UPPER_TENSIONS)}, '6': 1 << 7, 'b6': 1 << 8}
+    VOICING_FIFTH_CONFLICT_BITS = VOICING_TENSION_BITS['#11'] | VOICING_TENSION_BITS['b13'] | VOICING_TENSION_BITS['b6']
+
+    @staticmethod
+    def _chord_tone_intervals(quality: str, seventh: Optional[str], flat5: bool, sharp5: bool, omit3: bool, omit5: bool,
+                              sixth: bool, flat_sixth: bool, drop_fifth: bool) -> Tuple[int, ...]:
+        if quality == 'Minor': intervals = [0, 3, 7]
+        elif quality == 'dim': intervals = [0, 3, 6]
+        elif quality == 'aug': intervals = [0, 4, 8]
+        else: intervals = [0, 4, 7] # Major default
+
+        if quality == 'sus2': intervals = [i for i in intervals if i not in [3,4]] + [2]
+        if quality == 'sus4': intervals = [i for i in intervals if i not in [3,4]] + [5]
+
+        if seventh == 'm7': intervals.append(10)
+        elif seventh == 'M7': intervals.append(11)
+        elif seventh == 'dim7': intervals.append(9)
+
+        if flat5: intervals = [i for i in intervals if i not in [7,8]] + [6]
+        if sharp5: intervals = [i for i in intervals if i not in [6,7]] + [8]
+
+        if omit3: intervals = [i for i in intervals if i not in [2,3,4,5]]
+        if omit5: intervals = [i for i in intervals if i not in [6,7,8]]
+        if drop_fifth: intervals = [i for i in intervals if i != 7]
+
+        if sixth: intervals.append(ChordEngine.VOICING_TENSION_INTERVALS['6'])
+        if flat_sixth: intervals.append(ChordEngine.VOICING_TENSION_INTERVALS['b6'])
+        # 한 옥타브 안의 음정은 오름차순으로 근음 위에 그대로 쌓입니다.
+        return PitchClassSet.from_pcs(intervals).pcs()
+
+    @staticmethod
+    def _build_voicing_tables() -> Tuple[Dict[tuple, Tuple[Tuple[int, ...], PitchClassSet]],
+                                         List[Tuple[Tuple[int, ...], bool, PitchClassSet]],
+                                         List[Tuple[Tuple[int, ...], PitchClassSet]]]:
+        """Enumerates every chord-tone shape, upper-tension placement and blk shape once, each with its pitch-class set."""
+        flags = (False, True)
+        # 6/b6 추가와 5음 생략은 기본 모양의 마스크에 비트 하나를 더하거나 빼는 것과 같으므로 기본 모양만 직접 계산합니다.
+        base_masks: Dict[tuple, int] = {}
+        shapes: Dict[int, Tuple[Tuple[int, ...], PitchClassSet]] = {}
+        sixth_bit, flat_sixth_bit = 1 << ChordEngine.VOICING_TENSION_INTERVALS['6'], 1 << ChordEngine.VOICING_TENSION_INTERVALS['b6']
+        chord_tones = {}
+        for key in itertools.product(ChordEngine.VOICING_QUALITIES, ChordEngine.VOICING_SEVENTHS, flags, flags, flags, flags, flags, flags, flags):
+            base = key[:6]
+            mask = base_masks.get(base)
+            if mask is None:
+                mask = base_masks[base] = int(PitchClassSet.from_pcs(ChordEngine._chord_tone_intervals(*base, False, False, False)))
+            sixth, flat_sixth, drop_fifth = key[6:]
+            if drop_fifth: mask &= ~(1 << 7)
+            if sixth: mask |= sixth_bit
+            if flat_sixth: mask |= flat_sixth_bit
+            shape = shapes.get(mask)
+            if shape is None: shape = shapes[mask] = (PitchClassSet._PCS[mask], PitchClassSet(mask))
+            chord_tones[key] = shape
+
+        # 텐션은 낮은 것부터 직전 최고음 바로 위에 쌓이므로, 최고 비트를 뺀 마스크의 배치에 한 음만 더하면 됩니다.
+        # 13th 계열은 근음 + 20반음 이상이면 한 옥타브 내립니다.
+        n_masks = 1 << len(ChordEngine.VOICING_UPPER_TENSIONS)
+        upper: List[Tuple[Tuple[int, ...], bool, PitchClassSet]] = []
+        for top in range(12):
+            placed: List[Tuple[Tuple[int, ...], int]] = [((), top)]
+            for mask in range(1, n_masks):
+                high = mask.bit_length() - 1
+                offsets, last = placed[mask & ~(1 << high)]
+                iv = ChordEngine.VOICING_TENSION_INTERVALS[ChordEngine.VOICING_UPPER_TENSIONS[high]]
+                candidate = last + 1 + (iv - last - 1) % 12
+                if iv in (20, 21) and candidate >= 20: candidate -= 12
+                placed.append((offsets + (candidate,), max(last, candidate)))
+            for offsets, _ in placed:
+                in_order = all(a < b for a, b in zip((top,) + offsets, offsets))
+                upper.append((offsets, in_order, PitchClassSet.from_pcs(offsets)))
+
+        # blk: 베이스(=표기된 근음) 위에 근음 기준 M2, A4, m7을 차례로 쌓습니다. 베이스와 근음의 음정차로 구분합니다.
+        blk = []
+        for root_above_bass in range(12):
+            last, offsets = 0, []
+            for iv in (2, 6, 10):
+                last = last + 1 + (root_above_bass + iv - last - 1) % 12
+                offsets.append(last)
+            blk.append((tuple(offsets), PitchClassSet.from_pcs(offsets)))
+        return chord_tones, upper, blk
+
+    @staticmethod
+    def voicing_table_key(parsed: 'ChordEngine.ParsedChord', omit5_on_conflict: bool) -> Tuple[tuple, int]:
+        """Returns the VOICING_CHORD_TONES key and the 7-bit upper-tension mask of a non-blk chord."""
+        tension_mask = 0
+        for t in parsed.tensions + parsed.paren_contents:
+            tension_mask |= ChordEngine.VOICING_TENSION_BITS.get(t, 0)
+        quality = parsed.quality if parsed.quality in ChordEngine.VOICING_QUALITIES else 'Major'
+        seventh = parsed.seventh if parsed.seventh in ChordEngine.VOICING_SEVENTHS else None
+        tone_key = (quality, seventh, 'b5' in parsed.alterations, '#5' in parsed.alterations,
+                    3 in parsed.omissions, 5 in parsed.omissions, bool(tension_mask & ChordEngine.VOICING_TENSION_BITS['6']),
+                    bool(tension_mask & ChordEngine.VOICING_TENSION_BITS['b6']),
+                    bool(omit5_on_conflict and tension_mask & ChordEngine.VOICING_FIFTH_CONFLICT_BITS))
+        return tone_key, tension_mask & 127
+
+    @staticmethod
+    def voicing_offsets(parsed: 'ChordEngine.ParsedChord', omit5_on_conflict: bool) -> Tuple[int, ...]:
+        """Returns the root-relative voicing of a non-blk chord (bass excluded) from the precomputed tables."""
+        return ChordEngine.voicing_shape(parsed, omit5_on_conflict)[0]
+
+    @staticmethod
+    def voicing_shape(parsed: 'ChordEngine.ParsedChord', omit5_on_conflict: bool) -> Tuple[Tuple[int, ...], PitchClassSet]:
+        """Like voicing_offsets, but also returns the root-relative pitch-class set of the voicing."""
+        tone_key, upper_mask = ChordEngine.voicing_table_key(parsed, omit5_on_conflict)
+        chord_tones, tone_pcs = ChordEngine.VOICING_CHORD_TONES[tone_key]
+        upper, in_order, upper_pcs = ChordEngine.VOICING_UPPER_PLACEMENTS[chord_tones[-1] * 128 + upper_mask]
+        if not upper: return chord_tones, tone_pcs
+        return (chord_tones + upper if in_order else tuple(sorted(set(chord_tones + upper)))), tone_pcs | upper_pcs
+
+    @staticmethod
+    def chord_pitch_classes(parsed: 'ChordEngine.ParsedChord', omit5_on_conflict: bool = False) -> PitchClassSet:
+        """Absolute pitch-class set sounded by a chord, bass included; the identity used for chord recognition."""
+        root_pc = ChordEngine.name_to_pc(parsed.root)
+        bass_pc = ChordEngine.name_to_pc(parsed.bass_note) if parsed.bass_note else root_pc
+        if parsed.quality == 'blk': return ChordEngine.VOICING_BLK_SHAPES[(root_pc - bass_pc) % 12][1].transpose(bass_pc) | (1 << bass_pc)
+        return ChordEngine.voicing_shape(parsed, omit5_on_conflict)[1].transpose(root_pc) | (1 << bass_pc)
+
+    @staticmethod
+    def build_voicing(parsed: 'ChordEngine.ParsedChord', omit5_on_conflict: bool, omit_duplicated_bass: bool) -> List[int]:
+        root_pc = ChordEngine.name_to_pc(parsed.root)
+        bass_pc = ChordEngine.name_to_pc(parsed.bass_note) if parsed.bass_note else root_pc
+
+        if parsed.quality == 'blk':
+            # blk is special: Root of aug triad is M2 below the stated root/bass
+            # e.g for Cblk, root is C, notes are A#aug/C -> C bass, A#-D-F# chord
+            # The shape is stacked upward from the bass, so it is looked up by the root's distance above the bass.
+            base_pc = bass_pc
+            offsets, shape = ChordEngine.VOICING_BLK_SHAPES[(root_pc - bass_pc) % 12]
+        else:
+            base_pc = root_pc
+            offsets, shape = ChordEngine.voicing_shape(parsed, omit5_on_conflict)
+
+        base_note = ChordEngine.BASE_OCTAVE + base_pc
+        bass_in_shape = (bass_pc - base_pc) % 12
+        if omit_duplicated_bass and shape >> bass_in_shape & 1:
+            # 보이싱의 피치클래스 집합에 베이스가 있을 때만 해당 음들을 걸러냅니다.
+            chord_notes = [base_note + o for o in offsets if o % 12 != bass_in_shape]
+        else:
+            chord_notes = [base_note + o for o in offsets]
+        # 베이스음(36~47)은 항상 코드음(48 이상)보다 낮으므로 정렬/중복 제거가 필요 없습니다.
+        return [(ChordEngine.BASE_OCTAVE - 12) + bass_pc] + chord_notes
+
+    # --- 배치 보이싱 (NumPy) ---
+    # 코드 하나를 (근음 pc, 베이스 pc, 모양 인덱스, 텐션 마스크) 네 정수로 줄이면 차트 전체를 배열 연산 한 번으로 보이싱할 수 있습니다.
+    # 모양 인덱스 0..3071은 VOICING_CHORD_TONES 순서, 3072 + (근음 - 베이스) % 12 는 blk 모양입니다.
+    VOICING_BLK_SHAPE_BASE = len(VOICING_QUALITIES) * len(VOICING_SEVENTHS) * 2 ** 7
+    VOICING_PAD = -1
+    VOICING_FEATURE_CACHE = LRUCache(maxsize=4096)
+    _VOICING_ARRAYS: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def voicing_features(parsed: 'ChordEngine.ParsedChord', omit5_on_conflict: bool) -> Tuple[int, int, int, int]:
+        """Reduces a parsed chord to (root_pc, bass_pc, shape_index, tension_mask) for build_voicings_batch."""
+        cache_key = (parsed, omit5_on_conflict)
+        features = ChordEngine.VOICING_FEATURE_CACHE.get(cache_key)
+        if features is not None: return features
+        root_pc = ChordEngine.name_to_pc(parsed.root)
+        bass_pc = ChordEngine.name_to_pc(parsed.bass_note) if parsed.bass_note else root_pc
+        if parsed.quality == 'blk':
+            features = (root_pc, bass_pc, ChordEngine.VOICING_BLK_SHAPE_BASE + (root_pc - bass_pc) % 12, 0)
+        else:
+            tone_key, upper_mask = ChordEngine.voicing_table_key(parsed, omit5_on_conflict)
+            features = (root_pc, bass_pc, ChordEngine.VOICING_SHAPE_INDEX[tone_key], upper_mask)
+        ChordEngine.VOICING_FEATURE_CACHE.put(cache_key, features)
+        return features
+
+    @staticmethod
+    def _numpy():
+        """Imports NumPy for the batch voicing functions (listed in requirements.txt, but the GUI and MIDI export run without it)."""
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("Batch voicing (build_voicings / build_voicings_batch) needs NumPy: pip install numpy") from e
+        return numpy
+
+    @staticmethod
+    def _voicing_arrays() -> Dict[str, Any]:
+        """Packs the voicing tables into padded NumPy arrays on first use."""
+        if ChordEngine._VOICING_ARRAYS is not None: return ChordEngine._VOICING_ARRAYS
+        np = ChordEngine._numpy()
+
+        pad = ChordEngine.VOICING_PAD
+        shapes = [tones for tones, _ in ChordEngine.VOICING_CHORD_TONES.values()] + [offsets for offsets, _ in ChordEngine.VOICING_BLK_SHAPES]
+        shape_width = max(len(t) for t in shapes)
+        shape_offsets = np.full((len(shapes), shape_width), pad, dtype=np.int16)
+        for i, tones in enumerate(shapes): shape_offsets[i, :len(tones)] = tones
+        # blk 행은 텐션 마스크가 항상 0이므로 top 값은 배치 표의 빈 칸만 가리키면 됩니다.
+        shape_top = np.array([t[-1] for t in shapes[:ChordEngine.VOICING_BLK_SHAPE_BASE]] + [0] * len(ChordEngine.VOICING_BLK_SHAPES), dtype=np.int16)
+
+        upper_width = len(ChordEngine.VOICING_UPPER_TENSIONS)
+        upper_offsets = np.full((len(ChordEngine.VOICING_UPPER_PLACEMENTS), upper_width), pad, dtype=np.int16)
+        for i, (offsets, _, _) in enumerate(ChordEngine.VOICING_UPPER_PLACEMENTS): upper_offsets[i, :len(offsets)] = offsets
+
+        ChordEngine._VOICING_ARRAYS = {'shape_offsets': shape_offsets, 'shape_top': shape_top, 'upper_offsets': upper_offsets}
+        return ChordEngine._VOICING_ARRAYS
+
+    @staticmethod
+    def build_voicings_batch(root_pc, bass_pc, shape_index, tension_mask, omit_duplicated_bass: bool):
+        """Vectorized build_voicing over whole arrays of voicing_features columns.
+
+        Returns (notes, counts): an int16 matrix with one voicing per row, bass
+        first, padded on the right with VOICING_PAD, and the per-row note count.
+        Needs NumPy; without it this raises ImportError before any work is done.
+        """
+        np = ChordEngine._numpy()
+
+        arrays = ChordEngine._voicing_arrays()
+        pad = ChordEngine.VOICING_PAD
+        root_pc = np.asarray(root_pc, dtype=np.int16)
+        bass_pc = np.asarray(bass_pc, dtype=np.int16)
+        shape_index = np.asarray(shape_index, dtype=np.intp)
+        tension_mask = np.asarray(tension_mask, dtype=np.intp)
+
+        is_blk = shape_index >= ChordEngine.VOICING_BLK_SHAPE_BASE
+        base_pc = np.where(is_blk, bass_pc, root_pc)
+        upper_row = arrays['shape_top'][shape_index].astype(np.intp) * 128 + tension_mask
+        offsets = np.concatenate((arrays['shape_offsets'][shape_index], arrays['upper_offsets'][upper_row]), axis=1)
+
+        # 패딩을 정렬 시 맨 뒤로 보내기 위해 큰 값으로 바꿔 둔 뒤, 정렬 + 인접 중복 제거로 sorted(set(...))를 재현합니다.
+        sentinel = np.iinfo(np.int16).max
+        valid = offsets != pad
+        if omit_duplicated_bass:
+            valid &= (offsets - (bass_pc - base_pc)[:, None]) % 12 != 0
+        offsets = np.sort(np.where(valid, offsets, sentinel), axis=1)
+        duplicate = np.zeros_like(offsets, dtype=bool)
+        duplicate[:, 1:] = offsets[:, 1:] == offsets[:, :-1]
+        if duplicate.any(): offsets = np.sort(np.where(duplicate, sentinel, offsets), axis=1)
+
+        valid = offsets != sentinel
+        counts = valid.sum(axis=1) + 1
+        width = int(counts.max()) if len(counts) else 1
+        notes = np.full((len(root_pc), width), pad, dtype=np.int16)
+        notes[:, 0] = (ChordEngine.BASE_OCTAVE - 12) + bass_pc
+        notes[:, 1:] = np.where(valid, offsets + (ChordEngine.BASE_OCTAVE + base_pc)[:, None], pad)[:, :width - 1]
+        return notes, counts
+
+    @staticmethod
+    def build_voicings(parsed_chords: List['ChordEngine.ParsedChord'], omit5_on_conflict: bool, omit_duplicated_bass: bool):
+        """Voices a whole list of parsed chords at once (needs NumPy); see build_voicings_batch for the result layout."""
+        np = ChordEngine._numpy()
+
+        features = np.array([ChordEngine.voicing_features(p, omit5_on_conflict) for p in parsed_chords], dtype=np.intp).reshape(-1, 4)
+        return ChordEngine.build_voicings_batch(features[:, 0], features[:, 1], features[:, 2], features[:, 3], omit_duplicated_bass)
+
+    @staticmethod
+    def split_measure_text(text: str) -> List[str]:
+        return [part for part in text.split(' ') if part]
+
+    # --- 박자 / 템포 ---
+    class Timing(NamedTuple):
+        """Meter and tempo of a measure; bpm None keeps the tempo already in effect."""
+        meter: Tuple[int, int] = (4, 4)
+        bpm: Optional[float] = None
+
+    DEFAULT_METER = (4, 4)
+    # (박자, 코드 수, PPQ) -> 코드별 틱 길이. 조합이 몇 개 안 되므로 잠금 없는 dict 로 둡니다.
+    SUBDIVISION_TABLE: Dict[Tuple[Tuple[int, int], int, int], Tuple[int, ...]] = {}
+
+    @staticmethod
+    def parse_meter(text: str) -> Tuple[int, int]:
+        """'7/8' -> (7, 8); the denominator must be a power of two, as MIDI stores it as an exponent."""
+        m = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', text or '')
+        if not m: raise ValueError(f"Invalid time signature: '{text}'")
+        num, den = int(m.group(1)), int(m.group(2))
+        if not 0 < num < 256 or den < 1 or den & (den - 1) or den > 128: raise ValueError(f"Invalid time signature: '{text}'")
+        return num, den
+
+    @staticmethod
+    def parse_tempo(text: str) -> float:
+        try: bpm = float(text)
+        except (TypeError, ValueError): raise ValueError(f"Invalid tempo: '{text}'") from None
+        # MIDI 템포는 4분음표당 마이크로초를 3바이트에 담습니다.
+        if not 60e6 / 0xFFFFFF <= bpm <= 60e6: raise ValueError(f"Invalid tempo: '{text}'")
+        return int(bpm) if bpm == int(bpm) else bpm
+
+    @staticmethod
+    def measure_ticks(meter: Tuple[int, int], tpb: int) -> int:
+        return meter[0] * 4 * tpb // meter[1]
+
+    @staticmethod
+    def duration_ticks_for_n(n: int, tpb: int, meter: Tuple[int, int] = (4, 4)) -> Tuple[int, ...]:
+        """Splits one measure among n chords; cached per (meter, n, ppq).
+
+        Whole beats of the meter are shared out first, longer shares first (3
+        chords in 4/4 -> half, quarter, quarter; 2 in 7/8 -> 4/8 + 3/8). With
+        more chords than beats the measure is split into near-equal ticks.
+        """
+        cache_key = (meter, n, tpb)
+        durations = ChordEngine.SUBDIVISION_TABLE.get(cache_key)
+        if durations is not None: return durations
+        beats, unit = meter[0], 4 * tpb // meter[1]
+        if n <= beats and unit * meter[1] == 4 * tpb:
+            base, rem = divmod(beats, n)
+            durations = tuple((base + 1 if i < rem else base) * unit for i in range(n))
+        else:
+            total = ChordEngine.measure_ticks(meter, tpb)
+            base, rem = divmod(total, n)
+            durations = tuple(base + 1 if i < rem else base for i in range(n))
+        ChordEngine.SUBDIVISION_TABLE[cache_key] = durations
+        return durations
+
+    @staticmethod
+    def _timing_changes(timing: 'ChordEngine.Timing', meter: Tuple[int, int], bpm: Optional[float]) -> Tuple[List[tuple], Tuple[int, int], Optional[float]]:
+        """(status, a, b) meta events that switch from (meter, bpm) to `timing`, with the new meter and bpm."""
+        changes = []
+        if timing.meter != meter:
+            meter = timing.meter
+            changes.append((ChordEngine.TIME_SIGNATURE, meter[0], meter[1]))
+        if timing.bpm is not None and timing.bpm != bpm:
+            bpm = timing.bpm
+            changes.append((ChordEngine.SET_TEMPO, int(round(60 * 1e6 / bpm)), 0))
+        return changes, meter, bpm
+
+    @staticmethod
+    def part_timings(parts: List[Dict[str, Any]]) -> List['ChordEngine.Timing']:
+        """Each part's Timing from its optional 'meter' ('7/8') and 'tempo' fields; both carry over to later parts."""
+        timings, meter, bpm = [], ChordEngine.DEFAULT_METER, None
+        for part in parts:
+            if part.get('meter'): meter = ChordEngine.parse_meter(part['meter'])
+            if part.get('tempo'): bpm = ChordEngine.parse_tempo(part['tempo'])
+            timings.append(ChordEngine.Timing(meter, bpm))
+        return timings
+
+    # --- MIDI 렌더링 ---
+    # 이벤트는 (델타 틱, 상태 바이트, 데이터1, 데이터2) 튜플로 한 번만 만들고, mido 경로와 직접 인코딩 경로가 함께 씁니다.
+    NOTE_ON, NOTE_OFF = 0x90, 0x80
+    # 메타 이벤트는 종류 번호(0x80 미만)를 상태 자리에 씁니다: (델타, SET_TEMPO, 마이크로초, 0), (델타, TIME_SIGNATURE, 분자, 분모)
+    END_OF_TRACK, SET_TEMPO, TIME_SIGNATURE = 0x2F, 0x51, 0x58
+    # build_voicing 결과의 첫 음은 항상 베이스음입니다.
+    MIDI_VOICES = {'bass': slice(0, 1), 'upper': slice(1, None)}
+    # 'single': 트랙 하나 / 'parts': 파트마다 트랙 / 'roles': 베이스와 코드음을 각각 트랙으로
+    MIDI_TRACK_MODES = ('single', 'parts', 'roles')
+    MIDI_ROLE_TRACKS = (('Bass', 'bass'), ('Chords', 'upper'))
+    # chord_events 의 코드 한 개 이벤트: (델타, CHORD, ChordFragment, 길이)
+    CHORD = 0x00
+    COMP = 0x02  # 반주 패턴을 입힌 코드 한 칸: (델타, COMP, CompFragment, 0)
+    RENDER_CACHE = LRUCache(maxsize=4096)
+    COMPING_PATTERNS = theory_tables.COMPING_PATTERNS
+    # (패턴, 박자, PPQ) -> 한 마디 템플릿. SUBDIVISION_TABLE 처럼 조합이 적어 잠금 없는 dict 로 둡니다.
+    PATTERN_TEMPLATES: Dict[Tuple[str, Tuple[int, int], int], Tuple[Tuple[int, int, float, Any], ...]] = {}
+    # (코드, 조, 옵션, 세기, 역할, 패턴, 박자, PPQ, 칸 위치, 칸 길이) -> CompFragment (연주할 음이 없으면 None)
+    COMP_CACHE = LRUCache(maxsize=8192)
+    NOTE_VELOCITY = 80
+    MIDI_EXPORT_BACKENDS = ('native', 'mido')
+    MIDI_EXPORT_BACKEND = 'native'
+    SMF_VLQ_TABLE: Tuple[bytes, ...] = ()  # 0..16383 틱의 가변 길이 델타 (처음 쓸 때 채움)
+    SMF_WRITE_CHUNK = 1 << 16  # 스트리밍 내보내기에서 한 번에 파일로 내보내는 트랙 바이트 수
+
+    class ChordFragment(NamedTuple):
+        """One voiced chord pre-encoded for the native writer: note_on and note_off runs (status byte + running status)."""
+        notes: Tuple[int, ...]
+        velocity: int
+        on_bytes: bytes
+        off_bytes: bytes
+
+    @staticmethod
+    def chord_fragment(token: str, key: str, omit5_on_conflict: bool, omit_duplicated_bass: bool,
+                       voices: Optional[str] = None) -> 'ChordEngine.ChordFragment':
+        """Parses and voices one chord token into a ChordFragment, cached per (token, key, options, velocity, voices).
+
+        Raises like parse_chord_symbol / build_voicing; failures are not cached.
+        """
+        velocity = ChordEngine.NOTE_VELOCITY
+        cache_key = (token, key, omit5_on_conflict, omit_duplicated_bass, velocity, voices)
+        fragment = ChordEngine.RENDER_CACHE.get(cache_key)
+        if fragment is not None: return fragment
+        parsed = ChordEngine.parse_chord_symbol(token, key)
+        notes = ChordEngine.build_voicing(parsed, omit5_on_conflict=omit5_on_conflict, omit_duplicated_bass=omit_duplicated_bass)
+        if voices: notes = notes[ChordEngine.MIDI_VOICES[voices]]
+        on, off = bytearray(), bytearray()
+        for j, note in enumerate(notes):
+            on += bytes((ChordEngine.NOTE_ON, note, velocity) if j == 0 else (0, note, velocity))
+            off += bytes((ChordEngine.NOTE_OFF, note, 0) if j == 0 else (0, note, 0))
+        fragment = ChordEngine.ChordFragment(tuple(notes), velocity, bytes(on), bytes(off))
+        ChordEngine.RENDER_CACHE.put(cache_key, fragment)
+        return fragment
+
+    class CompFragment(NamedTuple):
+        """One chord slot played with a comping pattern, pre-encoded for the native writer.
+
+        `notes` are (offset from the first note_on, duration, pitch, velocity)
+        in onset order; `lead` is the rest before the first note_on, `span`
+        runs from it to the last note_off and `trail` is the rest left in the
+        slot. `body` holds the encoded events (running status, first delta
+        left out) and `events` the same as (delta, status, note, velocity).
+        """
+        notes: Tuple[Tuple[int, int, int, int], ...]
+        lead: int
+        span: int
+        trail: int
+        body: bytes
+        events: Tuple[Tuple[int, int, int, int], ...]
+
+    @staticmethod
+    def pattern_template(pattern: str, meter: Tuple[int, int], tpb: int) -> Tuple[Tuple[int, int, float, Any], ...]:
+        """One bar of a COMPING_PATTERNS entry as (onset tick, length, accent, note selector) hits; cached per (pattern, meter, ppq).
+
+        The pattern's cell is repeated across the bar and cut at the bar line,
+        so every pattern fits every meter.
+        """
+        cache_key = (pattern, meter, tpb)
+        template = ChordEngine.PATTERN_TEMPLATES.get(cache_key)
+        if template is not None: return template
+        if pattern not in ChordEngine.COMPING_PATTERNS: raise ValueError(f"Unknown comping pattern: {pattern}")
+        cell_beats, hits = ChordEngine.COMPING_PATTERNS[pattern]
+        bar_ticks, cell_ticks = ChordEngine.measure_ticks(meter, tpb), max(1, round(cell_beats * tpb))
+        template = []
+        for cell_start in range(0, bar_ticks, cell_ticks):
+            for onset, length, accent, select in hits:
+                tick = cell_start + round(onset * tpb)
+                if tick < bar_ticks: template.append((tick, max(1, min(round(length * tpb), bar_ticks - tick)), accent, select))
+        template = ChordEngine.PATTERN_TEMPLATES[cache_key] = tuple(sorted(template, key=lambda hit: hit[0]))
+        return template
+
+    @staticmethod
+    def comp_fragment(fragment: 'ChordEngine.ChordFragment', pattern: str, meter: Tuple[int, int], tpb: int, slot_start: int,
+                      slot_ticks: int, voices: Optional[str] = None) -> Optional['ChordEngine.CompFragment']:
+        """Plays a full voicing with `pattern`'s hits inside one chord slot (`slot_start` ticks into the bar, `slot_ticks` long).
+
+        A slot that no hit falls in gets the pattern's first hit at its start,
+        so every chord change still sounds. `voices` keeps only that role's
+        notes afterwards. A repeated pitch is cut where it is struck again.
+        Returns None when nothing is left to play. Not cached here: chord_events
+        caches the result per chord symbol and slot in COMP_CACHE, so a long
+        chart costs one lookup per chord, as block chords do.
+        """
+        notes = fragment.notes
+        template = ChordEngine.pattern_template(pattern, meter, tpb)
+        slot_end = slot_start + slot_ticks
+        hits = [hit for hit in template if slot_start <= hit[0] < slot_end]
+        if not hits and template: hits = [(slot_start,) + template[0][1:]]
+        strum = max(1, round(theory_tables.COMPING_STRUM_BEATS * tpb))
+        # 아르페지오 순번은 칸마다 다시 셉니다: 마디 중간에 바뀐 코드도 베이스(또는 맨 윗음)부터 시작합니다.
+        steps = [hit[3] for hit in hits if type(hit[3]) is int]
+        step_shift = (steps[0] if steps[0] >= 0 else steps[0] + 1) if steps else 0
+        # 템플릿의 타점 × 보이싱의 음: 타점마다 고른 음을 한꺼번에 펼칩니다.
+        played = []
+        for tick, length, accent, select in hits:
+            on = tick - slot_start
+            off = min(on + length, slot_ticks)
+            velocity = max(1, min(127, round(fragment.velocity * accent)))
+            if select == 'strum' or select == 'strum_down':
+                order = notes if select == 'strum' else notes[::-1]
+                played.extend([on + k * strum, off, note, velocity] for k, note in enumerate(order) if on + k * strum < off)
+                continue
+            if select == 'all': chosen = notes
+            elif select == 'bass': chosen = notes[:1]
+            elif select == 'upper': chosen = notes[1:]
+            else: chosen = (notes[(select - step_shift) % len(notes)],)
+            played.extend([on, off, note, velocity] for note in chosen)
+        if voices: played = [p for p in played if p[2] in notes[ChordEngine.MIDI_VOICES[voices]]]
+        played.sort(key=lambda p: p[0])
+        sounding: Dict[int, list] = {}
+        for p in played:
+            previous = sounding.get(p[2])
+            if previous is not None and previous[1] > p[0]: previous[1] = p[0]
+            sounding[p[2]] = p
+        played = [p for p in played if p[1] > p[0]]
+        if not played: return None
+
+        note_on, note_off = ChordEngine.NOTE_ON, ChordEngine.NOTE_OFF
+        timeline = sorted([(on, 1, i, note_on, note, velocity) for i, (on, _, note, velocity) in enumerate(played)] +
+                          [(off, 0, i, note_off, note, 0) for i, (_, off, note, _) in enumerate(played)])
+        lead, last = timeline[0][0], timeline[-1][0]
+        vlq = ChordEngine._encode_vlq
+        body, events, cursor, running = bytearray(), [], lead, None
+        for tick, _, _, status, note, velocity in timeline:
+            if events: body += vlq(tick - cursor)
+            if status != running: body.append(status); running = status
+            body.append(note); body.append(velocity)
+            events.append((tick - cursor, status, note, velocity)); cursor = tick
+        return ChordEngine.CompFragment(tuple((on - lead, off - on, note, velocity) for on, off, note, velocity in played),
+                                        lead, last - lead, slot_ticks - last, bytes(body), tuple(events))
+
+    @staticmethod
+    def chord_events(measures: Iterable[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool,
+                     ticks_per_beat: int = 480, log: Optional[Callable[[str], None]] = None,
+                     voices: Optional[str] = None, start_ticks: int = 0, previous_chord: Optional[str] = None,
+                     bpm: Optional[float] = None, emit_timing: bool = True, progress: Optional[Callable[[int], None]] = None,
+                     pattern: Optional[str] = None):
+        """Like midi_note_events, but each chord is one (delta, CHORD, ChordFragment, duration) event instead of its notes.
+
+        With a comping `pattern` (a COMPING_PATTERNS name) each chord is a
+        (delta, COMP, CompFragment, 0) event instead; the slot's rest after
+        its last note_off is carried into the next delta as usual.
+        `progress`, if given, is called with 1 as each measure is reached; it may raise ExportCancelled to stop the export.
+        """
+        log = log or (lambda msg: None)
+        if pattern is not None and pattern not in ChordEngine.COMPING_PATTERNS: raise ValueError(f"Unknown comping pattern: {pattern}")
+        tpb = ticks_per_beat
+        chord_status, comp_status = ChordEngine.CHORD, ChordEngine.COMP
+        comp_cache, missing = ChordEngine.COMP_CACHE, LRUCache._MISSING
+        last_resolved_chord: Optional[str] = previous_chord
+        rest_ticks = start_ticks  # 아직 이벤트에 싣지 못한 쉼표 길이
+        meter, bar_ticks = ChordEngine.DEFAULT_METER, ChordEngine.measure_ticks(ChordEngine.DEFAULT_METER, tpb)
+        timing = None
+        for item in measures:
+            if progress is not None: progress(1)
+            txt, key = item[0], item[1]
+            if len(item) > 2 and item[2] is not timing:
+                timing = item[2]
+                changes, meter, bpm = ChordEngine._timing_changes(timing, meter, bpm)
+                bar_ticks = ChordEngine.measure_ticks(meter, tpb)
+                if emit_timing:
+                    for status, a, b in changes:
+                        yield (rest_ticks, status, a, b); rest_ticks = 0
+            txt = txt.strip()
+            if not txt:
+                rest_ticks += bar_ticks
+                continue
+
+            chord_tokens = ChordEngine.split_measure_text(txt)
+            durations = ChordEngine.duration_ticks_for_n(len(chord_tokens), tpb, meter)
+            if pattern is not None: slot_starts = tuple(itertools.accumulate(durations, initial=0))
+            for i, token in enumerate(chord_tokens):
+                resolved = token
+                if token == "%":
+                    resolved = last_resolved_chord
+                if not resolved:
+                    rest_ticks += durations[i]
+                    continue
+                if pattern is not None:
+                    comp_key = (resolved, key, omit5_on_conflict, omit_duplicated_bass, ChordEngine.NOTE_VELOCITY, voices, pattern, meter, tpb,
+                                slot_starts[i], durations[i])
+                    comp = comp_cache.get(comp_key, missing)
+                    if comp is missing:
+                        try:
+                            # 패턴의 'bass'/'upper' 는 전체 보이싱 기준이므로 역할 분리는 패턴을 입힌 뒤에 합니다.
+                            fragment = ChordEngine.chord_fragment(resolved, key, omit5_on_conflict, omit_duplicated_bass)
+                        except Exception as chord_err:
+                            log(f"Skipping invalid chord '{resolved}': {chord_err}")
+                            rest_ticks += durations[i]
+                            continue
+                        comp = ChordEngine.comp_fragment(fragment, pattern, meter, tpb, slot_starts[i], durations[i], voices) if fragment.notes else None
+                        comp_cache.put(comp_key, comp)
+                    last_resolved_chord = resolved
+                    if comp is None:
+                        rest_ticks += durations[i]
+                        continue
+                    yield (rest_ticks + comp.lead, comp_status, comp, 0)
+                    rest_ticks = comp.trail
+                    continue
+                try:
+                    fragment = ChordEngine.chord_fragment(resolved, key, omit5_on_conflict, omit_duplicated_bass, voices)
+                except Exception as chord_err:
+                    log(f"Skipping invalid chord '{resolved}': {chord_err}")
+                    rest_ticks += durations[i]
+                    continue
+                last_resolved_chord = resolved
+                if not fragment.notes:
+                    rest_ticks += durations[i]
+                    continue
+                yield (rest_ticks, chord_status, fragment, durations[i])
+                rest_ticks = 0
+        yield (rest_ticks, ChordEngine.END_OF_TRACK, 0, 0)
+
+    @staticmethod
+    def midi_note_events(measures: Iterable[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool,
+                         ticks_per_beat: int = 480, log: Optional[Callable[[str], None]] = None,
+                         voices: Optional[str] = None, start_ticks: int = 0, previous_chord: Optional[str] = None,
+                         bpm: Optional[float] = None, emit_timing: bool = True, pattern: Optional[str] = None):
+        """Yields (delta, status, note, velocity) events for (measure text, key[, Timing]) items, one bar each.
+
+        Bars last as long as their Timing's meter (4/4 without one). Where the
+        meter or tempo changes, TIME_SIGNATURE / SET_TEMPO meta events are
+        yielded at the bar line unless `emit_timing` is False; `bpm` is the
+        tempo already in effect. Empty measures, unplayable chords and '%' with
+        nothing to repeat are rests: their ticks are added to the delta of the
+        next event instead of being written as placeholder events. The last
+        event is always (ticks, END_OF_TRACK, 0, 0), so a trailing rest still
+        keeps its length. '%' repeats the last chord. `voices` ('bass' or
+        'upper', see MIDI_VOICES) keeps only that part of each voicing;
+        `start_ticks` delays the first event and `previous_chord` is what a
+        leading '%' repeats. `pattern` plays each chord with a comping pattern (see comp_fragment).
+        """
+        note_on, note_off, chord_status, comp_status = ChordEngine.NOTE_ON, ChordEngine.NOTE_OFF, ChordEngine.CHORD, ChordEngine.COMP
+        for delta, status, fragment, duration in ChordEngine.chord_events(measures, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat,
+                                                                          log, voices, start_ticks, previous_chord, bpm, emit_timing,
+                                                                          pattern=pattern):
+            if status == comp_status:
+                for j, (d, s, note_val, velocity) in enumerate(fragment.events):
+                    yield (delta if j == 0 else d, s, note_val, velocity)
+                continue
+            if status != chord_status:
+                yield (delta, status, fragment, duration)
+                continue
+            notes, velocity = fragment.notes, fragment.velocity
+            for j, note_val in enumerate(notes):
+                yield (delta if j == 0 else 0, note_on, note_val, velocity)
+            for j, note_val in enumerate(notes):
+                yield (duration if j == 0 else 0, note_off, note_val, 0)
+
+    @staticmethod
+    def render_midi(measures: Iterable[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool,
+                    initial_key: str = "C", ticks_per_beat: int = 480, bpm: float = 120,
+                    log: Optional[Callable[[str], None]] = None, pattern: Optional[str] = None):
+        """Renders (measure text, key[, Timing]) items into a single-track mido MidiFile (the reference export path)."""
+        from mido import Message, MidiFile, MidiTrack, MetaMessage, bpm2tempo
+
+        log = log or (lambda msg: None)
+        mid = MidiFile(ticks_per_beat=ticks_per_beat); track = MidiTrack(); mid.tracks.append(track)
+        tpb = mid.ticks_per_beat; track.append(MetaMessage('set_tempo', tempo=bpm2tempo(bpm)))
+        try:
+            track.append(MetaMessage("key_signature", key=initial_key))
+        except Exception:
+            log(f"Skipping key_signature for '{initial_key}' (unsupported)")
+
+        names = {ChordEngine.NOTE_ON: 'note_on', ChordEngine.NOTE_OFF: 'note_off'}
+        for delta, status, note, velocity in ChordEngine.midi_note_events(measures, omit5_on_conflict, omit_duplicated_bass, tpb, log, bpm=bpm,
+                                                                          pattern=pattern):
+            if status in names:
+                track.append(Message(names[status], note=note, velocity=velocity, time=delta))
+            elif status == ChordEngine.SET_TEMPO:
+                track.append(MetaMessage('set_tempo', tempo=note, time=delta))
+            elif status == ChordEngine.TIME_SIGNATURE:
+                track.append(MetaMessage('time_signature', numerator=note, denominator=velocity, time=delta))
+            else:
+                track.append(MetaMessage('end_of_track', time=delta))
+        return mid
+
+    @staticmethod
+    def _encode_vlq(value: int) -> bytes:
+        out = [value & 0x7F]
+        value >>= 7
+        while value:
+            out.append(0x80 | (value & 0x7F))
+            value >>= 7
+        return bytes(reversed(out))
+
+    @staticmethod
+    def _smf_header(n_tracks: int, ticks_per_beat: int) -> bytes:
+        if not 0 < ticks_per_beat < 0x8000: raise ValueError(f"ticks_per_beat out of range: {ticks_per_beat}")
+        return b'MThd' + (6).to_bytes(4, 'big') + (1).to_bytes(2, 'big') + n_tracks.to_bytes(2, 'big') + ticks_per_beat.to_bytes(2, 'big')
+
+    @staticmethod
+    def _smf_conductor_events(initial_key: str, bpm: float, log: Callable[[str], None]) -> bytes:
+        """The delta-0 set_tempo and key_signature meta events that open a file."""
+        tempo = int(round(60 * 1e6 / bpm))
+        if not 0 <= tempo <= 0xFFFFFF: raise ValueError(f"tempo out of range: {tempo}")
+        data = b'\x00\xff\x51\x03' + tempo.to_bytes(3, 'big')
+        signature = theory_tables.KEY_SIGNATURES.get(initial_key)
+        if signature is None:
+            log(f"Skipping key_signature for '{initial_key}' (unsupported)")
+            return data
+        return data + bytes((0x00, 0xFF, 0x59, 0x02, signature[0] & 0xFF, signature[1]))
+
+    @staticmethod
+    def _write_track_body(out, head: bytes, events) -> int:
+        """Writes `head` and the encoded chord_events / midi_note_events to `out` in SMF_WRITE_CHUNK pieces; returns the length."""
+        vlq_table = ChordEngine.SMF_VLQ_TABLE
+        if not vlq_table:
+            vlq_table = ChordEngine.SMF_VLQ_TABLE = tuple(ChordEngine._encode_vlq(n) for n in range(1 << 14))
+        data = bytearray(head)
+        # 같은 상태 바이트가 이어지면 생략합니다(running status). 메타 이벤트 뒤에는 다시 적어야 합니다.
+        running_status = None
+        n_vlq, chunk_size, end_of_track, set_tempo = len(vlq_table), ChordEngine.SMF_WRITE_CHUNK, ChordEngine.END_OF_TRACK, ChordEngine.SET_TEMPO
+        chord_status, comp_status, note_off = ChordEngine.CHORD, ChordEngine.COMP, ChordEngine.NOTE_OFF
+        track_len = 0
+        for delta, status, note, velocity in events:
+            data += vlq_table[delta] if delta < n_vlq else ChordEngine._encode_vlq(delta)
+            if status == running_status:
+                data.append(note); data.append(velocity)
+            elif status == chord_status:
+                # 미리 인코딩한 note_on 묶음 + 길이 + note_off 묶음을 그대로 이어 붙입니다.
+                data += note.on_bytes
+                data += vlq_table[velocity] if velocity < n_vlq else ChordEngine._encode_vlq(velocity)
+                data += note.off_bytes
+                running_status = note_off
+            elif status == comp_status:
+                # 패턴을 입힌 칸은 항상 note_on 으로 시작해 note_off 로 끝납니다.
+                data += note.body
+                running_status = note_off
+            elif status < 0x80:
+                if status == end_of_track:
+                    data += b'\xff\x2f\x00'
+                elif status == set_tempo:
+                    data += b'\xff\x51\x03'; data += note.to_bytes(3, 'big')
+                else:
+                    # 분모는 2의 지수로, 메트로놈 클릭은 4분음표당 24클럭 / 32분음표 8개(mido 기본값)
+                    data += bytes((0xFF, 0x58, 0x04, note, velocity.bit_length() - 1, 24, 8))
+                running_status = None
+            else:
+                data.append(status); data.append(note); data.append(velocity)
+                running_status = status
+            if len(data) >= chunk_size:
+                out.write(data); track_len += len(data); data.clear()
+        out.write(data); track_len += len(data)
+        if track_len > 0xFFFFFFFF: raise ValueError(f"track too long for a MIDI file: {track_len} bytes")
+        return track_len
+
+    @staticmethod
+    def _write_mtrk(f, head: bytes, events) -> int:
+        """Writes one MTrk chunk; the length is a placeholder patched by seeking back, or the body is buffered when `f` cannot seek."""
+        if f.seekable():
+            length_pos = f.tell() + 4
+            f.write(b'MTrk\x00\x00\x00\x00')
+            track_len = ChordEngine._write_track_body(f, head, events)
+            end = f.tell()
+            f.seek(length_pos); f.write(track_len.to_bytes(4, 'big')); f.seek(end)
+        else:
+            buf = io.BytesIO()
+            track_len = ChordEngine._write_track_body(buf, head, events)
+            f.write(b'MTrk' + track_len.to_bytes(4, 'big')); f.write(buf.getbuffer())
+        return 8 + track_len
+
+    @staticmethod
+    def write_smf(f, measures: Iterable[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool,
+                  initial_key: str = "C", ticks_per_beat: int = 480, bpm: float = 120,
+                  log: Optional[Callable[[str], None]] = None, progress: Optional[Callable[[int], None]] = None,
+                  pattern: Optional[str] = None) -> int:
+        """Streams the Standard MIDI File for (measure text, key[, Timing]) items into a binary file object; returns the bytes written.
+
+        Measures are consumed lazily and the track is flushed every
+        SMF_WRITE_CHUNK bytes, so memory stays flat however long the chart is.
+        The MTrk length is written as a placeholder and patched by seeking back
+        at the end; unseekable streams (pipes) get the track buffered instead.
+        `progress` is called once per measure and `pattern` picks a comping pattern (see chord_events).
+        """
+        log = log or (lambda msg: None)
+        header = ChordEngine._smf_header(1, ticks_per_beat)
+        head = ChordEngine._smf_conductor_events(initial_key, bpm, log)
+        f.write(header)
+        events = ChordEngine.chord_events(measures, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, log, bpm=bpm, progress=progress,
+                                          pattern=pattern)
+        return len(header) + ChordEngine._write_mtrk(f, head, events)
+
+    @staticmethod
+    def timing_events(measures: Iterable[tuple], ticks_per_beat: int = 480, bpm: Optional[float] = None):
+        """Yields just the TIME_SIGNATURE / SET_TEMPO changes midi_note_events would emit, then END_OF_TRACK (a conductor track)."""
+        meter, timing, pending = ChordEngine.DEFAULT_METER, None, 0
+        for item in measures:
+            if len(item) > 2 and item[2] is not timing:
+                timing = item[2]
+                changes, meter, bpm = ChordEngine._timing_changes(timing, meter, bpm)
+                for status, a, b in changes:
+                    yield (pending, status, a, b); pending = 0
+            pending += ChordEngine.measure_ticks(meter, ticks_per_beat)
+        yield (pending, ChordEngine.END_OF_TRACK, 0, 0)
+
+    @staticmethod
+    def chart_sections(parts: List[Dict[str, Any]]) -> List[Tuple[str, List[tuple]]]:
+        """Turns parts into (track name, [(measure text, key, Timing), ...]) sections for write_smf_tracks."""
+        return [(part.get('part') or f"Part {i + 1}", [(m, part.get('key') or 'C', timing) for m in part.get('measures', [])])
+                for i, (part, timing) in enumerate(zip(parts, ChordEngine.part_timings(parts)))]
+
+    @staticmethod
+    def _last_playable_chord(measures: List[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool) -> Optional[str]:
+        """The chord a '%' right after `measures` would repeat (the last symbol chord_events could voice), or None."""
+        for item in reversed(measures):
+            txt, key = item[0], item[1]
+            for token in reversed(ChordEngine.split_measure_text(txt.strip())):
+                if token == '%': continue
+                try:
+                    ChordEngine.chord_fragment(token, key, omit5_on_conflict, omit_duplicated_bass)
+                except Exception:
+                    continue
+                return token
+        return None
+
+    @staticmethod
+    def _smf_track_tasks(sections: List[Tuple[str, List[tuple]]], split: str, omit5_on_conflict: bool,
+                         omit_duplicated_bass: bool, ticks_per_beat: int, pattern: Optional[str] = None) -> List[tuple]:
+        if split == 'parts':
+            tasks, start, previous, meter = [], 0, None, ChordEngine.DEFAULT_METER
+            for name, measures in sections:
+                measures = list(measures)
+                tasks.append((name, measures, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, None, start, previous, pattern))
+                for item in measures:
+                    if len(item) > 2: meter = item[2].meter
+                    start += ChordEngine.measure_ticks(meter, ticks_per_beat)
+                # 파트 첫머리의 '%'는 한 트랙으로 내보낼 때처럼 앞 파트의 마지막 코드를 반복합니다.
+                previous = ChordEngine._last_playable_chord(measures, omit5_on_conflict, omit_duplicated_bass) or previous
+            return tasks
+        if split == 'roles':
+            measures = [m for _, section in sections for m in section]
+            return [(name, measures, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, voices, 0, None, pattern)
+                    for name, voices in ChordEngine.MIDI_ROLE_TRACKS]
+        raise ValueError(f"Unknown MIDI track mode: {split}")
+
+    @staticmethod
+    def _write_track_task(f, task: tuple, log: Callable[[str], None], progress: Optional[Callable[[int], None]] = None) -> int:
+        name, measures, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, voices, start_ticks, previous_chord, pattern = task
+        name_bytes = name.encode('utf-8')
+        head = b'\x00\xff\x03' + ChordEngine._encode_vlq(len(name_bytes)) + name_bytes
+        events = ChordEngine.chord_events(measures, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, log,
+                                          voices=voices, start_ticks=start_ticks, previous_chord=previous_chord, emit_timing=False,
+                                          progress=progress, pattern=pattern)
+        return ChordEngine._write_mtrk(f, head, events)
+
+    @staticmethod
+    def _encode_track_task(task: tuple) -> Tuple[bytes, List[str]]:
+        """Renders one MTrk chunk to bytes; the executor entry point, so warnings come back instead of being logged."""
+        buf, warnings = io.BytesIO(), []
+        ChordEngine._write_track_task(buf, task, warnings.append)
+        return buf.getvalue(), warnings
+
+    @staticmethod
+    def write_smf_tracks(f, sections: List[Tuple[str, List[tuple]]], omit5_on_conflict: bool, omit_duplicated_bass: bool,
+                         initial_key: str = "C", ticks_per_beat: int = 480, bpm: float = 120,
+                         log: Optional[Callable[[str], None]] = None, split: str = 'parts', executor=None,
+                         progress: Optional[Callable[[int], None]] = None, pattern: Optional[str] = None) -> int:
+        """Writes a type-1 file: a conductor track (key, tempo and meter changes) plus one named track per section ('parts') or per role ('roles').
+
+        Part tracks start at their section's position in the chart, so muting
+        one in a DAW leaves the others in time. Tracks are independent; pass a
+        concurrent.futures executor to render them concurrently (a process pool
+        pays off for long charts), otherwise they are streamed to `f` one by one.
+        `progress` counts measures per track ('roles' walks the chart twice);
+        with an executor it is told about each track as it completes.
+        Returns the bytes written.
+        """
+        log = log or (lambda msg: None)
+        tasks = ChordEngine._smf_track_tasks(sections, split, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, pattern)
+        header = ChordEngine._smf_header(1 + len(tasks), ticks_per_beat)
+        conductor = ChordEngine._smf_conductor_events(initial_key, bpm, log)
+        f.write(header)
+        total = len(header) + ChordEngine._write_mtrk(f, conductor, ChordEngine.timing_events(
+            (m for _, section in sections for m in section), ticks_per_beat, bpm))
+        if executor is None:
+            for task in tasks: total += ChordEngine._write_track_task(f, task, log, progress)
+            return total
+        for task, (chunk, warnings) in zip(tasks, executor.map(ChordEngine._encode_track_task, tasks)):
+            for w in warnings: log(w)
+            f.write(chunk); total += len(chunk)
+            if progress is not None: progress(len(task[1]))
+        return total
+
+    @staticmethod
+    def encode_smf(measures: Iterable[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool,
+                   initial_key: str = "C", ticks_per_beat: int = 480, bpm: float = 120,
+                   log: Optional[Callable[[str], None]] = None, pattern: Optional[str] = None) -> bytes:
+        """Encodes the same file as render_midi(...).save() straight into bytes, without mido message objects."""
+        buf = io.BytesIO()
+        ChordEngine.write_smf(buf, measures, omit5_on_conflict, omit_duplicated_bass, initial_key, ticks_per_beat, bpm, log, pattern=pattern)
+        return buf.getvalue()
+
+    @staticmethod
+    def export_midi(path: str, measures: Iterable[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool,
+                    initial_key: str = "C", ticks_per_beat: int = 480, bpm: float = 120,
+                    log: Optional[Callable[[str], None]] = None, backend: Optional[str] = None,
+                    progress: Optional[Callable[[int], None]] = None, pattern: Optional[str] = None) -> None:
+        """Writes a .mid file with the chosen backend ('native' streaming encoder by default, or the 'mido' reference)."""
+        backend = backend or ChordEngine.MIDI_EXPORT_BACKEND
+        if backend == 'mido':
+            ChordEngine.render_midi(measures, omit5_on_conflict, omit_duplicated_bass, initial_key, ticks_per_beat, bpm, log, pattern).save(path)
+        elif backend == 'native':
+            try:
+                with open(path, 'wb') as f:
+                    ChordEngine.write_smf(f, measures, omit5_on_conflict, omit_duplicated_bass, initial_key, ticks_per_beat, bpm, log,
+                                          progress, pattern)
+            except BaseException:
+                # 쓰다 만 파일(취소 포함)은 남기지 않습니다.
+                if os.path.exists(path): os.remove(path)
+                raise
+        else:
+            raise ValueError(f"Unknown MIDI export backend: {backend}")
+
+    @staticmethod
+    def export_midi_tracks(path: str, sections: List[Tuple[str, List[tuple]]], omit5_on_conflict: bool,
+                           omit_duplicated_bass: bool, initial_key: str = "C", ticks_per_beat: int = 480, bpm: float = 120,
+                           log: Optional[Callable[[str], None]] = None, split: str = 'parts', executor=None,
+                           progress: Optional[Callable[[int], None]] = None, pattern: Optional[str] = None) -> None:
+        """Writes a multi-track .mid file (see write_smf_tracks), removing it again if rendering fails."""
+        try:
+            with open(path, 'wb') as f:
+                ChordEngine.write_smf_tracks(f, sections, omit5_on_conflict, omit_duplicated_bass, initial_key, ticks_per_beat, bpm,
+                                             log, split, executor, progress, pattern)
+        except BaseException:
+            if os.path.exists(path): os.remove(path)
+            raise
+
+    # --- 차트 텍스트 ---
+    @staticmethod
+    def parse_chart_text(text: str) -> List[Dict[str, Any]]:
+        """Splits chart text ('[Part] (Key:X) (Tempo:96) (Time:7/8)' headers, '| a | b | c | d |' rows) into rows of up to four measures.
+
+        Tempo and Time tags land in the next row as 'tempo' / 'meter' strings.
+        """
+        rows: List[Dict[str, Any]] = []
+        current_part = ""
+        current_key_effective = ""
+        pending_row_key: Optional[str] = None
+        pending_timing: Dict[str, str] = {}
+        display_part_next_row = False
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            part_key_match = re.match(r"^\[(?P<part>[^\]]*)\]\s*(?P<rest>.*)$", line)
+            if part_key_match:
+                part_text = part_key_match.group("part").strip()
+                rest = part_key_match.group("rest").strip()
+                comment = re.sub(r"\(\s*(?:Key|Tempo|Time)\s*:\s*[^\)]+\)", "", rest).strip()
+                current_part = (f"{part_text} {comment}".strip()) if comment else part_text
+                pending_timing = ChordEngine._chart_timing_tags(rest)
+                key_match = re.search(r"\(\s*Key\s*:\s*([^\)]+)\)", rest)
+                if key_match:
+                    current_key_effective = key_match.group(1).strip()
+                    pending_row_key = current_key_effective
+                else:
+                    pending_row_key = None
+                display_part_next_row = True
+                continue
+            key_only_match = re.match(r"^\(\s*Key\s*:\s*([^\)]+)\)\s*$", line)
+            if key_only_match:
+                current_key_effective = key_only_match.group(1).strip()
+                pending_row_key = current_key_effective
+                continue
+            if re.fullmatch(r"(?:\(\s*(?:Tempo|Time)\s*:\s*[^\)]+\)\s*)+", line):
+                pending_timing.update(ChordEngine._chart_timing_tags(line))
+                continue
+            if line.startswith('|'):
+                segments = [seg.strip() for seg in line.strip('|').split('|')]
+                while len(segments) < 4:
+                    segments.append("")
+                rows.append({
+                    "part": current_part if display_part_next_row else "",
+                    "key": (pending_row_key or ""),
+                    "measures": segments[:4],
+                    **pending_timing,
+                })
+                if pending_row_key is not None:
+                    current_key_effective = pending_row_key
+                pending_row_key = None
+                pending_timing = {}
+                display_part_next_row = False
+                continue
+        return rows
+
+    @staticmethod
+    def _chart_timing_tags(text: str) -> Dict[str, str]:
+        tags = {}
+        for name, value in re.findall(r"\(\s*(Tempo|Time)\s*:\s*([^\)]+)\)", text):
+            tags['tempo' if name == 'Tempo' else 'meter'] = value.strip()
+        return tags
+
+    @staticmethod
+    def group_chart_rows(parsed_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merges parse_chart_text rows into parts ({'part', 'key', 'measures'} plus any 'tempo' / 'meter'); empty parts are dropped."""
+        new_parts_data: List[Dict[str, Any]] = []
+        current_part_data: Optional[Dict[str, Any]] = None
+
+        def commit_part():
+            if current_part_data:
+                # Clean up trailing empty measures
+                while current_part_data["measures"] and not current_part_data["measures"][-1]:
+                    current_part_data["measures"].pop()
+                # Only add part if it has content
+                if current_part_data["measures"]:
+                    new_parts_data.append(current_part_data)
+
+        last_key = "C"
+        for row in parsed_rows:
+            is_new_part = bool(row.get("part"))
+            if not is_new_part and row.get("key") and current_part_data:
+                 if row.get("key") != current_part_data.get("key"):
+                     is_new_part = True
+            if not is_new_part and current_part_data and (row.get("tempo") or row.get("meter")):
+                is_new_part = True
+
+            if is_new_part or not current_part_data:
+                commit_part()
+                current_part_data = {
+                    "part": row.get("part", ""),
+                    "key": row.get("key", "") or last_key,
+                    "measures": []
+                }
+                for field in ("tempo", "meter"):
+                    if row.get(field): current_part_data[field] = row[field]
+            
+            if current_part_data:
+                current_part_data["measures"].extend(row.get("measures", []))
+                last_key = current_part_data["key"]
+
+        commit_part()
+        return new_parts_data
+
+    @staticmethod
+    def chart_measures(parts: List[Dict[str, Any]]) -> List[tuple]:
+        """Flattens parts into the (measure text, key, Timing) items render_midi expects."""
+        return [(m, part.get('key') or 'C', timing) for part, timing in zip(parts, ChordEngine.part_timings(parts))
+                for m in part.get('measures', [])]
+
+    @staticmethod
+    def format_chart_text(parts: List[Dict[str, Any]]) -> str:
+        """Writes parts ({'part', 'key', 'measures'} plus optional 'tempo' / 'meter') as chart text, four measures per row."""
+        lines: List[str] = []
+        for part_data in parts:
+            part_name = (part_data.get('part') or '').strip()
+            key = (part_data.get('key') or '').strip()
+
+            header_bits: List[str] = []
+            if part_name:
+                header_bits.append(f"[{part_name}]")
+            if key:
+                header_bits.append(f"(Key:{key})")
+            if part_data.get('tempo'):
+                header_bits.append(f"(Tempo:{part_data['tempo']})")
+            if part_data.get('meter'):
+                header_bits.append(f"(Time:{part_data['meter']})")
+
+            if header_bits:
+                lines.append(" ".join(header_bits).strip())
+
+            measures = part_data.get('measures', [])
+            for i in range(0, len(measures), 4):
+                chunk = measures[i:i+4]
+                measure_line = " | ".join(m.strip() for m in chunk)
+                lines.append(f"| {measure_line} |")
+
+            lines.append("")
+        return "\n".join(lines).rstrip() + "\n"
+
+    # --- 코드 인식 ---
+    # 빌더가 만들 수 있는 모든 코드(QUALITY_SYMBOLS x TENSIONS_LIST 조합, 6 포함)를 모든 베이스 위에서 보이싱해
+    # 베이스 기준 12비트 피치클래스 마스크 -> 코드로 역색인합니다. 색인은 5음 생략 설정마다 따로 두어 알아본 코드가 같은 설정으로
+    # 다시 내보내면 같은 음을 내게 하고, 반대 설정의 보이싱은 비어 있는 마스크만 채웁니다.
+    # 한 마스크에 여러 코드가 겹치면 표기가 가장 짧은(= 가장 단순한) 코드를 남기고, 자리바꿈('/베이스')은 그만큼 길게 칩니다.
+    # 조회는 배열 인덱싱 한 번입니다.
+    RECOGNITION_TENSIONS = ('6',) + tuple(theory_tables.TENSIONS_LIST)
+    RECOGNITION_SLASH_COST = 3          # '/E' 처럼 베이스를 따로 적는 값: 같은 값이면 기본 자리 코드가 이깁니다
+    RECOGNITION_MISSING_COST = 2        # 색인에 맞추려고 울리지 않은 음 하나를 더할 때 (예: 5음 생략)
+    RECOGNITION_EXTRA_COST = 3          # 울린 음 하나를 빼고 맞출 때 (예: 지나가는 음)
+    RECOGNITION_UNKNOWN_COST = 50       # 한 음 차이로도 맞는 코드가 없는 칸: 나눠서라도 알아보는 쪽을 고릅니다
+    RECOGNITION_CHANGE_COST = 0.5       # 마디 안의 코드 하나마다: 같은 값이면 코드 수가 적은 해석을 고릅니다
+    RECOGNITION_CHANGE_EVIDENCE_COST = 8  # 한 칸 안에 서로 다른 화음을 친 어택이 있을 때마다: 그 칸에서 코드가 바뀌었다는 뜻입니다
+    RECOGNITION_MAX_CHORDS = 8          # 마디 하나를 나눠 볼 최대 코드 수 (박 수를 넘지 않음)
+    RECOGNITION_NEIGHBOR_ORDER = (7, 3, 4, 10, 11, 9, 2, 5, 6, 8, 1)  # 베이스 위 음정
+    CHORD_INDEX: Dict[bool, Tuple[Optional['ChordEngine.ChordMatch'], ...]] = {}
+    _CHORD_INDEX_LOCK = threading.Lock()
+
+    class ChordMatch(NamedTuple):
+        cost: int                           # 표기 길이(근음 제외, 자리바꿈 포함): 작을수록 단순한 코드
+        root_above_bass: int
+        chord: 'ChordEngine.ParsedChord'    # 근음 C 기준, 베이스 없음 (실제 근음과 베이스는 chord_symbol_for 에서 채움)
+
+    @staticmethod
+    def chord_index(omit5_on_conflict: bool) -> Tuple[Optional['ChordEngine.ChordMatch'], ...]:
+        """The recognition index: bass-relative pitch-class mask (bit 0 = bass) -> simplest ChordMatch, built on first use."""
+        index = ChordEngine.CHORD_INDEX.get(omit5_on_conflict)
+        if index is not None: return index
+        with ChordEngine._CHORD_INDEX_LOCK:
+            index = ChordEngine.CHORD_INDEX.get(omit5_on_conflict)
+            if index is None:
+                primary, other = (ChordEngine._build_chord_index(omit5) for omit5 in (omit5_on_conflict, not omit5_on_conflict))
+                index = ChordEngine.CHORD_INDEX[omit5_on_conflict] = tuple(a if a is not None else b for a, b in zip(primary, other))
+        return index
+
+    @staticmethod
+    def _build_chord_index(omit5_on_conflict: bool) -> List[Optional['ChordEngine.ChordMatch']]:
+        # 조합 수천 개가 사용자의 파싱/표기 캐시를 밀어내지 않도록 캐시를 거치지 않는 경로로 만듭니다.
+        chords: Dict[str, 'ChordEngine.ParsedChord'] = {}
+        for quality in ChordEngine.QUALITY_SYMBOLS:
+            for n in range(len(ChordEngine.RECOGNITION_TENSIONS) + 1):
+                for selected in itertools.combinations(ChordEngine.RECOGNITION_TENSIONS, n):
+                    parsed = ChordEngine._parse_chord_symbol_uncached(ChordEngine.builder_symbol('C', quality, selected), 'C')
+                    chords.setdefault(ChordEngine._build_string_from_parsed_uncached(parsed, False, 'C'), parsed)
+
+        index: List[Optional[ChordEngine.ChordMatch]] = [None] * (PitchClassSet.FULL + 1)
+        # 표기가 짧은 코드부터 넣고 더 싼 코드만 덮어쓰므로, 같은 값이면 기본 자리 코드와 먼저 나온 코드가 남습니다.
+        # 같은 길이면 텐션이 적은 코드가 앞섭니다 (Cdim7 > Cdim6).
+        ordered = sorted(chords.items(), key=lambda item: (len(item[0]), len(item[1].tensions) + len(item[1].paren_contents), item[0]))
+        for slash in (False, True):
+            for text, parsed in ordered:
+                cost = len(text) - 1 + (ChordEngine.RECOGNITION_SLASH_COST if slash else 0)
+                for bass_pc in (range(1, 12) if slash else (0,)):
+                    chord = parsed
+                    if slash and parsed.quality == 'blk':
+                        # blk 은 베이스에 따라 모양이 달라지므로 그 베이스를 적어 보이싱합니다.
+                        name = ChordEngine.NOTE_NAMES_SHARP[bass_pc]
+                        chord = parsed._replace(bass_note=name, bass_note_str=name)
+                    mask = int(PitchClassSet.from_pcs(ChordEngine.build_voicing(chord, omit5_on_conflict, False)) | 1 << bass_pc)
+                    mask = int(PitchClassSet(mask).transpose(-bass_pc))
+                    entry = index[mask]
+                    if entry is None or cost < entry.cost: index[mask] = ChordEngine.ChordMatch(cost, -bass_pc % 12, parsed)
+        return index
+
+    @staticmethod
+    def recognize_chord(pcs: int, bass_pc: int, omit5_on_conflict: bool = True) -> Optional[Tuple[int, 'ChordEngine.ChordMatch']]:
+        """Matches a sounding pitch-class mask over `bass_pc` against chord_index: (cost, match), or None.
+
+        An exact match (which plays back the same pitch classes) costs its
+        ChordMatch.cost. Otherwise the cheapest chord one pitch class away is
+        returned with RECOGNITION_MISSING_COST / RECOGNITION_EXTRA_COST added;
+        the bass itself is never dropped.
+        """
+        index = ChordEngine.chord_index(omit5_on_conflict)
+        mask = int(PitchClassSet(pcs | 1 << bass_pc).transpose(-bass_pc))
+        match = index[mask]
+        if match is not None: return match.cost, match
+        best = None
+        # 빠지기 쉬운 음(5음, 3음, 7음 ...)부터 살펴서 값이 같으면 그쪽을 고릅니다.
+        for pc in ChordEngine.RECOGNITION_NEIGHBOR_ORDER:
+            bit = 1 << pc
+            match = index[mask ^ bit]
+            if match is None: continue
+            cost = match.cost + (ChordEngine.RECOGNITION_EXTRA_COST if mask & bit else ChordEngine.RECOGNITION_MISSING_COST)
+            if best is None or cost < best[0]: best = (cost, match)
+        return best
+
+    @staticmethod
+    def chord_symbol_for(match: 'ChordEngine.ChordMatch', bass_pc: int, key: str, is_roman: bool = False) -> str:
+        """Spells a recognized chord over `bass_pc` in `key`, as a letter symbol or a degree."""
+        spelling = ChordEngine.KEY_SPELLINGS.get(key) or theory_tables.NOTE_NAMES_SHARP
+        root = spelling[(bass_pc + match.root_above_bass) % 12]
+        parsed = match.chord._replace(root=root, roman_symbol=root)
+        if match.root_above_bass:
+            bass = spelling[bass_pc]
+            parsed = parsed._replace(bass_note=bass, bass_note_str=bass)
+        text = ChordEngine.build_string_from_parsed(parsed, False, key)
+        # 도수 표기는 모드 전환과 같은 경로로 바꿔 슬래시 베이스도 똑같이 적습니다.
+        return ChordEngine.canonicalize(text, key, True) if is_roman else text
+
+    # --- MIDI 불러오기 ---
+    # 트랙 청크를 SMF_READ_CHUNK 씩 읽으며 바로 해석하므로, 파일이 커도 메시지 객체 없이 음 열(시작, 끝, 음높이)만 남습니다.
+    SMF_READ_CHUNK = 1 << 16
+    SMF_DRUM_CHANNEL = 9
+    MARKER = 0x06
+    KEY_SIGNATURE = 0x59
+    KEY_BY_SIGNATURE = {sf: name for name, (sf, minor) in theory_tables.KEY_SIGNATURES.items() if not minor}  # 단조 조표는 나란한조로
+
+    class MidiNotes(NamedTuple):
+        ticks_per_beat: int
+        starts: array                                # 'q'
+        ends: array                                  # 'q'
+        pitches: array                               # 'B'
+        tempos: List[Tuple[int, float]]              # (틱, BPM)
+        meters: List[Tuple[int, Tuple[int, int]]]    # (틱, (분자, 분모))
+        keys: List[Tuple[int, str]]                  # (틱, 장조 이름): 단조 조표는 나란한조로 읽습니다
+        markers: List[Tuple[int, str]]               # (틱, 마커 글자)
+        pc_weights: List[int]                        # 피치클래스마다 울린 틱 합 (조표가 없을 때 조 추정용)
+
+    @staticmethod
+    def read_midi_notes(f, tracks: Optional[Iterable[int]] = None) -> 'ChordEngine.MidiNotes':
+        """Reads the notes and tempo / meter / key / marker events of a standard MIDI file (a path or a binary file).
+
+        `tracks` limits which track indexes contribute notes; drums (channel 10) are always skipped.
+        """
+        if isinstance(f, (str, os.PathLike)):
+            with open(f, 'rb') as fh: return ChordEngine.read_midi_notes(fh, tracks)
+        header = f.read(8)
+        if len(header) < 8 or header[:4] != b'MThd': raise ValueError("Not a standard MIDI file")
+        header = f.read(int.from_bytes(header[4:], 'big'))
+        if len(header) < 6: raise ValueError("Truncated MIDI header")
+        division = int.from_bytes(header[4:6], 'big')
+        if division & 0x8000 or not division: raise ValueError("SMPTE time division is not supported")
+        notes = ChordEngine.MidiNotes(division, array('q'), array('q'), array('B'), [], [], [], [], [0] * 12)
+        wanted = None if tracks is None else set(tracks)
+        track = 0
+        # 헤더의 트랙 수는 믿지 않고 파일 끝까지 청크를 읽습니다. 모르는 청크는 건너뜁니다.
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8: break
+            length = int.from_bytes(chunk[4:], 'big')
+            if chunk[:4] != b'MTrk':
+                f.read(length); continue
+            ChordEngine._read_smf_track(f, length, notes, wanted is None or track in wanted)
+            track += 1
+        return notes
+
+    @staticmethod
+    def _read_smf_track(f, length: int, notes: 'ChordEngine.MidiNotes', keep_notes: bool) -> None:
+        starts, ends, pitches, weights = notes.starts, notes.ends, notes.pitches, notes.pc_weights
+        read_chunk = ChordEngine.SMF_READ_CHUNK
+        remaining = length
+        buf, pos = b'', 0
+        tick, running = 0, 0
+        sounding: Dict[int, int] = {}  # (채널 << 7 | 음) -> 시작 틱
+
+        def close(key: int, start: int) -> None:
+            if tick <= start: return
+            starts.append(start); ends.append(tick); pitches.append(key & 0x7F)
+            weights[(key & 0x7F) % 12] += tick - start
+
+        try:
+            while True:
+                # 한 이벤트의 머리(델타 4 + 상태 1 + 데이터 2, 메타는 종류 1 + 길이 4)는 16바이트를 넘지 않습니다.
+                if len(buf) - pos < 16 and remaining:
+                    data = f.read(min(read_chunk, remaining))
+                    remaining = remaining - len(data) if data else 0
+                    buf, pos = buf[pos:] + data, 0
+                if pos >= len(buf): break
+                delta = 0
+                while True:
+                    byte = buf[pos]; pos += 1
+                    delta = (delta << 7) | (byte & 0x7F)
+                    if byte < 0x80: break
+                tick += delta
+                status = buf[pos]
+                if status & 0x80:
+                    pos += 1
+                    if status < 0xF0: running = status
+                elif running:
+                    status = running
+                else:
+                    raise ValueError("MIDI data byte without a status")
+                kind = status & 0xF0
+                if kind == 0x90 or kind == 0x80:
+                    note, velocity = buf[pos], buf[pos + 1]; pos += 2
+                    if not keep_notes or status & 0x0F == ChordEngine.SMF_DRUM_CHANNEL: continue
+                    key = (status & 0x0F) << 7 | note
+                    # 같은 음을 끄지 않고 다시 치면 앞의 음을 거기서 끝냅니다.
+                    start = sounding.pop(key, None)
+                    if start is not None: close(key, start)
+                    if kind == 0x90 and velocity: sounding[key] = tick
+                elif kind == 0xC0 or kind == 0xD0:
+                    pos += 1
+                elif kind != 0xF0:
+                    pos += 2
+                elif status == 0xFF or status == 0xF0 or status == 0xF7:
+                    meta = -1
+                    if status == 0xFF: meta = buf[pos]; pos += 1
+                    size = 0
+                    while True:
+                        byte = buf[pos]; pos += 1
+                        size = (size << 7) | (byte & 0x7F)
+                        if byte < 0x80: break
+                    while len(buf) - pos < size and remaining:
+                        data = f.read(min(max(read_chunk, size), remaining))
+                        remaining = remaining - len(data) if data else 0
+                        buf, pos = buf[pos:] + data, 0
+                    payload = buf[pos:pos + size]; pos += size
+                    if len(payload) < size: raise IndexError
+                    if meta == ChordEngine.END_OF_TRACK: break
+                    if meta == ChordEngine.SET_TEMPO and size == 3:
+                        notes.tempos.append((tick, 60e6 / max(1, int.from_bytes(payload, 'big'))))
+                    elif meta == ChordEngine.TIME_SIGNATURE and size >= 2 and payload[0] and payload[1] < 8:
+                        notes.meters.append((tick, (payload[0], 1 << payload[1])))
+                    elif meta == ChordEngine.KEY_SIGNATURE and size == 2:
+                        key_name = ChordEngine.KEY_BY_SIGNATURE.get(payload[0] - 256 if payload[0] > 127 else payload[0])
+                        if key_name: notes.keys.append((tick, key_name))
+                    elif meta == ChordEngine.MARKER:
+                        notes.markers.append((tick, payload.decode('latin-1').strip()))
+                else:
+                    raise ValueError(f"Unexpected MIDI status byte 0x{status:02X}")
+        except IndexError:
+            raise ValueError("Truncated MIDI track") from None
+        if remaining: f.read(remaining)
+        # 트랙 끝까지 꺼지지 않은 음은 트랙 끝에서 닫습니다.
+        for key, start in sounding.items(): close(key, start)
+
+    @staticmethod
+    def estimate_key(pc_weights: List[int]) -> str:
+        """The major key whose scale holds the most sounding time; ties go to the key with fewer accidentals."""
+        names = ChordEngine.KEY_BY_PC[False]
+        candidates = sorted(range(12), key=lambda pc: abs(theory_tables.KEY_SIGNATURES[names[pc]][0]))
+        best = max(candidates, key=lambda pc: sum(pc_weights[p] for p in ChordEngine.MAJOR_SCALE_PCS.transpose(pc)))
+        return names[best]
+
+    @staticmethod
+    def _measure_chords(notes: List[Tuple[int, int, int]], start: int, meter: Tuple[int, int], tpb: int,
+                        omit5_on_conflict: bool) -> List[Optional[Tuple['ChordEngine.ChordMatch', int]]]:
+        """Splits one measure into the chord slots that explain its notes at the lowest cost; None marks a slot to hold ('%')."""
+        tolerance = tpb // 8  # 앞 칸에서 이만큼 이하로 걸쳐 울리는 음은 레가토로 보고 무시합니다
+        notes = [n for n in notes if n[0] >= start or n[1] - start > tolerance]
+        if not notes: return []
+        # 어택(스트럼처럼 거의 동시에 시작하는 음 묶음)마다 그때 울리는 화음(피치클래스, 가장 낮은 음)을 구합니다.
+        # 한 칸 안에 서로를 포함하지 않는 화음이나 다른 베이스가 있으면 그 칸을 나눠야 한다는 증거입니다.
+        # 아르페지오처럼 한 음씩 치는 어택은 화음 대신, 앞뒤보다 낮은 음(한 번 훑을 때의 바닥)만 베이스로 씁니다.
+        attack_window = tpb // 16
+        clusters: List[List[int]] = []
+        for t in sorted({n[0] for n in notes if n[0] >= start}):
+            if clusters and t - clusters[-1][1] <= attack_window: clusters[-1][1] = t
+            else: clusters.append([t, t])
+        onsets, attacks, singles = [], [], []
+        for first, last in clusters:
+            sounding = [p for s, e, p in notes if s <= first < e or first <= s <= last]
+            mask = int(PitchClassSet.from_pcs(sounding))
+            if len(PitchClassSet(mask)) < 2: singles.append((first, min(sounding))); continue
+            onsets.append(first); attacks.append((mask, min(sounding) % 12))
+        for i, (t, pitch) in enumerate(singles):
+            if (i == 0 or pitch < singles[i - 1][1]) and (i + 1 == len(singles) or pitch <= singles[i + 1][1]):
+                onsets.append(t); attacks.append((0, pitch % 12))
+        if singles: attacks = [a for _, a in sorted(zip(onsets, attacks))]; onsets.sort()
+        best_cost, best = None, []
+        for n in range(1, min(meter[0], ChordEngine.RECOGNITION_MAX_CHORDS) + 1):
+            cost, slots = n * ChordEngine.RECOGNITION_CHANGE_COST, []
+            slot_start = start
+            for duration in ChordEngine.duration_ticks_for_n(n, tpb, meter):
+                slot_end = slot_start + duration
+                pcs, low = 0, 128
+                for s, e, p in notes:
+                    if s < slot_end and e > slot_start and (s >= slot_start or e - slot_start > tolerance):
+                        pcs |= 1 << p % 12
+                        if p < low: low = p
+                if not pcs:
+                    slots.append(None)
+                else:
+                    inside = attacks[bisect.bisect_left(onsets, slot_start):bisect.bisect_left(onsets, slot_end)]
+                    if len(inside) > 1:
+                        masks = {mask for mask, _ in inside if mask}
+                        chords = sum(1 for m in masks if not any(m != o and m & o == m for o in masks))
+                        cost += (max(0, chords - 1) + len({bass for _, bass in inside}) - 1) * ChordEngine.RECOGNITION_CHANGE_EVIDENCE_COST
+                    found = ChordEngine.recognize_chord(pcs, low % 12, omit5_on_conflict)
+                    if found is None:
+                        cost += ChordEngine.RECOGNITION_UNKNOWN_COST; slots.append(None)
+                    else:
+                        cost += found[0]; slots.append((found[1], low % 12))
+                slot_start = slot_end
+                if best_cost is not None and cost >= best_cost: break
+            else:
+                if best_cost is None or cost < best_cost: best_cost, best = cost, slots
+        return best
+
+    @staticmethod
+    def midi_chart(notes: 'ChordEngine.MidiNotes', omit5_on_conflict: bool = True, is_roman: bool = False,
+                   key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recognizes the chords of read_midi_notes output measure by measure and returns chart parts.
+
+        Measures follow the file's time signatures. A new part starts at every
+        marker (named after it; other parts are numbered) and at every key,
+        tempo or meter change, as in group_chart_rows.
+        Without `key`, key signatures are used, or else estimate_key.
+        """
+        tpb = notes.ticks_per_beat
+        starts, ends, pitches = notes.starts, notes.ends, notes.pitches
+        default_key = key or (notes.keys[0][1] if notes.keys and notes.keys[0][0] == 0 else None) or ChordEngine.estimate_key(notes.pc_weights)
+        key_changes = [] if key else notes.keys
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        end_tick = max(ends, default=0)
+        symbols: Dict[tuple, str] = {}
+        parts: List[Dict[str, Any]] = []
+        meter, bpm, measure_key = ChordEngine.DEFAULT_METER, None, default_key
+        cursors = {'meter': 0, 'tempo': 0, 'key': 0, 'marker': 0}
+
+        def advance(name: str, events: list, tick: int):
+            value = None
+            while cursors[name] < len(events) and events[cursors[name]][0] < tick:
+                value = events[cursors[name]][1]; cursors[name] += 1
+            return value
+
+        i, active = 0, []
+        measure_start = 0
+        while measure_start < end_tick:
+            # 마디 중간의 박자/템포/조 변화는 다음 마디 첫머리에 적용합니다.
+            new_meter = advance('meter', notes.meters, measure_start + 1)
+            new_bpm = advance('tempo', notes.tempos, measure_start + 1)
+            new_key = advance('key', key_changes, measure_start + 1)
+            measure_end = measure_start + ChordEngine.measure_ticks(new_meter or meter, tpb)
+            marker = advance('marker', notes.markers, measure_end)
+            fields = {}
+            if new_meter is not None and new_meter != meter:
+                meter = new_meter; fields['meter'] = f"{meter[0]}/{meter[1]}"
+            if new_bpm is not None and (bpm is None or round(new_bpm, 2) != round(bpm, 2)):
+                bpm = new_bpm; fields['tempo'] = f"{round(bpm, 2):g}"
+            if new_key is not None: measure_key = new_key
+            if not parts or fields or marker or measure_key != parts[-1]['key']:
+                # 차트 머리는 [이름] 뒤에서만 읽히므로, 마커가 없는 파트에는 MIDI 내보내기처럼 번호 이름을 붙입니다.
+                parts.append({'part': marker or f"Part {len(parts) + 1}", 'key': measure_key, 'measures': [], **fields})
+
+            current = [n for n in active if n[1] > measure_start]
+            while i < len(order) and starts[order[i]] < measure_end:
+                j = order[i]; current.append((starts[j], ends[j], pitches[j])); i += 1
+            active = current
+            tokens = []
+            for slot in ChordEngine._measure_chords(current, measure_start, meter, tpb, omit5_on_conflict):
+                if slot is None: tokens.append('%'); continue
+                symbol_key = slot + (measure_key,)
+                symbol = symbols.get(symbol_key)
+                if symbol is None: symbol = symbols[symbol_key] = ChordEngine.chord_symbol_for(*slot, measure_key, is_roman)
+                tokens.append(symbol)
+            parts[-1]['measures'].append(" ".join(tokens))
+            measure_start = measure_end
+        return parts
+
+    @staticmethod
+    def import_midi(f, omit5_on_conflict: bool = True, is_roman: bool = False, key: Optional[str] = None,
+                    tracks: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """Reads a MIDI file (path or binary file) and returns its chords as chart parts; see read_midi_notes and midi_chart."""
+        return ChordEngine.midi_chart(ChordEngine.read_midi_notes(f, tracks), omit5_on_conflict, is_roman, key)
+
+ChordEngine.VOICING_CHORD_TONES, ChordEngine.VOICING_UPPER_PLACEMENTS, ChordEngine.VOICING_BLK_SHAPES = ChordEngine._build_voicing_tables()
+ChordEngine.VOICING_SHAPE_INDEX = {key: i for i, key in enumerate(ChordEngine.VOICING_CHORD_TONES)}
+
+
+class CompiledScore:
+    """A chart compiled once into columnar note arrays, shared by the MIDI writer, live playback and the audio preview.
+
+    One row per note, in playing order: `start` (absolute tick), `duration`,
+    `pitch`, `velocity` and `part` are parallel arrays. The rows of one chord
+    are contiguous: chord i owns rows `chord_rows[i]:chord_rows[i + 1]` and
+    `fragments[i]` is its pre-encoded ChordFragment (a CompFragment when a
+    comping pattern was applied; its rows then start at different ticks). Measure m starts at
+    `measure_ticks[m]` and owns chords `measure_chords[m]:measure_chords[m + 1]`
+    (both arrays end with a sentinel, so `measure_ticks[-1]` is the length).
+    `timing` holds the (tick, status, a, b) tempo/meter changes at bar lines;
+    `bpm` is the tempo before the first of them.
+    """
+
+    def __init__(self, ticks_per_beat: int, bpm: float):
+        self.ticks_per_beat = ticks_per_beat
+        self.bpm = bpm
+        self.start, self.duration = array('q'), array('q')
+        self.pitch, self.velocity, self.part = array('B'), array('B'), array('H')
+        self.chord_rows, self.fragments = array('q'), []
+        self.measure_ticks, self.measure_chords = array('q'), array('q')
+        self.timing: List[Tuple[int, int, int, int]] = []
+        self.warnings: List[str] = []
+        # (틱, 초, 틱당 초) 템포 구간; seconds_at 이 이분 탐색합니다.
+        self._tempo_segments: List[Tuple[int, float, float]] = [(0, 0.0, 60.0 / (bpm * ticks_per_beat))]
+
+    def __len__(self) -> int:
+        return len(self.pitch)
+
+    @property
+    def length(self) -> int:
+        return self.measure_ticks[-1] if self.measure_ticks else 0
+
+    def seconds_at(self, tick: int) -> float:
+        """Wall-clock seconds from the start of the chart to `tick`, following the tempo changes."""
+        segments = self._tempo_segments
+        seg_tick, seg_sec, spt = segments[bisect.bisect_right(segments, (tick, math.inf, math.inf)) - 1]
+        return seg_sec + (tick - seg_tick) * spt
+
+    def chord_events(self):
+        """The chart as ChordEngine.chord_events would yield it, read back from the arrays instead of re-voiced."""
+        chord_status, comp_status, comp_type = ChordEngine.CHORD, ChordEngine.COMP, ChordEngine.CompFragment
+        timing, fragments = self.timing, self.fragments
+        starts, durations, chord_rows = self.start, self.duration, self.chord_rows
+        t, n_timing = 0, len(timing)
+        cursor = 0
+        for i, fragment in enumerate(fragments):
+            row = chord_rows[i]
+            start = starts[row]
+            # 마디 머리의 박자/템포 변경은 그 마디의 첫 코드보다 먼저 나옵니다.
+            while t < n_timing and timing[t][0] <= start:
+                tick, status, a, b = timing[t]; t += 1
+                yield (tick - cursor, status, a, b); cursor = tick
+            if type(fragment) is comp_type:
+                yield (start - cursor, comp_status, fragment, 0)
+                cursor = start + fragment.span
+            else:
+                yield (start - cursor, chord_status, fragment, durations[row])
+                cursor = start + durations[row]
+        for tick, status, a, b in timing[t:]:
+            yield (tick - cursor, status, a, b); cursor = tick
+        yield (self.length - cursor, ChordEngine.END_OF_TRACK, 0, 0)
+
+    def write_smf(self, f, initial_key: str = "C", log: Optional[Callable[[str], None]] = None) -> int:
+        """Writes the score as the same single-track file ChordEngine.write_smf produces; returns the bytes written."""
+        header = ChordEngine._smf_header(1, self.ticks_per_beat)
+        head = ChordEngine._smf_conductor_events(initial_key, self.bpm, log or (lambda msg: None))
+        f.write(header)
+        return len(header) + ChordEngine._write_mtrk(f, head, self.chord_events())
+
+    def export(self, path: str, initial_key: str = "C", log: Optional[Callable[[str], None]] = None) -> None:
+        try:
+            with open(path, 'wb') as f: self.write_smf(f, initial_key, log)
+        except BaseException:
+            if os.path.exists(path): os.remove(path)
+            raise
+
+
+class ScoreCompiler:
+    """Compiles (measure text, key[, Timing]) items into a CompiledScore, re-voicing only the measures whose inputs changed.
+
+    Each measure index keeps its voiced chords with the inputs they came from
+    (text, key, meter, the chord a leading '%' repeats, voicing options), so
+    an edit invalidates exactly the measures it touches: a text or key change,
+    or a change to the chord a '%' refers back to. Every other measure is
+    copied from the cache. Calls are serialized, so the GUI thread and an
+    export worker can share one compiler.
+    """
+
+    def __init__(self):
+        self._measures: List[tuple] = []
+        self._lock = threading.Lock()
+        self.compiled = 0
+        self.reused = 0
+
+    def clear(self) -> None:
+        with self._lock: self._measures.clear()
+
+    @staticmethod
+    def _compile_measure(item: tuple, meter: Tuple[int, int], previous_chord: Optional[str], omit5_on_conflict: bool,
+                         omit_duplicated_bass: bool, ticks_per_beat: int, pattern: Optional[str] = None) -> tuple:
+        """One measure's columns relative to its bar line: (start, duration, pitch, velocity, chord_rows, fragments, last chord, warnings)."""
+        warnings: List[str] = []
+        start, duration, pitch, velocity, chord_rows = array('q'), array('q'), array('B'), array('B'), array('q')
+        fragments, tick = [], 0
+        for delta, status, fragment, length in ChordEngine.chord_events([(item[0], item[1], ChordEngine.Timing(meter))], omit5_on_conflict,
+                                                                        omit_duplicated_bass, ticks_per_beat, warnings.append,
+                                                                        previous_chord=previous_chord, emit_timing=False, pattern=pattern):
+            tick += delta
+            chord_rows.append(len(pitch)); fragments.append(fragment)
+            if status == ChordEngine.COMP:
+                for offset, note_ticks, note, note_velocity in fragment.notes:
+                    start.append(tick + offset); duration.append(note_ticks); pitch.append(note); velocity.append(note_velocity)
+                tick += fragment.span
+                continue
+            if status != ChordEngine.CHORD:
+                chord_rows.pop(); fragments.pop()
+                break
+            n = len(fragment.notes)
+            start.extend(itertools.repeat(tick, n)); duration.extend(itertools.repeat(length, n))
+            pitch.extend(fragment.notes); velocity.extend(itertools.repeat(fragment.velocity, n))
+            tick += length
+        last_chord = ChordEngine._last_playable_chord([item], omit5_on_conflict, omit_duplicated_bass)
+        return start, duration, pitch, velocity, chord_rows, tuple(fragments), last_chord, tuple(warnings)
+
+    def compile(self, measures: Iterable[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool, ticks_per_beat: int = 480,
+                bpm: float = 120, part_ids: Optional[List[int]] = None, log: Optional[Callable[[str], None]] = None,
+                progress: Optional[Callable[[int], None]] = None, pattern: Optional[str] = None) -> CompiledScore:
+        """`part_ids[m]` fills the part column for measure m (0 without it); `progress` is called with 1 per measure.
+
+        `pattern` applies a comping pattern to every chord (see ChordEngine.comp_fragment).
+        """
+        log = log or (lambda msg: None)
+        if pattern is not None and pattern not in ChordEngine.COMPING_PATTERNS: raise ValueError(f"Unknown comping pattern: {pattern}")
+        with self._lock:
+            self.compiled = self.reused = 0
+            score = CompiledScore(ticks_per_beat, bpm)
+            cache = self._measures
+            start, duration, pitch, velocity, part = score.start, score.duration, score.pitch, score.velocity, score.part
+            chord_rows, fragments, segments = score.chord_rows, score.fragments, score._tempo_segments
+            note_velocity = ChordEngine.NOTE_VELOCITY
+            meter, timing, previous, bar_start = ChordEngine.DEFAULT_METER, None, None, 0
+            bar_ticks = ChordEngine.measure_ticks(meter, ticks_per_beat)
+            index = -1
+            for index, item in enumerate(measures):
+                if progress is not None: progress(1)
+                if len(item) > 2 and item[2] is not timing:
+                    timing = item[2]
+                    changes, meter, bpm = ChordEngine._timing_changes(timing, meter, bpm)
+                    bar_ticks = ChordEngine.measure_ticks(meter, ticks_per_beat)
+                    for status, a, b in changes:
+                        score.timing.append((bar_start, status, a, b))
+                        if status == ChordEngine.SET_TEMPO:
+                            segments.append((bar_start, score.seconds_at(bar_start), a / 1e6 / ticks_per_beat))
+                inputs = (item[0], item[1], meter, previous if '%' in item[0] else None, omit5_on_conflict, omit_duplicated_bass,
+                          ticks_per_beat, note_velocity, pattern)
+                cached = cache[index] if index < len(cache) else None
+                if cached is not None and cached[0] == inputs:
+                    compiled = cached[1]; self.reused += 1
+                else:
+                    compiled = self._compile_measure(item, meter, previous, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, pattern)
+                    if index < len(cache): cache[index] = (inputs, compiled)
+                    else: cache.append((inputs, compiled))
+                    self.compiled += 1
+                m_start, m_duration, m_pitch, m_velocity, m_rows, m_fragments, last_chord, warnings = compiled
+                previous = last_chord or previous
+                for w in warnings:
+                    log(w); score.warnings.append(w)
+                score.measure_ticks.append(bar_start); score.measure_chords.append(len(fragments))
+                if m_fragments:
+                    # 마디 단위로 붙입니다. 시작 틱과 코드 행 번호만 이 마디의 위치만큼 옮기면 됩니다.
+                    row = len(pitch)
+                    chord_rows.extend([row + r for r in m_rows]); fragments.extend(m_fragments)
+                    start.extend([bar_start + t for t in m_start]); duration.extend(m_duration)
+                    pitch.extend(m_pitch); velocity.extend(m_velocity)
+                    part.extend(array('H', (part_ids[index] if part_ids is not None else 0,)) * len(m_pitch))
+                bar_start += bar_ticks
+            del cache[index + 1:]
+            score.measure_ticks.append(bar_start); score.measure_chords.append(len(fragments)); chord_rows.append(len(pitch))
+            return score
+
+    def format_stats(self) -> str:
+        return f"{self.compiled} measures compiled, {self.reused} reused"
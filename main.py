@@ -4,18 +4,22 @@
 import sys
 import re
 import atexit
-from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 import os
 import platform
 import inspect
 import hashlib
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 import tkinter as tk
 from tkinter import PhotoImage, filedialog, messagebox
 import tkinter.ttk as ttk
 import customtkinter as ctk
-from mido import Message, MidiFile, MidiTrack, MetaMessage, bpm2tempo
+
+from chord_engine import ChordEngine, ExportCancelled, ScoreCompiler
+from playback import ChordPlayer, MidoPortSink, timeline_from_score
 
 _OPTIONMENU_PARAMS = set(inspect.signature(ctk.CTkOptionMenu.__init__).parameters)
 _OPTIONMENU_SUPPORTS_FONT = 'font' in _OPTIONMENU_PARAMS
@@ -222,31 +226,12 @@ def format_bytes(num: int) -> str:
         value /= 1024
     return f"{num} B"
 
-class App(ctk.CTk):
-    BASE_OCTAVE = 48
-    NOTE_NAMES_SHARP = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-    NOTE_NAMES_FLAT  = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B']
-    KEYS = ['C', 'C#', 'Db', 'D', 'Eb', 'E', 'F', 'F#', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B', 'Cb']
-    KEY_PREFERS_SHARPS = {'C':True,'G':True,'D':True,'A':True,'E':True,'B':True,'F#':True,'C#':True, 'F':False,'Bb':False,'Eb':False,'Ab':False,'Db':False,'Gb':False,'Cb':False}
-    MAJOR_DEGREE_TO_SEMITONES = {'I':0, 'II':2, 'III':4, 'IV':5, 'V':7, 'VI':9, 'VII':11}
-    TENSIONS_LIST = ['b9', '9', '#9', '11', '#11', 'b6', 'b13', '13']
-    QUALITY_SYMBOLS = ["Major", "Minor", "7", "M7", "m7", "7b5", "M7b5", "m7b5", "dim", "dim7", "aug", "blk", "sus2", "sus4", "omit3", "omit5"]
-    ROMAN_DEGREES_BUILDER = ['I', 'bII', 'II', 'bIII', 'III', 'IV', '#IV', 'V', 'bVI', 'VI', 'bVII', 'VII']
+
+class App(ChordEngine, ctk.CTk):
     PART_COLORS = ['#3a6ea5', '#ff885b', '#57a773', '#b86fc6', '#f2c14e', '#e63946', '#6d597a', '#277da1', '#bc6c25', '#118ab2']
     PART_GROUP_BG = ('#eef3fa', '#1a2330')
-
-    @staticmethod
-    def roman_degrees_for_key(key: str) -> List[str]:
-        prefer_sharp = App.prefers_sharps(key)
-        base = {0:'I', 2:'II', 4:'III', 5:'IV', 7:'V', 9:'VI', 11:'VII'}
-        acc = {1:('#I','bII'), 3:('#II','bIII'), 6:('#IV','bV'), 8:('#V','bVI'), 10:('#VI','bVII')}
-        out = []
-        for sem in [0,1,2,3,4,5,6,7,8,9,10,11]:
-            if sem in base: out.append(base[sem])
-            else:
-                sharp_name, flat_name = acc[sem]
-                out.append(sharp_name if prefer_sharp else flat_name)
-        return out
+    # 작업 프로세스 하나를 띄우는 비용이 대략 이만큼의 마디를 그리는 시간이라, 이보다 긴 파트가 둘 이상일 때만 트랙을 나눠 그립니다.
+    PARALLEL_TRACK_MIN_MEASURES = 1000
 
     @staticmethod
     def color_for_part(part_name: str) -> str:
@@ -256,371 +241,12 @@ class App(ctk.CTk):
         index = int(digest, 16) % len(App.PART_COLORS)
         return App.PART_COLORS[index]
 
-    ROMAN_PATTERN = r'(?:VII|VI|V|IV|III|II|I)'
-    ROMAN_RE = re.compile(fr'(?i)^([b#]?)({ROMAN_PATTERN})$')
-    
     @staticmethod
     def resource_path(relative_path):
         try: base_path = sys._MEIPASS
         except Exception: base_path = os.path.dirname(os.path.abspath(__file__))
         return os.path.join(base_path, relative_path)
     
-    @dataclass
-    class ParsedChord:
-        root: str
-        quality: str
-        tensions: List[str] = field(default_factory=list)
-        paren_contents: List[str] = field(default_factory=list)
-        bass_note_str: Optional[str] = None
-        bass_note: Optional[str] = None
-        bass_degree: Optional[str] = None
-        bass_interval: Optional[int] = None
-        omissions: List[int] = field(default_factory=list)
-        is_roman: bool = False
-        roman_symbol: Optional[str] = None
-        seventh: Optional[str] = None
-        alterations: List[str] = field(default_factory=list)
-
-    @staticmethod
-    def prefers_sharps(key: str) -> bool: return App.KEY_PREFERS_SHARPS.get(key, True)
-    
-    @staticmethod
-    def name_to_pc(name: str) -> int:
-        tbl = {'C':0,'B#':0,'C#':1,'Db':1,'D':2,'D#':3,'Eb':3,'E':4,'Fb':4,'F':5,'E#':5,'F#':6,'Gb':6,'G':7,'G#':8,'Ab':8,'A':9,'A#':10,'Bb':10,'B':11,'Cb':11}
-        n = name.strip()
-        if len(n)>1 and n[1] in ('b','#'): n = n[0].upper() + n[1:]
-        else: n = n[0].upper() + n[1:].lower()
-        if n not in tbl: raise ValueError(f"Unknown note name: {n}")
-        return tbl[n]
-
-    @staticmethod
-    def pc_to_name(pc: int, use_sharps: bool) -> str: return App.NOTE_NAMES_SHARP[pc%12] if use_sharps else App.NOTE_NAMES_FLAT[pc%12]
-    
-    @staticmethod
-    def parse_tensions(text: str) -> List[str]:
-        if not text: return []
-        inner = text.strip()
-        if inner.startswith('(') and inner.endswith(')'): inner = inner[1:-1]
-        if not inner: return []
-        parts = [p.strip() for p in inner.split(',') if p.strip()]
-        norm = [p.replace('+', '#').replace('-', 'b') for p in parts if re.fullmatch(r'(?:b|#)?(?:5|6|9|11|13)', p.replace('+', '#').replace('-', 'b'))]
-        seen, out = set(), []
-        for t in norm:
-            core_num = ''.join(filter(str.isdigit, t))
-            if core_num not in seen: out.append(t); seen.add(core_num)
-        return out
-        
-    @staticmethod
-    def roman_to_pc_offset(key_root: str, roman: str) -> int:
-        m = App.ROMAN_RE.fullmatch(roman)
-        if not m: raise ValueError(f"Invalid roman: {roman}")
-        acc, deg = m.groups(); semis = App.MAJOR_DEGREE_TO_SEMITONES[deg.upper()]
-        if acc.lower() == 'b': semis -= 1
-        elif acc == '#': semis += 1
-        return (App.name_to_pc(key_root) + semis) % 12
-
-    @staticmethod
-    def parse_chord_symbol(text: str, key: str) -> 'App.ParsedChord':
-        # self._log(f"Parsing '{text}' in key '{key}'") # This would require passing self, which is not static.
-        s = (text or '').strip()
-        if not s:
-            return App.ParsedChord(root='C', quality='Major')
-
-        replacements = {
-            '♭': 'b',
-            '♯': '#',
-            '♮': '',
-            '𝄪': '##',
-            '𝄫': 'bb',
-            '＃': '#',
-            'ｂ': 'b',
-        }
-        for src, dst in replacements.items():
-            if src in s:
-                s = s.replace(src, dst)
-
-        # 'blk' 품질을 먼저 파싱하여 근음과의 모호함 제거
-        is_blk = 'blk' in s.lower()
-        if is_blk:
-            s = re.sub('blk', '', s, flags=re.IGNORECASE).strip()
-        
-        bass_note_str, bass_note = None, None
-        if '/' in s:
-            parts = s.split('/', 1); s = parts[0].strip()
-            bass_note_str = parts[1].strip()
-            try:
-                bass_note = App.pc_to_name(App.name_to_pc(bass_note_str), App.prefers_sharps(key))
-            except ValueError: bass_note_str, bass_note = None, None
-
-        omissions = []
-        if 'omit3' in s: omissions.append(3); s = s.replace('omit3', '').strip()
-        if 'omit5' in s: omissions.append(5); s = s.replace('omit5', '').strip()
-
-        paren_contents = []
-        tens_match = re.search(r'\(.*\)', s)
-        if tens_match:
-            tensions_str = tens_match.group(0)
-            paren_contents = App.parse_tensions(tensions_str)
-            s = s.replace(tensions_str, '').strip()
-            if not s and not paren_contents:
-                inner = tensions_str[1:-1].strip()
-                if inner:
-                    s = inner
-
-        s = s.replace('maj7', 'M7').replace('Maj7','M7').replace('min','m').replace('ø', 'm7b5').replace('°', 'dim')
-
-        # Handle +/- alterations before '-' is treated as minor.
-        # This correctly handles C7-5 (C7b5) vs C-7 (Cm7).
-        s = s.replace('-5', 'b5').replace('+5', '#5')
-        s = s.replace('-9', 'b9').replace('+9', '#9')
-        s = s.replace('+11', '#11')
-        s = s.replace('-13', 'b13')
-
-        # Now, handle standalone '-' as minor
-        s = s.replace('-', 'm')
-
-        m_roman = re.match(fr'(?i)^([b#]?{App.ROMAN_PATTERN})', s)
-        if m_roman:
-            head = m_roman.group(1); is_roman_flag = True; rest = s[len(head):].strip()
-            root = App.pc_to_name(App.roman_to_pc_offset(key, head), App.prefers_sharps(key))
-            root_pc = App.name_to_pc(root)
-        else:
-            m_alpha = re.match(r'(?i)^([A-G][#b]?)', s)
-            if m_alpha:
-                head = m_alpha.group(1); is_roman_flag = False; rest = s[len(head):].strip()
-                root = head[0].upper() + head[1:]
-            else:
-                raise ValueError(f"Unrecognized chord symbol '{text}'")
-
-        bass_interval, bass_degree = None, None
-        if bass_note_str and is_roman_flag:
-            # 도수 모드에서 베이스음이 도수 표기(예: I, V)일 경우에만 bass_degree로 저장합니다.
-            # 알파벳 베이스음은 절대음으로 취급하여 bass_degree를 설정하지 않습니다.
-            m_bass_roman = App.ROMAN_RE.fullmatch(bass_note_str)
-            if m_bass_roman:
-                bass_degree = m_bass_roman.group(0)
-            else:
-                try:
-                    bass_note_pc = App.name_to_pc(bass_note_str)
-                    key_pc = App.name_to_pc(key)
-                    bass_offset_from_key = (bass_note_pc - key_pc + 12) % 12
-                    sem_to_deg = {sem: deg for deg, sem in App.MAJOR_DEGREE_TO_SEMITONES.items()}
-                    # build_string_from_parsed의 도수 변환 로직을 재사용하여 정확도와 일관성을 높입니다.
-                    bass_degree = App.build_string_from_parsed(App.ParsedChord(root=bass_note_str, quality='Major'), is_roman=True, key=key)
-                except ValueError:
-                    bass_note_str, bass_note, bass_degree = None, None, None
-        quality, seventh, tensions, alterations = 'Major', None, [], []
-        rest_mut = rest
-
-        # CM9, CM11, CM13과 같은 형태를 M7 + 텐션으로 처리
-        m_major_tension = re.match(r'M(9|11|13)', rest_mut)
-        if m_major_tension:
-            rest_mut = rest_mut.replace(m_major_tension.group(0), f'M7{m_major_tension.group(1)}')
-
-        if '13' in rest_mut: tensions.append('13'); rest_mut = rest_mut.replace('13', '')
-        if '11' in rest_mut: tensions.append('11'); rest_mut = rest_mut.replace('11', '')
-        if '9' in rest_mut: tensions.append('9'); rest_mut = rest_mut.replace('9', '')
-        if '6' in rest_mut: tensions.append('6'); rest_mut = rest_mut.replace('6', '')
-        
-        sev_m = re.search(r'M7|m7|7|dim7', rest_mut)
-        if sev_m:
-            sev_str = sev_m.group(0)
-            seventh = 'm7' if sev_str == '7' else sev_str
-            if sev_str == 'm7': quality = 'Minor'
-            elif sev_str == 'dim7': quality = 'dim'
-            rest_mut = rest_mut.replace(sev_str, '')
-        elif tensions or paren_contents:
-            # Don't add a 7th automatically if the only tension is '6'
-            non_six_tensions = [t for t in tensions if t != '6']
-            # Add a 7th only if tensions like 9, 11, 13 are present outside of parentheses.
-            # Tensions in parentheses (e.g., C(9)) are "add" notes and do not imply a 7th.
-            if non_six_tensions and not any(q in rest for q in ['M7', 'm7', 'dim7']):
-                seventh = 'm7'
-
-        if is_blk:
-            quality = 'blk'
-        elif 'sus4' in rest_mut: quality = 'sus4'; rest_mut = rest_mut.replace('sus4', '')
-        elif 'sus2' in rest_mut: quality = 'sus2'; rest_mut = rest_mut.replace('sus2', '')
-        elif 'aug' in rest_mut or '+' in rest_mut: quality = 'aug'; rest_mut = rest_mut.replace('aug','').replace('+','')
-        elif 'dim' in rest_mut: quality = 'dim'; rest_mut = rest_mut.replace('dim','')
-        elif 'm' in rest_mut: quality = 'Minor'; rest_mut = rest_mut.replace('m','')
-        
-        if is_roman_flag and head.islower() and not rest:
-             if head.upper() in ['II','III','VI']: quality = 'Minor'
-             elif head.upper() == 'VII': quality = 'dim'
-        
-        if 'b5' in rest_mut: alterations.append('b5')
-        if '#5' in rest_mut: alterations.append('#5')
-        
-        if 'm7b5' in rest: quality, seventh, alterations = 'dim', 'm7', []
-
-        parsed = App.ParsedChord(root=root, quality=quality, tensions=tensions, paren_contents=paren_contents, bass_note_str=bass_note_str,
-                               bass_note=bass_note, bass_degree=bass_degree, bass_interval=bass_interval, omissions=omissions, is_roman=is_roman_flag,
-                               roman_symbol=head, seventh=seventh, alterations=alterations)
-        # self._log(f"  -> Parsed: root={parsed.root}, quality={parsed.quality}, bass_degree={parsed.bass_degree}")
-        return parsed
-
-    @staticmethod
-    def build_string_from_parsed(p: 'App.ParsedChord', is_roman: bool, key: str) -> str:
-        # self._log(f"Building string for '{p.root}' in key '{key}', is_roman={is_roman}")
-        if is_roman:
-            if p.is_roman and p.roman_symbol is not None: base = p.roman_symbol
-            else:
-                key_pc, root_pc = App.name_to_pc(key), App.name_to_pc(p.root)
-                diff = (root_pc - key_pc + 12) % 12
-                sem_to_deg = {sem: deg for deg, sem in App.MAJOR_DEGREE_TO_SEMITONES.items()}
-                base = None
-                if diff in sem_to_deg: base = sem_to_deg[diff]
-                else:
-                    use_sharps = App.prefers_sharps(key)
-                    raised_pc = (diff - 1 + 12) % 12; flatted_pc = (diff + 1) % 12
-                    if use_sharps and raised_pc in sem_to_deg: base = '#' + sem_to_deg[raised_pc]
-                    elif not use_sharps and flatted_pc in sem_to_deg: base = 'b' + sem_to_deg[flatted_pc]
-                    else: base = 'b' + sem_to_deg.get(flatted_pc, 'I')
-                base = base or 'I'
-        else: base = p.root
- 
-        core_qual_str = ''
-        sus_str = ''
-        if p.quality == 'Minor': core_qual_str = 'm'
-        elif p.quality == 'dim' and not (p.seventh == 'm7' or p.seventh == 'dim7'): core_qual_str = 'dim'
-        elif p.quality == 'aug': core_qual_str = 'aug'
-        elif p.quality == 'blk': core_qual_str = 'blk'
-        elif p.quality == 'sus2': sus_str = 'sus2'
-        elif p.quality == 'sus4': sus_str = 'sus4'
-
-        has_6 = '6' in p.tensions
-        other_tensions = [t for t in p.tensions if t != '6']
-
-        highest_tension_num = 0
-        if other_tensions:
-            highest_tension_num = max([int(re.sub(r'[^0-9]','',t)) for t in other_tensions])
-
-        six_part = '6' if has_6 else ''
-        num_part = ''
-        sev_prefix = ''
-        if highest_tension_num > 7:
-            num_part = str(highest_tension_num)
-            if p.seventh == 'M7': sev_prefix = 'M'
-        elif p.seventh:
-            num_part = '7'
-            if p.seventh == 'M7': sev_prefix = 'M'
-            elif p.seventh == 'dim7': core_qual_str, num_part = '', 'dim7'
-
-        if p.quality == 'dim' and p.seventh == 'm7':
-            core_qual_str, sev_prefix, num_part, alt_str, six_part = '', 'm', '7b5', '', ''
-            sus_str = ''
-        else:
-            alt_str = ''.join(p.alterations)
-
-        paren_str = f"({','.join(p.paren_contents)})" if p.paren_contents else ''
-        om_str = ''.join([f"omit{o}" for o in p.omissions])
-        
-        bass_display = None
-        if is_roman and p.bass_degree:
-            # bass_degree를 사용하여 새로운 키에 맞는 베이스음을 계산합니다. (가장 높은 우선순위)
-            bass_pc = App.roman_to_pc_offset(key, p.bass_degree)
-            bass_display = App.pc_to_name(bass_pc, App.prefers_sharps(key))
-        elif p.bass_note_str is not None: # bass_degree가 없을 때, 원본 문자열을 사용합니다.
-            bass_display = p.bass_note_str
-        
-        # 사용자가 베이스음을 명시적으로 입력했다면(p.bass_note_str is not None), 근음과 같더라도 생략하지 않습니다.
-        show_bass = bass_display and (p.bass_note_str is not None or bass_display != p.root)
-        bass_str = f"/{bass_display}" if show_bass else ""
- 
-        result = f"{base}{core_qual_str}{six_part}{sev_prefix}{num_part}{alt_str}{sus_str}{om_str}{paren_str}{bass_str}"
-        # self._log(f"  -> Built: {result}")
-        return result
-
-    @staticmethod
-    def build_voicing(parsed: 'App.ParsedChord', omit5_on_conflict: bool, omit_duplicated_bass: bool) -> List[int]:
-        root_pc = App.name_to_pc(parsed.root)
-        intervals = []
-        
-        if parsed.quality == 'blk':
-            # blk is special: Root of aug triad is M2 below the stated root/bass
-            # Intervals are relative to the stated root, which is the bass
-            # e.g for Cblk, root is C, notes are A#aug/C -> C bass, A#-D-F# chord
-            # Intervals from C(0) are D(2), F#(6), A#(10)
-            intervals.extend([2, 6, 10]) # M2, A4, m7 from the bass
-        else:
-            all_tensions = parsed.tensions + parsed.paren_contents
-
-            if parsed.quality == 'Minor': intervals.extend([0, 3, 7])
-            elif parsed.quality == 'dim': intervals.extend([0, 3, 6])
-            elif parsed.quality == 'aug': intervals.extend([0, 4, 8])
-            else: intervals.extend([0, 4, 7]) # Major default
-
-            if parsed.quality == 'sus2': intervals = [i for i in intervals if i not in [3,4]] + [2]
-            if parsed.quality == 'sus4': intervals = [i for i in intervals if i not in [3,4]] + [5]
-
-            if parsed.seventh == 'm7': intervals.append(10)
-            elif parsed.seventh == 'M7': intervals.append(11)
-            elif parsed.seventh == 'dim7': intervals.append(9)
-
-            if 'b5' in parsed.alterations: intervals = [i for i in intervals if i not in [7,8]] + [6]
-            if '#5' in parsed.alterations: intervals = [i for i in intervals if i not in [6,7]] + [8]
-
-            if 3 in parsed.omissions: intervals = [i for i in intervals if i not in [2,3,4,5]]
-            if 5 in parsed.omissions: intervals = [i for i in intervals if i not in [6,7,8]]
-
-            tension_map = {'6': 9, 'b6': 8, '9':14, 'b9':13, '#9':15, '11':17, '#11':18, '13':21, 'b13':20}
-            if omit5_on_conflict and any(t in all_tensions for t in ['#11', 'b13', 'b6']):
-                intervals = [iv for iv in intervals if iv % 12 != 7]
-            for t in all_tensions:
-                if t in tension_map: intervals.append(tension_map[t])
-        
-        intervals = sorted(list(set(intervals)))
-
-        bass_pc = App.name_to_pc(parsed.bass_note) if parsed.bass_note else root_pc
-        bass_midi_note = (App.BASE_OCTAVE - 12) + bass_pc
-        
-        # For 'blk' chords, the root of the chord part is different from the bass
-        chord_root_pc = (root_pc - 2 + 12) % 12 if parsed.quality == 'blk' else root_pc
-        
-        final_chord_notes = []; root_note_in_voicing = App.BASE_OCTAVE + chord_root_pc
-        
-        if 0 in intervals and parsed.quality != 'blk': final_chord_notes.append(root_note_in_voicing)
-        
-        sorted_intervals = sorted([iv for iv in intervals if iv != 0 or parsed.quality == 'blk'])
-        
-        last_note = root_note_in_voicing if final_chord_notes else App.BASE_OCTAVE + bass_pc
-        
-        for iv in sorted_intervals:
-            pitch_iv = iv; is_13th_tension = False
-            if iv in [13, 14, 15]: pitch_iv -= 12
-            elif iv in [17, 18]: pitch_iv -= 12
-            elif iv in [20, 21]: pitch_iv -= 12; is_13th_tension = True
-
-            note_pc = (root_pc + pitch_iv) % 12
-            
-            candidate = (last_note // 12) * 12 + note_pc
-            if candidate <= last_note: candidate += 12
-            
-            if is_13th_tension and (candidate >= root_note_in_voicing + 20): candidate -= 12
-            
-            final_chord_notes.append(candidate)
-            final_chord_notes.sort(); last_note = final_chord_notes[-1]
-            
-        if omit_duplicated_bass:
-            final_chord_notes = [note for note in final_chord_notes if note % 12 != bass_pc]
-        
-        final_notes = [bass_midi_note] + final_chord_notes
-        return sorted(list(set(final_notes)))
-
-    @staticmethod
-    def split_measure_text(text: str) -> List[str]:
-        return [part for part in text.split(' ') if part]
-
-    @staticmethod
-    def duration_ticks_for_n(n: int, tpb: int) -> List[int]:
-        if n == 3:
-            return [2 * tpb, tpb, tpb]
-        base_dur = (4 * tpb) // n
-        rem = (4 * tpb) % n
-        durations = [base_dur + 1 if i < rem else base_dur for i in range(n)]
-        return durations
-
     def __init__(self, splash_root):
         super().__init__()
         self.splash_root = splash_root
@@ -636,10 +262,22 @@ class App(ctk.CTk):
                 "degree": "도수",
                 "omit5": "5음 생략",
                 "omit_bass": "베이스 중복음 생략",
+                "split_tracks": "파트별 트랙",
+                "pattern_block": "블록 코드",
+                "pattern_quarters": "4분음표",
+                "pattern_bossa": "보사노바",
+                "pattern_arpeggio_up": "아르페지오 ↑",
+                "pattern_arpeggio_down": "아르페지오 ↓",
+                "pattern_strum": "스트럼",
+                "pattern_charleston": "찰스턴",
                 "measures": "마디",
                 "generate_midi": "MIDI 생성",
+                "cancel_export": "취소",
+                "play": "재생",
+                "stop_playback": "정지",
                 "clear_all": "모두 지우기",
                 "load_chart": "불러오기",
+                "import_midi": "MIDI 불러오기",
                 "save_chart": "저장하기",
                 "builder_title": "코드 빌더",
                 "root": "근음",
@@ -691,10 +329,22 @@ class App(ctk.CTk):
                 "degree": "Degree",
                 "omit5": "Omit 5th",
                 "omit_bass": "Omit Dupe Bass",
+                "split_tracks": "Track per Part",
+                "pattern_block": "Block Chords",
+                "pattern_quarters": "Quarters",
+                "pattern_bossa": "Bossa Nova",
+                "pattern_arpeggio_up": "Arpeggio Up",
+                "pattern_arpeggio_down": "Arpeggio Down",
+                "pattern_strum": "Strum",
+                "pattern_charleston": "Charleston",
                 "measures": "Measures",
                 "generate_midi": "Generate MIDI",
+                "cancel_export": "Cancel",
+                "play": "Play",
+                "stop_playback": "Stop",
                 "clear_all": "Clear All",
                 "load_chart": "Load Chart",
+                "import_midi": "Import MIDI",
                 "save_chart": "Save Chart",
                 "builder_title": "Chord Builder",
                 "root": "Root",
@@ -776,15 +426,39 @@ class App(ctk.CTk):
         self.omit_bass_chk = ctk.CTkCheckBox(self.settings_top, variable=self.omit_bass_var, font=self.font_main)
         self.omit_bass_chk.pack(side="left", padx=(0,12))
 
+        self.split_tracks_var = tk.BooleanVar(master=self, value=False)
+        self.split_tracks_chk = ctk.CTkCheckBox(self.settings_top, variable=self.split_tracks_var, font=self.font_main)
+        self.split_tracks_chk.pack(side="left", padx=(0,12))
+
+        # 반주 패턴: 메뉴에는 번역된 이름이, self.pattern 에는 엔진의 패턴 이름(블록 코드는 None)이 들어갑니다.
+        self.pattern: Optional[str] = None
+        self.pattern_var = tk.StringVar(master=self, value="")
+        pattern_kwargs = {
+            'variable': self.pattern_var,
+            'command': self._on_pattern_changed,
+            'width': 130,
+            'height': 26,
+        }
+        if _OPTIONMENU_SUPPORTS_FONT:
+            pattern_kwargs['font'] = self.font_main
+        if _OPTIONMENU_SUPPORTS_DROPDOWN_FONT:
+            pattern_kwargs['dropdown_font'] = self.font_main
+        self.pattern_menu = ctk.CTkOptionMenu(self.settings_top, **pattern_kwargs)
+        self.pattern_menu.pack(side="left", padx=(0,12))
+
         action_buttons_group = ctk.CTkFrame(self.settings_bottom, fg_color="transparent")
         action_buttons_group.pack(side="left")
         button_pad = (0, 6)
         self.load_chart_btn = ctk.CTkButton(action_buttons_group, font=self.font_main, command=self._load_chart_from_file, fg_color="transparent", border_width=1)
         self.load_chart_btn.pack(side="left", padx=button_pad)
+        self.import_midi_btn = ctk.CTkButton(action_buttons_group, font=self.font_main, command=self._import_midi_from_file, fg_color="transparent", border_width=1)
+        self.import_midi_btn.pack(side="left", padx=button_pad)
         self.save_chart_btn = ctk.CTkButton(action_buttons_group, font=self.font_main, command=self._save_chart_to_file, fg_color="transparent", border_width=1)
         self.save_chart_btn.pack(side="left", padx=button_pad)
         self.clear_all_btn = ctk.CTkButton(action_buttons_group, font=self.font_main, command=self._clear_all_chords, fg_color="transparent", border_width=1)
         self.clear_all_btn.pack(side="left", padx=button_pad)
+        self.play_btn = ctk.CTkButton(action_buttons_group, font=self.font_main, command=self._on_toggle_playback, fg_color="transparent", border_width=1)
+        self.play_btn.pack(side="left", padx=button_pad)
         self.gen_btn = ctk.CTkButton(action_buttons_group, font=self.font_bold, command=self._on_generate_midi)
         self.gen_btn.pack(side="left", padx=button_pad)
 
@@ -795,6 +469,11 @@ class App(ctk.CTk):
         self.measures_frame.grid_columnconfigure(0, weight=1) # This frame will hold part frames
 
         self.parts_data: List[Dict[str, Any]] = []
+        # 저장과 재생이 같은 컴파일 결과를 쓰고, 다시 컴파일할 때는 바뀐 마디만 새로 보이싱합니다.
+        self.score_compiler = ScoreCompiler()
+        self._midi_export_job: Optional[Dict[str, Any]] = None
+        self._midi_import_job: Optional[Dict[str, Any]] = None
+        self.player: Optional[ChordPlayer] = None
         self.measure_entries: List[ctk.CTkEntry] = []
         self.entry_part_map: Dict[ctk.CTkEntry, int] = {}
         self.entry_global_idx_map: Dict[ctk.CTkEntry, int] = {}
@@ -913,6 +592,10 @@ class App(ctk.CTk):
     def _on_closing(self):
         """Handles window close event, ensuring the application terminates."""
         self.withdraw()  # Hide window for immediate user feedback
+        if self.player is not None:
+            # 울리고 있는 음을 끄고 포트를 닫습니다.
+            try: self.player.stop(); self.player.sink.close()
+            except Exception: pass
         try:
             # Cancel all pending after() jobs to prevent errors on exit
             for after_id in self.tk.eval('after info').split():
@@ -945,10 +628,15 @@ class App(ctk.CTk):
         self.mode_var.set(lang["alphabet"] if is_alpha_mode else lang["degree"])
         self.omit5_chk.configure(text=lang["omit5"])
         self.omit_bass_chk.configure(text=lang["omit_bass"])
+        self.split_tracks_chk.configure(text=lang["split_tracks"])
+        self.pattern_menu.configure(values=[lang[f"pattern_{name or 'block'}"] for name in (None,) + tuple(App.COMPING_PATTERNS)])
+        self.pattern_var.set(lang[f"pattern_{self.pattern or 'block'}"])
         self.load_chart_btn.configure(text=lang["load_chart"])
+        self.import_midi_btn.configure(text=lang["import_midi"])
         self.save_chart_btn.configure(text=lang["save_chart"])
         self.clear_all_btn.configure(text=lang["clear_all"])
-        self.gen_btn.configure(text=lang["generate_midi"])
+        if self._midi_export_job is None: self.gen_btn.configure(text=lang["generate_midi"])
+        self._update_play_button()
         self.builder_title_label.configure(text=lang["builder_title"])
         self.root_label.configure(text=lang["root"])
         self.quality_label.configure(text=lang["quality"])
@@ -1442,36 +1130,19 @@ class App(ctk.CTk):
         
         # Update the data model immediately so other functions get the new key
         self.parts_data[part_idx]['key'] = new_key
-        self._convert_all_entries()
+        part_entries = [e for e in self.measure_entries if self.entry_part_map.get(e) == part_idx]
 
         is_degree_mode = self.mode_var.get() == self.i18n[self.lang_code]["degree"]
 
-        # If in degree mode, we must manually convert the affected part's entries
-        # using the old key for parsing and the new key for building.
+        # 도수 모드에서는 도수를 유지한 채 코드를 새 조로 옮기고, 알파벳 모드에서는 해당 파트만 새 조 기준으로 다시 표기합니다.
+        # 조가 바뀌지 않은 다른 파트는 건드리지 않습니다.
         if is_degree_mode and old_key != new_key:
-            part_entries = [e for e, p_idx in self.entry_part_map.items() if p_idx == part_idx]
-            
-            for entry in part_entries:
-                text = entry.get().strip()
-                if not text: continue
-                
-                output_parts = []
-                for part_text in App.split_measure_text(text):
-                    if part_text == "%":
-                        output_parts.append(part_text); continue
-                    try:
-                        self._log(f"Re-converting '{part_text}' from key '{old_key}' to '{new_key}'", show_log_tab=False)
-                        parsed = App.parse_chord_symbol(part_text, old_key)
-                        self._log(f"  -> Parsed with old key: root={parsed.root}, bass_degree={parsed.bass_degree}", show_log_tab=False)
-                        converted = App.build_string_from_parsed(parsed, is_roman=True, key=new_key)
-                        output_parts.append(converted)
-                        self._log(f"  -> Converted with new key: {converted}", show_log_tab=False)
-                    except Exception as ex:
-                        self._log(f"Conversion error on '{part_text}' (key {old_key}->{new_key}): {ex}", show_log_tab=False)
-                        output_parts.append(part_text)
-                entry.delete(0, "end"); entry.insert(0, " ".join(output_parts))
+            self._log(f"Transposing part {part_idx + 1} from key '{old_key}' to '{new_key}'", show_log_tab=False)
+            part = {**self.parts_data[part_idx], 'key': old_key, 'measures': [e.get().strip() for e in part_entries]}
+            for entry, text, moved in zip(part_entries, part['measures'], App.transpose_part(part, new_key, is_roman=True)['measures']):
+                if moved != text: entry.delete(0, "end"); entry.insert(0, moved)
         else:
-            self._convert_all_entries()
+            self._convert_entries(part_entries)
 
         self._update_builder_roots()
 
@@ -1486,31 +1157,36 @@ class App(ctk.CTk):
         self._log(f"Mode changed to {self.mode_var.get()}. ", show_log_tab=False); self._update_builder_roots(); self._convert_all_entries()
 
     def _convert_all_entries(self):
+        self._convert_entries(getattr(self, "measure_entries", []))
+
+    def _convert_entries(self, entries: List[ctk.CTkEntry]):
         mode = self.mode_var.get()
         is_to_degree = (mode == self.i18n[self.lang_code]["degree"])
-        for entry in getattr(self, "measure_entries", []):
-            text = entry.get().strip()
+        changed = 0
+        for entry in entries:
+            raw = entry.get()
+            text = raw.strip()
             if not text:
                 continue
             key = self._get_key_for_entry(entry)
-            parts = App.split_measure_text(text)
             output_parts: List[str] = []
-            for part_text in parts:
+            for part_text in App.split_measure_text(text):
                 if part_text == "%":
                     output_parts.append(part_text)
                     continue
                 try:
-                    self._log(f"Converting '{part_text}' (Key: {key}, To Roman: {is_to_degree})", show_log_tab=False)
-                    parsed = App.parse_chord_symbol(part_text, key)
-                    self._log(f"  -> Parsed: root={parsed.root}, quality={parsed.quality}, bass_degree={parsed.bass_degree}, bass_note_str={parsed.bass_note_str}", show_log_tab=False)
-                    converted = App.build_string_from_parsed(parsed, is_roman=is_to_degree, key=key)
-                    output_parts.append(converted)
-                    self._log(f"  -> Converted to: {converted}", show_log_tab=False)
+                    output_parts.append(App.canonicalize(part_text, key, is_to_degree))
                 except Exception as ex:
                     self._log(f"Conversion error on '{part_text}' (key {key}): {ex}", show_log_tab=False)
+            converted = " ".join(output_parts)
+            # 내용이 같은 칸은 위젯을 다시 쓰지 않습니다.
+            if converted == raw:
+                continue
             entry.delete(0, "end")
             if output_parts:
-                entry.insert(0, " ".join(output_parts))
+                entry.insert(0, converted)
+            changed += 1
+        self._log(f"Converted {changed} of {len(entries)} measures (To Roman: {is_to_degree}). Canonical cache: {App.CANONICAL_CACHE.format_stats()}", show_log_tab=False)
 
     def _reset_tensions(self):
         for var in self.tension_vars.values(): var.set(False)
@@ -1527,18 +1203,7 @@ class App(ctk.CTk):
         qual = self.builder_quality_var.get()
         selected_tensions = [t for t, v in self.tension_vars.items() if v.get()]
         
-        qual_txt = qual if qual not in ["Major", "Minor"] else ('m' if qual == "Minor" else '')
-        
-        paren_tensions = [t for t in selected_tensions if re.search(r'[b#]', t)]
-        text_tensions = [t for t in selected_tensions if not re.search(r'[b#]', t)]
-        
-        tens_txt = "".join(sorted(text_tensions, key=lambda x: int(re.sub(r'[^0-9]', '', x))))
-        if selected_tensions and not any(c in qual_txt for c in ['7','M','M','m','d','a','s']):
-            if not tens_txt: tens_txt = '7'
-            
-        paren_txt = f"({','.join(paren_tensions)})" if paren_tensions else ''
-            
-        chord_str_to_parse = f"{root_selection}{qual_txt}{tens_txt}{paren_txt}"
+        chord_str_to_parse = App.builder_symbol(root_selection, qual, selected_tensions)
         
         parsed = App.parse_chord_symbol(chord_str_to_parse, key)
         is_degree_mode = self.mode_var.get() == self.i18n[self.lang_code]["degree"]
@@ -1552,82 +1217,170 @@ class App(ctk.CTk):
         self._sync_entry_to_model(target)
 
     def _on_generate_midi(self):
+        if self._midi_export_job is not None:
+            # 내보내는 중에는 이 버튼이 취소 버튼입니다.
+            self._midi_export_job['cancel'].set(); self._log("Cancelling MIDI export..."); return
         try:
             path = filedialog.asksaveasfilename(title="Save MIDI",defaultextension=".mid", filetypes=[("MIDI file", "*.mid")])
             if not path: self._log("Save cancelled."); return
-            mid = MidiFile(ticks_per_beat=480); track = MidiTrack(); mid.tracks.append(track)
-            tpb = mid.ticks_per_beat; track.append(MetaMessage('set_tempo', tempo=bpm2tempo(120)))
-            
+            measures, sections, timings, part_ids = self._snapshot_measures()
             initial_key = self.parts_data[0]['key'] if self.parts_data else "C"
-            try:
-                track.append(MetaMessage("key_signature", key=initial_key))
-            except Exception:
-                self._log(f"Skipping key_signature for '{initial_key}' (unsupported)")
-
-            last_resolved_chord: Optional[str] = None
-            for entry in getattr(self, "measure_entries", []):
-                idx = self.entry_global_idx_map.get(entry)
-                if idx is None: continue
-
-                txt = entry.get().strip()
-                key = self._get_key_for_measure_index(idx)
-                if not txt:
-                    track.append(Message('note_off', note=0, velocity=0, time=4 * tpb))
-                    continue
-
-                chord_tokens = App.split_measure_text(txt)
-                durations = App.duration_ticks_for_n(len(chord_tokens), tpb)
-                for i, token in enumerate(chord_tokens):
-                    resolved = token
-                    if token == "%":
-                        resolved = last_resolved_chord
-                    if not resolved:
-                        track.append(Message('note_off', note=0, velocity=0, time=durations[i]))
-                        continue
+            bpm = (timings[0].bpm if timings else None) or 120
+            options = dict(omit5_on_conflict=self.omit5_var.get(), omit_duplicated_bass=self.omit_bass_var.get(), initial_key=initial_key, bpm=bpm,
+                           pattern=self.pattern)
+            if self.split_tracks_var.get():
+                # 파트마다 이름 붙은 트랙으로 나눠 DAW에서 파트별로 끄고 켤 수 있게 합니다.
+                named = [((self.parts_data[p].get('part') if p < len(self.parts_data) else '') or f"Part {p + 1}", ms)
+                         for p, ms in sorted(sections.items())]
+                workers = min(os.cpu_count() or 1, sum(1 for _, ms in named if len(ms) >= App.PARALLEL_TRACK_MIN_MEASURES))
+
+                def export(log, progress):
+                    # 긴 파트가 여럿이면 트랙을 프로세스 풀에서 동시에 그립니다(결과 파일은 순서대로 그린 것과 같습니다).
+                    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+                    if executor is not None: log(f"Rendering {len(named)} part tracks on {workers} processes")
                     try:
-                        parsed = App.parse_chord_symbol(resolved, key)
-                        notes = App.build_voicing(parsed, omit5_on_conflict=self.omit5_var.get(), omit_duplicated_bass=self.omit_bass_var.get())
-                        chord_duration = durations[i]
-                        for note_val in notes:
-                            track.append(Message('note_on', note=note_val, velocity=80, time=0))
-                        for j, note_val in enumerate(notes):
-                            track.append(Message('note_off', note=note_val, velocity=0, time=chord_duration if j == 0 else 0))
-                        last_resolved_chord = resolved
-                    except Exception as chord_err:
-                        self._log(f"Skipping invalid chord '{resolved}': {chord_err}")
-                        track.append(Message('note_off', note=0, velocity=0, time=durations[i]))
-            mid.save(path); self._log(f"Saved MIDI: {path}"); messagebox.showinfo("MIDI", f"Saved: {path}")
+                        App.export_midi_tracks(path, named, log=log, progress=progress, executor=executor, **options)
+                    finally:
+                        # 취소되면 아직 시작하지 않은 트랙은 버리고 기다리지 않습니다.
+                        if executor is not None: executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                def export(log, progress):
+                    score = self.score_compiler.compile(measures, options['omit5_on_conflict'], options['omit_duplicated_bass'], bpm=bpm,
+                                                        part_ids=part_ids, log=log, progress=progress, pattern=options['pattern'])
+                    score.export(path, initial_key, log)
         except Exception as e:
             self._log(f"FATAL Error generating MIDI: {e}"); messagebox.showerror("Error", f"Failed to generate MIDI:\n{e}")
+            return
+        self._start_midi_export(path, export, max(1, len(measures)))
+
+    def _on_pattern_changed(self, label: str):
+        lang = self.i18n[self.lang_code]
+        self.pattern = next((name for name in App.COMPING_PATTERNS if lang[f"pattern_{name}"] == label), None)
+
+    def _snapshot_measures(self):
+        """Returns (measures, measures by part index, part timings, part index per measure); measures are (text, key, Timing) tuples."""
+        # 작업 스레드가 위젯을 건드리지 않도록 여기서 차트를 (문자열, 조, 박자) 튜플로 떠 둡니다.
+        measures, part_ids = [], []
+        sections: Dict[int, List[Any]] = {}
+        # 파트 머리의 (Tempo:..) (Time:..) 값은 다음 파트로 이어집니다.
+        timings = App.part_timings(self.parts_data)
+        default_timing = App.Timing()
+        for entry in getattr(self, "measure_entries", []):
+            idx = self.entry_global_idx_map.get(entry)
+            if idx is None: continue
+            part_idx = self.entry_part_map.get(entry, 0)
+            timing = timings[part_idx] if part_idx < len(timings) else default_timing
+            measure = (entry.get(), self._get_key_for_measure_index(idx), timing)
+            measures.append(measure); part_ids.append(part_idx)
+            sections.setdefault(part_idx, []).append(measure)
+        return measures, sections, timings, part_ids
+
+    def _on_toggle_playback(self):
+        """Plays the chart from the last focused measure on the default MIDI output; stops if already playing."""
+        if self.player is not None and self.player.is_playing:
+            self.player.stop(); self._update_play_button(); return
+        try:
+            measures, _, timings, part_ids = self._snapshot_measures()
+            if not measures: return
+            bpm = (timings[0].bpm if timings else None) or 120
+            score = self.score_compiler.compile(measures, self.omit5_var.get(), self.omit_bass_var.get(), bpm=bpm, part_ids=part_ids,
+                                                pattern=self.pattern)
+            timeline = timeline_from_score(score)
+            # 포트는 처음 재생할 때 한 번만 엽니다. 열 포트가 없으면 대화상자 대신 로그에 이유를 남깁니다.
+            if self.player is None:
+                unavailable = MidoPortSink.unavailable_reason()
+                if unavailable is not None:
+                    reason, permanent = unavailable
+                    self._log(f"Playback unavailable: {reason}")
+                    # 백엔드가 없으면 다시 눌러도 소용없으므로 버튼을 끕니다.
+                    if permanent: self.play_btn.configure(state="disabled")
+                    return
+                self.player = ChordPlayer(MidoPortSink())
+            self.player.load(timeline)
+            self.player.start(self.entry_global_idx_map.get(self.last_focused_entry, 0))
+        except Exception as e:
+            self._log(f"Playback error: {e}"); messagebox.showerror("Error", f"Failed to play:\n{e}")
+            return
+        self._update_play_button()
+        self.after(100, self._poll_playback)
+
+    def _poll_playback(self):
+        if self.player is not None and self.player.is_playing:
+            self.after(100, self._poll_playback); return
+        self._update_play_button()
+        if self.player is not None: self._log(f"Playback jitter: {self.player.jitter_stats()}", show_log_tab=False)
+
+    def _update_play_button(self):
+        lang = self.i18n[self.lang_code]
+        playing = self.player is not None and self.player.is_playing
+        self.play_btn.configure(text=lang["stop_playback"] if playing else lang["play"])
+
+    def _start_midi_export(self, path: str, export, total: int):
+        """Runs `export(log, progress)` on a worker thread; its results come back through a queue polled with after()."""
+        events: "queue.Queue[tuple]" = queue.Queue()
+        cancel = threading.Event()
+        done = [0]
+
+        def progress(n: int):
+            if cancel.is_set(): raise ExportCancelled()
+            done[0] += n
+            events.put(('progress', done[0]))
+
+        def work():
+            try:
+                export(lambda msg: events.put(('log', msg)), progress)
+                events.put(('done', None))
+            except ExportCancelled:
+                events.put(('cancelled', None))
+            except Exception as e:
+                events.put(('error', e))
+
+        self._midi_export_job = {'path': path, 'cancel': cancel, 'events': events, 'total': total, 'split': self.split_tracks_var.get()}
+        self.gen_btn.configure(text=f"{self.i18n[self.lang_code]['cancel_export']} 0%")
+        threading.Thread(target=work, name="midi-export", daemon=True).start()
+        self.after(50, self._poll_midi_export)
+
+    def _poll_midi_export(self):
+        job = self._midi_export_job
+        if job is None: return
+        finished, result, progress = None, None, None
+        try:
+            while True:
+                kind, value = job['events'].get_nowait()
+                if kind == 'progress': progress = value
+                elif kind == 'log': self._log(value)
+                else: finished, result = kind, value; break
+        except queue.Empty:
+            pass
+        lang = self.i18n[self.lang_code]
+        if not finished:
+            if progress is not None:
+                # 파일을 다 쓰고 닫을 때까지는 99%에서 멈춥니다.
+                self.gen_btn.configure(text=f"{lang['cancel_export']} {min(99, 100 * progress // job['total'])}%")
+            self.after(50, self._poll_midi_export); return
+
+        self._midi_export_job = None
+        self.gen_btn.configure(text=lang["generate_midi"])
+        path = job['path']
+        if finished == 'done':
+            if not job['split']: self._log(f"Score: {self.score_compiler.format_stats()}", show_log_tab=False)
+            self._log(f"Saved MIDI: {path}")
+            self._log(f"Parse cache: {App.PARSE_CACHE.format_stats()}", show_log_tab=False)
+            self._log(f"Render cache: {App.RENDER_CACHE.format_stats()}", show_log_tab=False)
+            messagebox.showinfo("MIDI", f"Saved: {path}")
+        elif finished == 'cancelled':
+            self._log(f"MIDI export cancelled: {path}")
+        else:
+            self._log(f"FATAL Error generating MIDI: {result}"); messagebox.showerror("Error", f"Failed to generate MIDI:\n{result}")
 
     def _serialize_chart(self) -> str:
         """Serializes the current chart data into a string, reading live measure data from UI widgets."""
-        lines: List[str] = []
+        parts = []
         for part_idx, part_data in enumerate(self.parts_data):
-            part_name = part_data.get('part', '').strip()
-            key = part_data.get('key', '').strip()
-
-            header_bits: List[str] = []
-            if part_name:
-                header_bits.append(f"[{part_name}]")
-            if key:
-                header_bits.append(f"(Key:{key})")
-
-            if header_bits:
-                lines.append(" ".join(header_bits).strip())
-
-            # Get all entry widgets belonging to the current part
-            part_entries = [e for e in self.measure_entries if self.entry_part_map.get(e) == part_idx]
-            # Get the text from each entry widget to ensure the latest content is captured
-            measures = [entry.get() for entry in part_entries]
-
-            for i in range(0, len(measures), 4):
-                chunk = measures[i:i+4]
-                measure_line = " | ".join(m.strip() for m in chunk)
-                lines.append(f"| {measure_line} |")
-            
-            lines.append("")
-        return "\n".join(lines).rstrip() + "\n"
+            # Get the text from each entry widget of the part to ensure the latest content is captured
+            measures = [e.get() for e in self.measure_entries if self.entry_part_map.get(e) == part_idx]
+            parts.append({**part_data, 'measures': measures})
+        return App.format_chart_text(parts)
 
     def _apply_parsed_chart(self, parsed_rows: List[Dict[str, Any]]):
         """Applies parsed chart data to the UI."""
@@ -1635,38 +1388,7 @@ class App(ctk.CTk):
             self._initialize_chart()
             return
 
-        new_parts_data: List[Dict[str, Any]] = []
-        current_part_data: Optional[Dict[str, Any]] = None
-
-        def commit_part():
-            if current_part_data:
-                # Clean up trailing empty measures
-                while current_part_data["measures"] and not current_part_data["measures"][-1]:
-                    current_part_data["measures"].pop()
-                # Only add part if it has content
-                if current_part_data["measures"]:
-                    new_parts_data.append(current_part_data)
-
-        last_key = "C"
-        for row in parsed_rows:
-            is_new_part = bool(row.get("part"))
-            if not is_new_part and row.get("key") and current_part_data:
-                 if row.get("key") != current_part_data.get("key"):
-                     is_new_part = True
-
-            if is_new_part or not current_part_data:
-                commit_part()
-                current_part_data = {
-                    "part": row.get("part", ""),
-                    "key": row.get("key", "") or last_key,
-                    "measures": []
-                }
-            
-            if current_part_data:
-                current_part_data["measures"].extend(row.get("measures", []))
-                last_key = current_part_data["key"]
-
-        commit_part()
+        new_parts_data = App.group_chart_rows(parsed_rows)
 
         if not new_parts_data:
             self._initialize_chart()
@@ -1677,49 +1399,7 @@ class App(ctk.CTk):
         self._log(f"Loaded chart with {len(self.parts_data)} parts.", show_log_tab=False)
 
     def _parse_chart_text(self, text: str) -> List[Dict[str, Any]]:
-        rows: List[Dict[str, Any]] = []
-        current_part = ""
-        current_key_effective = ""
-        pending_row_key: Optional[str] = None
-        display_part_next_row = False
-        for raw_line in text.splitlines():
-            line = raw_line.strip()
-            if not line:
-                continue
-            part_key_match = re.match(r"^\[(?P<part>[^\]]*)\]\s*(?P<rest>.*)$", line)
-            if part_key_match:
-                part_text = part_key_match.group("part").strip()
-                rest = part_key_match.group("rest").strip()
-                comment = re.sub(r"\(\s*Key\s*:\s*[^\)]+\)", "", rest).strip()
-                current_part = (f"{part_text} {comment}".strip()) if comment else part_text
-                key_match = re.search(r"\(\s*Key\s*:\s*([^\)]+)\)", rest)
-                if key_match:
-                    current_key_effective = key_match.group(1).strip()
-                    pending_row_key = current_key_effective
-                else:
-                    pending_row_key = None
-                display_part_next_row = True
-                continue
-            key_only_match = re.match(r"^\(\s*Key\s*:\s*([^\)]+)\)\s*$", line)
-            if key_only_match:
-                current_key_effective = key_only_match.group(1).strip()
-                pending_row_key = current_key_effective
-                continue
-            if line.startswith('|'):
-                segments = [seg.strip() for seg in line.strip('|').split('|')]
-                while len(segments) < 4:
-                    segments.append("")
-                rows.append({
-                    "part": current_part if display_part_next_row else "",
-                    "key": (pending_row_key or ""),
-                    "measures": segments[:4],
-                })
-                if pending_row_key is not None:
-                    current_key_effective = pending_row_key
-                pending_row_key = None
-                display_part_next_row = False
-                continue
-        return rows
+        return App.parse_chart_text(text)
 
     def _load_chart_from_file(self):
         path = filedialog.askopenfilename(title="Load Chart", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
@@ -1738,6 +1418,49 @@ class App(ctk.CTk):
         self._apply_parsed_chart(parsed_rows)
         self._log(f"Loaded chart from {path}", show_log_tab=False)
 
+    def _import_midi_from_file(self):
+        if self._midi_import_job is not None: return
+        path = filedialog.askopenfilename(title="Import MIDI", filetypes=[("MIDI Files", "*.mid *.midi"), ("All Files", "*.*")])
+        if not path:
+            return
+        is_degree_mode = self.mode_var.get() == self.i18n[self.lang_code]["degree"]
+        omit5 = self.omit5_var.get()
+        events: "queue.Queue[tuple]" = queue.Queue()
+
+        def work():
+            try:
+                events.put(('done', App.import_midi(path, omit5_on_conflict=omit5, is_roman=is_degree_mode)))
+            except Exception as e:
+                events.put(('error', e))
+
+        # 큰 파일의 코드 인식이 Tk 스레드를 막지 않도록 내보내기처럼 작업 스레드에서 돌립니다.
+        self._midi_import_job = {'path': path, 'events': events}
+        self.import_midi_btn.configure(state="disabled")
+        threading.Thread(target=work, name="midi-import", daemon=True).start()
+        self.after(50, self._poll_midi_import)
+
+    def _poll_midi_import(self):
+        job = self._midi_import_job
+        if job is None: return
+        try:
+            finished, result = job['events'].get_nowait()
+        except queue.Empty:
+            self.after(50, self._poll_midi_import); return
+
+        self._midi_import_job = None
+        self.import_midi_btn.configure(state="normal")
+        path = job['path']
+        if finished == 'error':
+            self._log(f"Failed to import MIDI {path}: {result}")
+            messagebox.showerror("Error", f"Failed to import MIDI:\n{result}")
+            return
+        if not any(part['measures'] for part in result):
+            messagebox.showwarning("Warning", "No notes found in the selected MIDI file.")
+            return
+        self.parts_data = result
+        self._rebuild_parts_ui()
+        self._log(f"Imported {sum(len(p['measures']) for p in result)} measures in {len(result)} parts from {path}", show_log_tab=False)
+
     def _save_chart_to_file(self):
         # _serialize_chart now reads live data directly from the UI widgets,
         # so we don't need to sync the data model here. This ensures the
@@ -1754,7 +1477,12 @@ class App(ctk.CTk):
             return
         self._log(f"Saved chart to {path}", show_log_tab=False)
 
+
 if __name__ == "__main__":
+    # 빌드된 앱에서 트랙 렌더링용 작업 프로세스가 앱(잠금, 업데이트 확인, 창)을 다시 띄우지 않게 합니다.
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     def _escape_for_py(value: str) -> str:
         """Escapes a string for safe inclusion in a Python multiline string."""
         return (value
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Batch converter: MIDI files -> chart .txt files, without the GUI.
+
+The reverse of chart2midi.py, with the same engine as the app's "Import MIDI":
+each measure's notes are matched against the chord recognition index and
+written as a chart that "Load Chart" reads back. Files are converted in
+parallel across a process pool, with one status line per file.
+
+    python midi2chart.py songs/ -o charts/
+    python midi2chart.py song.mid --roman --key Bb    # degrees in Bb instead of the file's key signature
+    python midi2chart.py song.mid --track 1           # only the notes of track 1 (the first is 0)
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from chart2midi import ConvertResult, collect_inputs, output_path_for, run_batch
+from chord_engine import ChordEngine
+
+MIDI_EXTENSIONS = ('.mid', '.midi')
+
+
+def convert_midi(task: Tuple[str, str, Dict[str, Any]]) -> ConvertResult:
+    """Converts one MIDI file; runs inside the worker processes, so it never raises."""
+    source, output, options = task
+    start = time.perf_counter()
+    try:
+        parts = ChordEngine.import_midi(source, omit5_on_conflict=options['omit5_on_conflict'], is_roman=options['roman'],
+                                        key=options['key'], tracks=options['tracks'])
+        measures = sum(len(part['measures']) for part in parts)
+        if not measures:
+            raise ValueError("No notes found")
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(ChordEngine.format_chart_text(parts))
+        return ConvertResult(source, output, True, time.perf_counter() - start, measures)
+    except Exception as e:
+        return ConvertResult(source, None, False, time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recognize the chords of MIDI files and write them as chord chart .txt files.")
+    parser.add_argument('inputs', nargs='+', help="MIDI files, directories or glob patterns")
+    parser.add_argument('-o', '--output-dir', help="directory for the .txt files (default: next to each MIDI file)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="worker processes (default: all cores)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="search directories recursively")
+    parser.add_argument('--key', choices=ChordEngine.KEYS, help="key to spell the chords in (default: the file's key signatures, else estimated)")
+    parser.add_argument('--roman', action='store_true', help="write scale degrees instead of letter names")
+    parser.add_argument('--no-omit5', dest='omit5_on_conflict', action='store_false',
+                        help="recognize voicings exported with the 5th kept against #11/b13")
+    parser.add_argument('--track', dest='tracks', type=int, action='append', help="only read notes from this track index (repeatable)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only print failures and the summary")
+    args = parser.parse_args(argv)
+
+    sources = collect_inputs(args.inputs, args.recursive, MIDI_EXTENSIONS)
+    if not sources:
+        print("No MIDI files found.", file=sys.stderr)
+        return 2
+    if args.output_dir: os.makedirs(args.output_dir, exist_ok=True)
+
+    options = {'omit5_on_conflict': args.omit5_on_conflict, 'roman': args.roman, 'key': args.key, 'tracks': args.tracks}
+    jobs = max(1, min(args.jobs, len(sources)))
+    tasks = [(src, output_path_for(src, args.output_dir, '.txt'), options) for src in sources]
+    outputs: Dict[str, str] = {}
+    for src, out, _ in tasks:
+        if out in outputs:
+            print(f"Both {outputs[out]} and {src} would be written to {out}.", file=sys.stderr)
+            return 2
+        outputs[out] = src
+
+    start = time.perf_counter()
+    failed = 0
+    for result in run_batch(tasks, jobs, convert_midi):
+        if result.ok:
+            if not args.quiet:
+                print(f"OK    {result.seconds * 1000:8.1f} ms  {result.source} -> {result.output} ({result.measures} measures)")
+        else:
+            failed += 1
+            print(f"FAIL  {result.seconds * 1000:8.1f} ms  {result.source}: {result.error}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"{len(tasks) - failed}/{len(tasks)} files converted in {elapsed:.2f} s with {jobs} worker(s); {failed} failed.")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
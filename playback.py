@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Live audition: plays a chart's chords on a MIDI output without exporting a file.
+
+The timeline is read from the same CompiledScore "Save MIDI" writes, so what
+you hear is note for note the exported file. A dedicated thread schedules every
+event against one fixed clock origin (so sleep overshoot never accumulates
+into drift), prepares sink messages a short lookahead window before they are
+due, and finishes each wait with a brief spin for sub-millisecond accuracy.
+Sinks are pluggable: a mido output port for listening, or an in-memory
+recorder for tests. Lateness of every send is kept as jitter statistics.
+"""
+
+import bisect
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from chord_engine import ChordEngine, CompiledScore, ScoreCompiler
+
+
+class PlaybackTimeline(NamedTuple):
+    times: Tuple[float, ...]                     # 각 이벤트의 시각 (차트 시작부터 초)
+    events: Tuple[Tuple[int, int, int], ...]     # (상태 바이트, 음, 세기)
+    measure_times: Tuple[float, ...]             # 각 마디가 시작하는 시각
+    length: float
+
+
+def timeline_from_score(score: CompiledScore) -> PlaybackTimeline:
+    """Converts a compiled score into absolute note times: each chord's note_ons, then its note_offs when it ends.
+
+    Chords played with a comping pattern follow their own pre-sorted event list.
+    """
+    seconds_at = score.seconds_at
+    note_on, note_off, comp_type = ChordEngine.NOTE_ON, ChordEngine.NOTE_OFF, ChordEngine.CompFragment
+    starts, durations, chord_rows = score.start, score.duration, score.chord_rows
+    times: List[float] = []
+    events: List[Tuple[int, int, int]] = []
+    for i, fragment in enumerate(score.fragments):
+        row = chord_rows[i]
+        if type(fragment) is comp_type:
+            tick = starts[row]
+            for delta, status, note, velocity in fragment.events:
+                tick += delta
+                times.append(seconds_at(tick)); events.append((status, note, velocity))
+            continue
+        notes, velocity = fragment.notes, fragment.velocity
+        on, off = seconds_at(starts[row]), seconds_at(starts[row] + durations[row])
+        times.extend(itertools.repeat(on, len(notes))); events.extend((note_on, note, velocity) for note in notes)
+        times.extend(itertools.repeat(off, len(notes))); events.extend((note_off, note, 0) for note in notes)
+    measure_times = tuple(seconds_at(tick) for tick in score.measure_ticks[:-1])
+    return PlaybackTimeline(tuple(times), tuple(events), measure_times, seconds_at(score.length))
+
+
+def build_timeline(measures: Iterable[tuple], omit5_on_conflict: bool, omit_duplicated_bass: bool, bpm: float = 120,
+                   ticks_per_beat: int = 480, log: Optional[Callable[[str], None]] = None, pattern: Optional[str] = None) -> PlaybackTimeline:
+    """Compiles (measure text, key[, Timing]) items (with an optional comping `pattern`) and converts them with timeline_from_score."""
+    return timeline_from_score(ScoreCompiler().compile(measures, omit5_on_conflict, omit_duplicated_bass, ticks_per_beat, bpm, log=log,
+                                                       pattern=pattern))
+
+
+class RecordingSink:
+    """In-memory sink: keeps (perf_counter time, status, note, velocity) for every message sent."""
+
+    def __init__(self):
+        self.messages: List[Tuple[float, int, int, int]] = []
+
+    def prepare(self, status: int, note: int, velocity: int) -> Tuple[int, int, int]:
+        return (status, note, velocity)
+
+    def send(self, message: Tuple[int, int, int]) -> None:
+        self.messages.append((time.perf_counter(),) + message)
+
+    def close(self) -> None:
+        pass
+
+
+class MidoPortSink:
+    """Sends to a mido output port (the default port unless one is named); needs a mido backend such as python-rtmidi."""
+
+    def __init__(self, port_name: Optional[str] = None, channel: int = 0):
+        import mido
+        self._message = mido.Message
+        self.channel = channel
+        self.port = mido.open_output(port_name)
+
+    @staticmethod
+    def unavailable_reason() -> Optional[Tuple[str, bool]]:
+        """Why no port can be opened, as (message, permanent), or None when one can.
+
+        `permanent` means the mido backend itself is missing, which only a reinstall fixes;
+        a missing port may appear later (a synth started or a device plugged in).
+        """
+        try:
+            import mido
+            names = mido.get_output_names()
+        except ImportError as e:
+            return f"No MIDI backend available ({e}); install python-rtmidi to enable playback.", True
+        except Exception as e:
+            return f"MIDI outputs could not be listed: {e}", False
+        if not names: return "No MIDI output port found; start a software synth or connect a MIDI device.", False
+        return None
+
+    def prepare(self, status: int, note: int, velocity: int) -> Any:
+        return self._message('note_on' if status == ChordEngine.NOTE_ON else 'note_off', note=note, velocity=velocity, channel=self.channel)
+
+    def send(self, message: Any) -> None:
+        self.port.send(message)
+
+    def close(self) -> None:
+        self.port.close()
+
+
+class JitterStats:
+    """Running lateness statistics (seconds a send happened after its due time); percentiles use the most recent sends."""
+
+    def __init__(self, window: int = 10000):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def add(self, lateness: float) -> None:
+        self.count += 1
+        diff = lateness - self.mean
+        self.mean += diff / self.count
+        self._m2 += diff * (lateness - self.mean)
+        if lateness > self.max: self.max = lateness
+        self.recent.append(lateness)
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.recent)
+        p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] if ordered else 0.0
+        stdev = math.sqrt(self._m2 / self.count) if self.count else 0.0
+        return {'events': self.count, 'mean_ms': self.mean * 1000, 'stdev_ms': stdev * 1000, 'p99_ms': p99 * 1000, 'max_ms': self.max * 1000}
+
+
+class ChordPlayer:
+    """Plays a PlaybackTimeline on a sink from a dedicated timer thread; start/stop/seek are called from one control thread."""
+
+    SPIN_SECONDS = 0.002  # 이보다 가까운 대기는 sleep 대신 스핀으로 맞춥니다.
+
+    def __init__(self, sink, lookahead: float = 0.05):
+        self.sink = sink
+        self.lookahead = lookahead
+        self.timeline: Optional[PlaybackTimeline] = None
+        self.stats = JitterStats()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.position_measure = 0
+
+    def load(self, timeline: PlaybackTimeline) -> None:
+        self.stop()
+        self.timeline = timeline
+
+    @property
+    def is_playing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, measure: int = 0) -> None:
+        """Starts playing from the beginning of `measure` (clamped to the chart)."""
+        if self.timeline is None: raise ValueError("Nothing loaded to play")
+        self.stop()
+        measure_times = self.timeline.measure_times
+        if not measure_times: return
+        measure = max(0, min(measure, len(measure_times) - 1))
+        start_time = measure_times[measure]
+        # 마디 경계에서 끝나는 note_off 는 이전 마디의 것이므로 건너뜁니다(코드는 마디를 넘지 않음).
+        index = bisect.bisect_left(self.timeline.times, start_time)
+        while index < len(self.timeline.times) and self.timeline.times[index] == start_time and self.timeline.events[index][0] == ChordEngine.NOTE_OFF:
+            index += 1
+        self.position_measure = measure
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(index, start_time, self._stop), name="chord-player", daemon=True)
+        self._thread.start()
+
+    def seek(self, measure: int) -> None:
+        """Jumps to `measure`; keeps playing if playback was running."""
+        if self.is_playing: self.start(measure)
+        else: self.position_measure = measure
+
+    def stop(self, timeout: float = 1.0) -> None:
+        if self._thread is None: return
+        self._stop.set()
+        if self._thread is not threading.current_thread(): self._thread.join(timeout)
+        self._thread = None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until playback ends; True unless the timeout expired."""
+        thread = self._thread
+        if thread is not None: thread.join(timeout)
+        return thread is None or not thread.is_alive()
+
+    def jitter_stats(self) -> Dict[str, float]:
+        return self.stats.summary()
+
+    def _sleep_until(self, target: float, stop: threading.Event) -> bool:
+        """Waits until perf_counter() reaches `target`; False if stopped first."""
+        while True:
+            remaining = target - time.perf_counter()
+            if remaining <= 0: return True
+            if remaining > self.SPIN_SECONDS:
+                if stop.wait(remaining - self.SPIN_SECONDS): return False
+            elif stop.is_set():
+                return False
+
+    def _run(self, index: int, start_time: float, stop: threading.Event) -> None:
+        times, events = self.timeline.times, self.timeline.events
+        measure_times = self.timeline.measure_times
+        sink, stats, lookahead = self.sink, self.stats, self.lookahead
+        note_on = ChordEngine.NOTE_ON
+        n = len(times)
+        # 모든 이벤트를 한 시작점 기준의 절대 시각으로 맞추므로 늦게 깨어난 만큼이 다음 이벤트로 번지지 않습니다.
+        origin = time.perf_counter() - start_time
+        buffer: Deque[Tuple[float, Any, Tuple[int, int, int]]] = deque()
+        sounding = set()
+        try:
+            while not stop.is_set():
+                horizon = time.perf_counter() - origin + lookahead
+                while index < n and times[index] <= horizon:
+                    buffer.append((times[index], sink.prepare(*events[index]), events[index])); index += 1
+                if not buffer:
+                    if index >= n: break
+                    if not self._sleep_until(origin + times[index] - lookahead, stop): break
+                    continue
+                due = buffer[0][0]
+                if not self._sleep_until(origin + due, stop): break
+                while buffer and buffer[0][0] <= due:
+                    event_time, message, (status, note, _) = buffer.popleft()
+                    sink.send(message)
+                    stats.add(time.perf_counter() - origin - event_time)
+                    if status == note_on: sounding.add(note)
+                    else: sounding.discard(note)
+                self.position_measure = max(0, bisect.bisect_right(measure_times, due) - 1)
+        finally:
+            # 멈출 때 울리고 있는 음이 남지 않도록 꺼 줍니다.
+            for note in sorted(sounding): sink.send(sink.prepare(ChordEngine.NOTE_OFF, note, 0))
@@ -0,0 +1,5 @@
+# 저장소 루트의 모듈(chord_engine, playback ...)을 테스트에서 바로 import 할 수 있게 합니다.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""WAV preview: the file is as long as the score plus the last release tail, whatever the chunk size or thread count."""
+
+import io
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import audio_preview  # noqa: E402
+from chord_engine import ChordEngine, ScoreCompiler  # noqa: E402
+
+SAMPLE_RATE = 8000
+MEASURES = [('CM7', 'C'), ('Dm7 G7', 'C'), ('% Am7', 'C', ChordEngine.Timing((3, 4), 150)), ('FM7(#11)', 'C', ChordEngine.Timing((7, 8), 150))]
+
+
+def render(measures, chunk_frames: int, workers: int, pattern=None):
+    score = ScoreCompiler().compile(measures, True, False, bpm=240, pattern=pattern)
+    out = io.BytesIO()
+    frames = audio_preview.write_score_wav(out, score, SAMPLE_RATE, chunk_frames, workers)
+    out.seek(0)
+    with wave.open(out, 'rb') as f:
+        assert (f.getnchannels(), f.getsampwidth(), f.getframerate(), f.getnframes()) == (1, 2, SAMPLE_RATE, frames)
+        return score, frames, f.readframes(frames)
+
+
+def test_frame_count_is_score_length_plus_release():
+    release = int(audio_preview.RELEASE_SECONDS * SAMPLE_RATE)
+    score, frames, _ = render(MEASURES, 4096, 1)
+    # 마지막 코드가 곡 끝까지 울리므로 그 릴리스 꼬리만큼 길어집니다.
+    assert frames == round(score.seconds_at(score.length) * SAMPLE_RATE) + release
+    # 빈 마디로 끝나면 꼬리가 그 안에 들어가므로 곡 길이 그대로입니다.
+    score, frames, _ = render(MEASURES + [('', 'C')], 4096, 1)
+    assert frames == round(score.seconds_at(score.length) * SAMPLE_RATE)
+
+
+@pytest.mark.parametrize('pattern', (None, 'strum'))
+def test_output_does_not_depend_on_chunking(pattern):
+    _, frames, expected = render(MEASURES, 1 << 15, 1, pattern)
+    for chunk_frames, workers in ((1000, 1), (777, 3), (64, 2), (frames + 1, 4)):
+        assert render(MEASURES, chunk_frames, workers, pattern)[2] == expected
+
+
+def test_render_chunks_window():
+    score = ScoreCompiler().compile(MEASURES, True, False, bpm=240)
+    blocks, total = audio_preview.score_blocks(score, SAMPLE_RATE)
+    inline = list(audio_preview.render_chunks(blocks, total, SAMPLE_RATE, 500))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for window in (1, 3):
+            chunks = list(audio_preview.render_chunks(blocks, total, SAMPLE_RATE, 500, pool, window=window))
+            assert [len(c) for c in chunks] == [len(c) for c in inline]
+            assert all((a == b).all() for a, b in zip(chunks, inline))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""LRUCache: least recently used eviction and the hit/miss/eviction counters the app logs."""
+
+import pytest
+
+from chord_engine import ChordEngine, LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=3)
+    for key in 'abc': cache.put(key, key.upper())
+    assert cache.get('a') == 'A'      # a 가 가장 최근에 쓰였으므로 b 가 먼저 나갑니다
+    cache.put('d', 'D')
+    assert cache.get('b') is None and len(cache) == 3
+    cache.put('c', 'C2')              # 덮어쓰기도 최근 사용으로 칩니다
+    cache.put('e', 'E')
+    assert [cache.get(k) for k in 'acde'] == [None, 'C2', 'D', 'E']
+    assert cache.evictions == 2
+
+
+def test_stats_count_hits_misses_and_evictions():
+    cache = LRUCache(maxsize=2)
+    assert cache.get('x', 'default') == 'default'
+    cache.put('x', 0)                 # 저장된 값이 거짓이어도 적중입니다
+    cache.put('y', None)
+    assert cache.get('x') == 0
+    cache.put('z', 1)
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 1}
+    assert cache.format_stats() == "1 hits / 1 misses (50.0% hit rate), 1 evictions, 2/2 entries"
+    cache.clear()
+    assert cache.stats() == {'size': 0, 'maxsize': 2, 'hits': 0, 'misses': 0, 'evictions': 0}
+    assert LRUCache(maxsize=0).maxsize == 1
+
+
+def test_parse_cache_is_hit_on_repeated_symbols(monkeypatch):
+    monkeypatch.setattr(ChordEngine, 'PARSE_CACHE', LRUCache(maxsize=2))
+    first = ChordEngine.parse_chord_symbol('Dm7', 'C')
+    assert ChordEngine.parse_chord_symbol(' Dm7 ', 'C') is first
+    ChordEngine.parse_chord_symbol('G7', 'C')
+    ChordEngine.parse_chord_symbol('Dm7', 'F')
+    assert ChordEngine.PARSE_CACHE.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 3, 'evictions': 1}
+    # 쫓겨난 항목을 다시 파싱해도 같은 (intern 된) 결과입니다.
+    assert ChordEngine.parse_chord_symbol('Dm7', 'C') == first
+    with pytest.raises(ValueError):
+        ChordEngine.parse_chord_symbol('H7', 'C')
+    assert len(ChordEngine.PARSE_CACHE) == 2
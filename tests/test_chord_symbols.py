@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Regression table for parse_chord_symbol / build_string_from_parsed.
+
+Every row was produced by the str.replace/regex rewrite pipeline that the
+single-pass tokenizer replaced, so a later refactor of CHORD_HEAD_RE /
+CHORD_SUFFIX_RE or the reducer can be checked against the original results.
+DOCUMENTED_DIFFERENCES lists the inputs where the tokenizer deliberately parses
+differently.
+"""
+
+import pytest
+
+from benchmarks.bench_engine import generate_corpus
+from chord_engine import ChordEngine
+
+FIELDS = ('root', 'quality', 'seventh', 'tensions', 'paren_contents', 'omissions', 'alterations', 'bass_note')
+
+# (기호, 조, root, quality, seventh, tensions, paren_contents, omissions, alterations, bass_note, 알파벳 표기, 도수 표기)
+REGRESSION_TABLE = [
+    ('C', 'C', 'C', 'Major', None, (), (), (), (), None, 'C', 'I'),
+    ('Cm', 'C', 'C', 'Minor', None, (), (), (), (), None, 'Cm', 'Im'),
+    ('Cmin', 'C', 'C', 'Minor', None, (), (), (), (), None, 'Cm', 'Im'),
+    ('C-', 'C', 'C', 'Minor', None, (), (), (), (), None, 'Cm', 'Im'),
+    ('CM7', 'C', 'C', 'Major', 'M7', (), (), (), (), None, 'CM7', 'IM7'),
+    ('Cmaj7', 'C', 'C', 'Major', 'M7', (), (), (), (), None, 'CM7', 'IM7'),
+    ('CΔ7', 'C', 'C', 'Major', 'm7', (), (), (), (), None, 'C7', 'I7'),
+    ('Cm7', 'C', 'C', 'Minor', 'm7', (), (), (), (), None, 'Cm7', 'Im7'),
+    ('C-7', 'C', 'C', 'Minor', 'm7', (), (), (), (), None, 'Cm7', 'Im7'),
+    ('CmM7', 'C', 'C', 'Minor', 'M7', (), (), (), (), None, 'CmM7', 'ImM7'),
+    ('C7', 'C', 'C', 'Major', 'm7', (), (), (), (), None, 'C7', 'I7'),
+    ('C9', 'C', 'C', 'Major', 'm7', ('9',), (), (), (), None, 'C9', 'I9'),
+    ('C11', 'C', 'C', 'Major', 'm7', ('11',), (), (), (), None, 'C11', 'I11'),
+    ('C13', 'C', 'C', 'Major', 'm7', ('13',), (), (), (), None, 'C13', 'I13'),
+    ('CM9', 'C', 'C', 'Major', 'M7', ('9',), (), (), (), None, 'CM9', 'IM9'),
+    ('CM13', 'C', 'C', 'Major', 'M7', ('13',), (), (), (), None, 'CM13', 'IM13'),
+    ('Cm9', 'C', 'C', 'Minor', 'm7', ('9',), (), (), (), None, 'Cm9', 'Im9'),
+    ('Cm11', 'C', 'C', 'Minor', 'm7', ('11',), (), (), (), None, 'Cm11', 'Im11'),
+    ('Cdim', 'C', 'C', 'dim', None, (), (), (), (), None, 'Cdim', 'Idim'),
+    ('Cdim7', 'C', 'C', 'dim', 'dim7', (), (), (), (), None, 'Cdim7', 'Idim7'),
+    ('C°', 'C', 'C', 'dim', None, (), (), (), (), None, 'Cdim', 'Idim'),
+    ('C°7', 'C', 'C', 'dim', 'dim7', (), (), (), (), None, 'Cdim7', 'Idim7'),
+    ('Cø', 'C', 'C', 'dim', 'm7', (), (), (), (), None, 'Cm7b5', 'Im7b5'),
+    ('Cm7b5', 'C', 'C', 'dim', 'm7', (), (), (), (), None, 'Cm7b5', 'Im7b5'),
+    ('Cm7(b5)', 'C', 'C', 'Minor', 'm7', (), ('b5',), (), (), None, 'Cm7(b5)', 'Im7(b5)'),
+    ('Caug', 'C', 'C', 'aug', None, (), (), (), (), None, 'Caug', 'Iaug'),
+    ('C+', 'C', 'C', 'aug', None, (), (), (), (), None, 'Caug', 'Iaug'),
+    ('C7#5', 'C', 'C', 'Major', 'm7', (), (), (), ('#5',), None, 'C7#5', 'I7#5'),
+    ('C+7', 'C', 'C', 'aug', 'm7', (), (), (), (), None, 'Caug7', 'Iaug7'),
+    ('CM7#5', 'C', 'C', 'Major', 'M7', (), (), (), ('#5',), None, 'CM7#5', 'IM7#5'),
+    ('C7b5', 'C', 'C', 'Major', 'm7', (), (), (), ('b5',), None, 'C7b5', 'I7b5'),
+    ('C7-5', 'C', 'C', 'Major', 'm7', (), (), (), ('b5',), None, 'C7b5', 'I7b5'),
+    ('Csus2', 'C', 'C', 'sus2', None, (), (), (), (), None, 'Csus2', 'Isus2'),
+    ('Csus4', 'C', 'C', 'sus4', None, (), (), (), (), None, 'Csus4', 'Isus4'),
+    ('C7sus4', 'C', 'C', 'sus4', 'm7', (), (), (), (), None, 'C7sus4', 'I7sus4'),
+    ('C9sus4', 'C', 'C', 'sus4', 'm7', ('9',), (), (), (), None, 'C9sus4', 'I9sus4'),
+    ('C6', 'C', 'C', 'Major', None, ('6',), (), (), (), None, 'C6', 'I6'),
+    ('Cm6', 'C', 'C', 'Minor', None, ('6',), (), (), (), None, 'Cm6', 'Im6'),
+    ('C69', 'C', 'C', 'Major', 'm7', ('9', '6'), (), (), (), None, 'C69', 'I69'),
+    ('Cadd9', 'C', 'C', 'Major', 'm7', ('9',), (), (), (), None, 'C9', 'I9'),
+    ('Cm(b6)', 'C', 'C', 'Minor', None, (), ('b6',), (), (), None, 'Cm(b6)', 'Im(b6)'),
+    ('C7(b9)', 'C', 'C', 'Major', 'm7', (), ('b9',), (), (), None, 'C7(b9)', 'I7(b9)'),
+    ('C7b9', 'C', 'C', 'Major', 'm7', ('9',), (), (), (), None, 'C9', 'I9'),
+    ('C7(#9,b13)', 'C', 'C', 'Major', 'm7', (), ('#9', 'b13'), (), (), None, 'C7(#9,b13)', 'I7(#9,b13)'),
+    ('C7(+9)', 'C', 'C', 'Major', 'm7', (), ('#9',), (), (), None, 'C7(#9)', 'I7(#9)'),
+    ('C7(-13)', 'C', 'C', 'Major', 'm7', (), ('b13',), (), (), None, 'C7(b13)', 'I7(b13)'),
+    ('CM7(#11)', 'C', 'C', 'Major', 'M7', (), ('#11',), (), (), None, 'CM7(#11)', 'IM7(#11)'),
+    ('C13(#11)', 'C', 'C', 'Major', 'm7', ('13',), ('#11',), (), (), None, 'C13(#11)', 'I13(#11)'),
+    ('C7(9,#11,13)', 'C', 'C', 'Major', 'm7', (), ('9', '#11', '13'), (), (), None, 'C7(9,#11,13)', 'I7(9,#11,13)'),
+    ('C7omit3', 'C', 'C', 'Major', 'm7', (), (), (3,), (), None, 'C7omit3', 'I7omit3'),
+    ('Cm7omit5', 'C', 'C', 'Minor', 'm7', (), (), (5,), (), None, 'Cm7omit5', 'Im7omit5'),
+    ('C7(omit3)', 'C', 'C', 'Major', 'm7', (), (), (3,), (), None, 'C7omit3', 'I7omit3'),
+    ('C7(omit3,b9)', 'C', 'C', 'Major', 'm7', (), ('b9',), (3,), (), None, 'C7omit3(b9)', 'I7omit3(b9)'),
+    ('C(b9,omit5)', 'C', 'C', 'Major', None, (), ('b9',), (5,), (), None, 'Comit5(b9)', 'Iomit5(b9)'),
+    ('Cblk', 'C', 'C', 'blk', None, (), (), (), (), None, 'Cblk', 'Iblk'),
+    ('blk C7', 'C', 'C', 'blk', 'm7', (), (), (), (), None, 'Cblk7', 'Iblk7'),
+    ('(Am7)', 'C', 'A', 'Minor', 'm7', (), (), (), (), None, 'Am7', 'VIm7'),
+    ('C/E', 'C', 'C', 'Major', None, (), (), (), (), 'E', 'C/E', 'I/E'),
+    ('C7/Bb', 'C', 'C', 'Major', 'm7', (), (), (), (), 'A#', 'C7/Bb', 'I7/Bb'),
+    ('Cm7/Bb', 'C', 'C', 'Minor', 'm7', (), (), (), (), 'A#', 'Cm7/Bb', 'Im7/Bb'),
+    ('C/G#', 'C', 'C', 'Major', None, (), (), (), (), 'G#', 'C/G#', 'I/G#'),
+    ('C/3', 'C', 'C', 'Major', None, (), (), (), (), None, 'C', 'I'),
+    ('C7/b7', 'C', 'C', 'Major', 'm7', (), (), (), (), None, 'C7', 'I7'),
+    ('E♭M7', 'C', 'Eb', 'Major', 'M7', (), (), (), (), None, 'EbM7', '#IIM7'),
+    ('F♯m7', 'C', 'F#', 'Minor', 'm7', (), (), (), (), None, 'F#m7', '#IVm7'),
+    ('Cb', 'C', 'Cb', 'Major', None, (), (), (), (), None, 'Cb', 'VII'),
+    ('B#7', 'C', 'B#', 'Major', 'm7', (), (), (), (), None, 'B#7', 'I7'),
+    ('Bb7', 'F', 'Bb', 'Major', 'm7', (), (), (), (), None, 'Bb7', 'IV7'),
+    ('Ebm7(b5)', 'Eb', 'Eb', 'Minor', 'm7', (), ('b5',), (), (), None, 'Ebm7(b5)', 'Im7(b5)'),
+    ('F#7(b9)', 'F#', 'F#', 'Major', 'm7', (), ('b9',), (), (), None, 'F#7(b9)', 'I7(b9)'),
+    ('I', 'C', 'C', 'Major', None, (), (), (), (), None, 'C', 'I'),
+    ('vi', 'C', 'A', 'Minor', None, (), (), (), (), None, 'Am', 'vim'),
+    ('IIm7', 'C', 'D', 'Minor', 'm7', (), (), (), (), None, 'Dm7', 'IIm7'),
+    ('V7(b9)', 'C', 'G', 'Major', 'm7', (), ('b9',), (), (), None, 'G7(b9)', 'V7(b9)'),
+    ('bIIIM7', 'C', 'D#', 'Major', 'M7', (), (), (), (), None, 'D#M7', 'bIIIM7'),
+    ('#IVm7b5', 'C', 'F#', 'dim', 'm7', (), (), (), (), None, 'F#m7b5', '#IVm7b5'),
+    ('bVII7', 'Eb', 'Db', 'Major', 'm7', (), (), (), (), None, 'Db7', 'bVII7'),
+    ('V7/VII', 'F#', 'C#', 'Major', 'm7', (), (), (), (), None, 'C#7', 'V7'),
+    ('IV/5', 'Eb', 'Ab', 'Major', None, (), (), (), (), None, 'Ab', 'IV'),
+    ('VIm7/b3', 'C', 'A', 'Minor', 'm7', (), (), (), (), None, 'Am7', 'VIm7'),
+]
+
+# 옛 파이프라인은 'C-5'를 근음 찾기 전에 'Cb5'로 바꿔 Cb 3화음으로 읽었습니다. 이제는 b5 가 붙은 C 3화음이고 'C-5'로 적습니다.
+DOCUMENTED_DIFFERENCES = [
+    ('C-5', 'C', 'C', 'Major', None, (), (), (), ('b5',), None, 'C-5', 'Ib5'),
+    ('E-5', 'C', 'E', 'Major', None, (), (), (), ('b5',), None, 'E-5', 'IIIb5'),
+]
+
+
+@pytest.mark.parametrize('row', REGRESSION_TABLE + DOCUMENTED_DIFFERENCES, ids=lambda row: f"{row[0]}@{row[1]}")
+def test_parse_and_render(row):
+    symbol, key, *fields, letter, degree = row
+    parsed = ChordEngine._parse_chord_symbol_uncached(symbol, key)
+    assert tuple(getattr(parsed, f) for f in FIELDS) == tuple(fields)
+    assert ChordEngine._build_string_from_parsed_uncached(parsed, False, key) == letter
+    assert ChordEngine._build_string_from_parsed_uncached(parsed, True, key) == degree
+    # 캐시를 거치는 경로도 같은 결과여야 합니다.
+    assert ChordEngine.parse_chord_symbol(symbol, key) == parsed
+
+
+def test_parenthesized_chord_followed_by_more_text_is_rejected():
+    # 옛 파이프라인은 '(C7)°'의 'd'(dim)를 근음으로 읽어 Dm을 만들었습니다.
+    with pytest.raises(ValueError):
+        ChordEngine.parse_chord_symbol('(C7)°', 'C')
+
+
+# 근음 바로 뒤에 오는 b5/#5 는 근음의 임시표로 다시 읽힐 수 있습니다('Cb5').
+ALTERED_TRIADS = ['C-5', 'C+5', 'Cb5', 'Bb-5', 'F#+5', 'Cm-5', 'Cm#5', 'Csus4b5', 'Csus2#5', 'C-5(b9)', 'C+5/E', 'C6b5',
+                  'I-5', 'I+5', 'bVII-5', 'bVII#5', 'IVsus4b5', 'V+5/VII']
+
+
+@pytest.mark.parametrize('key', ['C', 'Eb', 'F#'])
+@pytest.mark.parametrize('symbol', ALTERED_TRIADS)
+def test_rendered_alterations_keep_the_pitch_set(symbol, key):
+    parsed = ChordEngine._parse_chord_symbol_uncached(symbol, key)
+    for is_roman in (False, True):
+        text = ChordEngine._build_string_from_parsed_uncached(parsed, is_roman, key)
+        reparsed = ChordEngine._parse_chord_symbol_uncached(text, key)
+        assert ChordEngine.chord_pitch_classes(reparsed) == ChordEngine.chord_pitch_classes(parsed), text
+
+
+def canonical_corpus():
+    return [(symbol, key) for symbol, key, *_ in REGRESSION_TABLE + DOCUMENTED_DIFFERENCES] + generate_corpus(3000, seed=5)
+
+
+@pytest.mark.parametrize('is_roman', (False, True), ids=('letter', 'degree'))
+def test_canonicalize_is_idempotent(is_roman):
+    for symbol, key in canonical_corpus():
+        try: once = ChordEngine.canonicalize(symbol, key, is_roman)
+        except ValueError: continue
+        assert ChordEngine.canonicalize(once, key, is_roman) == once, (symbol, key)
+        parsed = ChordEngine._parse_chord_symbol_uncached(symbol.strip(), key)
+        assert once == ChordEngine._build_string_from_parsed_uncached(parsed, is_roman, key)
+
+
+def test_degree_slash_bass_keeps_its_spelling():
+    # C 조의 표기로는 A# 이지만, 적힌 Bb 를 그대로 둡니다.
+    assert ChordEngine.canonicalize('C7/Bb', 'C', True) == 'I7/Bb'
+    assert ChordEngine.canonicalize('I7/Bb', 'C', True) == 'I7/Bb'
+    assert ChordEngine.canonicalize('I7/A#', 'C', True) == 'I7/A#'
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""The batch converters: output files, and the exit status scripts rely on (0 ok, 1 a file failed, 2 nothing to do)."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import chart2midi
+import midi2chart
+from chord_engine import ChordEngine
+
+CHART_TEXT = """\
+[A] (Key:F) (Tempo:100)
+| FM7 | Gm7 C7 | Am7 D7(b9) | Gm7 C7 |
+"""
+
+
+def write_midi(path, text: str = CHART_TEXT):
+    parts = ChordEngine.group_chart_rows(ChordEngine.parse_chart_text(text))
+    path.write_bytes(ChordEngine.encode_smf(ChordEngine.chart_measures(parts), True, False, initial_key='F'))
+
+
+def test_midi2chart_converts_a_directory(tmp_path, capsys):
+    src = tmp_path / 'midi'
+    src.mkdir()
+    write_midi(src / 'a.mid')
+    write_midi(src / 'b.midi')
+    (src / 'notes.txt').write_text('not a MIDI file', encoding='utf-8')
+    out = tmp_path / 'charts'
+    assert midi2chart.main([str(src), '-o', str(out), '-j', '1', '--key', 'F']) == 0
+    assert sorted(p.name for p in out.iterdir()) == ['a.txt', 'b.txt']
+    parts = ChordEngine.group_chart_rows(ChordEngine.parse_chart_text((out / 'a.txt').read_text(encoding='utf-8')))
+    assert parts[0]['measures'] == ['FM7', 'Gm7 C7', 'Am7 D7(b9)', 'Gm7 C7'] and parts[0]['tempo'] == '100'
+    assert '2/2 files converted' in capsys.readouterr().out
+
+    assert midi2chart.main([str(src / 'a.mid'), '-o', str(out), '--roman', '--key', 'F', '-q']) == 0
+    assert '| IM7 | IIm7 V7 | IIIm7 VI7(b9) | IIm7 V7 |' in (out / 'a.txt').read_text(encoding='utf-8')
+
+
+def test_midi2chart_exit_status(tmp_path, capsys):
+    assert midi2chart.main([str(tmp_path / 'missing' / '*.mid')]) == 2
+    assert 'No MIDI files found.' in capsys.readouterr().err
+
+    write_midi(tmp_path / 'good.mid')
+    (tmp_path / 'broken.mid').write_bytes(b'MThd\x00\x00\x00\x06\x00')
+    (tmp_path / 'silent.mid').write_bytes(b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x01\xe0MTrk\x00\x00\x00\x04\x00\xff\x2f\x00')
+    assert midi2chart.main([str(tmp_path), '-j', '1']) == 1
+    err = capsys.readouterr().err
+    assert 'broken.mid: ValueError: Truncated MIDI header' in err and 'silent.mid: ValueError: No notes found' in err
+    assert (tmp_path / 'good.txt').exists() and not (tmp_path / 'broken.txt').exists()
+
+
+def test_chart2midi_writes_what_encode_smf_writes(tmp_path):
+    (tmp_path / 'song.txt').write_text(CHART_TEXT, encoding='utf-8')
+    assert chart2midi.main([str(tmp_path / 'song.txt'), '-q']) == 0
+    parts = ChordEngine.group_chart_rows(ChordEngine.parse_chart_text(CHART_TEXT))
+    expected = ChordEngine.encode_smf(ChordEngine.chart_measures(parts), True, False, initial_key='F', bpm=100)
+    assert (tmp_path / 'song.mid').read_bytes() == expected
+
+
+def test_chart2midi_exit_status(tmp_path, capsys):
+    assert chart2midi.main([str(tmp_path / '*.txt')]) == 2
+    assert 'No chart files found.' in capsys.readouterr().err
+
+    (tmp_path / 'good.txt').write_text(CHART_TEXT, encoding='utf-8')
+    (tmp_path / 'empty.txt').write_text('\n', encoding='utf-8')
+    (tmp_path / 'meter.txt').write_text('[A] (Time:4/3)\n| C |\n', encoding='utf-8')
+    assert chart2midi.main([str(tmp_path), str(tmp_path / 'missing.txt'), '-j', '1']) == 1
+    err = capsys.readouterr().err
+    assert 'empty.txt: ValueError: No chart data found' in err and 'missing.txt: FileNotFoundError' in err
+    assert "meter.txt: ValueError: Invalid time signature: '4/3'" in err
+    assert (tmp_path / 'good.mid').exists() and not (tmp_path / 'empty.mid').exists()
+
+    # 출력 이름이 겹치면 아무것도 쓰지 않고 멈춥니다.
+    other = tmp_path / 'other'
+    other.mkdir()
+    (other / 'good.txt').write_text(CHART_TEXT, encoding='utf-8')
+    assert chart2midi.main([str(tmp_path / 'good.txt'), str(other / 'good.txt'), '-o', str(tmp_path / 'out')]) == 2
+    assert 'would be written to' in capsys.readouterr().err
+
+
+def test_bad_options_exit_with_usage_errors(tmp_path):
+    (tmp_path / 'song.txt').write_text(CHART_TEXT, encoding='utf-8')
+    for argv in (['--ppq', '0'], ['--tracks', 'parts', '--backend', 'mido'], ['--pattern', 'polka']):
+        with pytest.raises(SystemExit) as exc:
+            chart2midi.main([str(tmp_path / 'song.txt')] + argv)
+        assert exc.value.code == 2
+    with pytest.raises(SystemExit) as exc:
+        midi2chart.main([str(tmp_path / 'song.txt'), '--key', 'H'])
+    assert exc.value.code == 2
+
+
+def test_scripts_return_the_status_to_the_shell(tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for script in ('chart2midi.py', 'midi2chart.py'):
+        done = subprocess.run([sys.executable, os.path.join(root, script), str(tmp_path / 'nothing-here')], capture_output=True, text=True)
+        assert done.returncode == 1 and 'FAIL' in done.stderr
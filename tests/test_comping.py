@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Comping patterns: every hit stays inside its bar, and a chord slot shorter than the pattern only plays what fits in it."""
+
+import pytest
+
+import theory_tables
+from chord_engine import ChordEngine
+
+METERS = [(4, 4), (3, 4), (2, 2), (5, 4), (6, 8), (7, 8), (12, 8), (1, 16)]
+
+
+@pytest.mark.parametrize('tpb', (96, 480, 25))
+@pytest.mark.parametrize('meter', METERS, ids=lambda m: f"{m[0]}-{m[1]}")
+@pytest.mark.parametrize('pattern', tuple(ChordEngine.COMPING_PATTERNS))
+def test_pattern_fits_the_meter(pattern, meter, tpb):
+    bar = ChordEngine.measure_ticks(meter, tpb)
+    template = ChordEngine.pattern_template(pattern, meter, tpb)
+    assert template and template[0][0] == 0
+    assert [hit[0] for hit in template] == sorted(hit[0] for hit in template)
+    for tick, length, accent, _ in template:
+        assert 0 <= tick < bar and 1 <= length and tick + length <= bar and 0 < accent <= 1
+
+
+def fragment_notes(pattern, slot_start, slot_ticks, meter=(4, 4), tpb=480, token='CM7'):
+    fragment = ChordEngine.chord_fragment(token, 'C', True, False)
+    comp = ChordEngine.comp_fragment(fragment, pattern, meter, tpb, slot_start, slot_ticks)
+    assert comp.lead + comp.span + comp.trail == slot_ticks
+    # 모든 음이 칸 안에서 시작하고 끝납니다.
+    assert all(comp.lead + on >= 0 and comp.lead + on + length <= slot_ticks for on, length, _, _ in comp.notes)
+    return fragment.notes, [(comp.lead + on, length, pitch) for on, length, pitch, _ in comp.notes]
+
+
+def test_short_slot_keeps_only_its_hits():
+    voicing, notes = fragment_notes('charleston', 0, 960)  # 'CM7 G7'의 앞 칸: 1박의 첫 타와 1.5박 뒤 타가 2박에서 잘림
+    assert notes == [(0, 480, p) for p in voicing] + [(720, 240, p) for p in voicing]
+    _, notes = fragment_notes('quarters', 480, 240)         # 반 박짜리 칸: 2박째 타가 칸 끝에서 잘림
+    assert {(on, length) for on, length, _ in notes} == {(0, 240)}
+
+
+def test_slot_without_a_hit_gets_the_first_hit_at_its_start():
+    voicing, notes = fragment_notes('charleston', 960, 960)  # 3-4박에는 찰스턴 타가 없음
+    assert notes == [(0, 480, p) for p in voicing]
+    _, notes = fragment_notes('quarters', 120, 120)
+    assert {(on, length) for on, length, _ in notes} == {(0, 120)}
+
+
+def test_arpeggio_restarts_on_the_bass_in_each_slot():
+    voicing, notes = fragment_notes('arpeggio_up', 960, 480)
+    assert notes == [(0, 240, voicing[0]), (240, 240, voicing[1])]
+    voicing, notes = fragment_notes('arpeggio_down', 960, 480)
+    assert notes == [(0, 240, voicing[-1]), (240, 240, voicing[-2])]
+
+
+def test_strum_is_cut_at_the_slot_end():
+    tpb = 480
+    gap = round(theory_tables.COMPING_STRUM_BEATS * tpb)
+    voicing, notes = fragment_notes('strum', 0, 2 * gap, tpb=tpb)  # 두 음만 칸 안에서 시작할 수 있음
+    assert notes == [(0, 2 * gap, voicing[0]), (gap, gap, voicing[1])]
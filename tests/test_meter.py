@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Measure lengths and the split of a measure among its chords, in common and odd meters."""
+
+import pytest
+
+from chord_engine import ChordEngine, ScoreCompiler
+
+
+@pytest.mark.parametrize('meter, ticks', [((4, 4), 1920), ((3, 4), 1440), ((5, 4), 2400), ((7, 8), 1680), ((6, 8), 1440),
+                                          ((12, 8), 2880), ((2, 2), 1920), ((5, 16), 600)])
+def test_measure_ticks(meter, ticks):
+    assert ChordEngine.measure_ticks(meter, 480) == ticks
+
+
+@pytest.mark.parametrize('meter, n, durations', [
+    ((7, 8), 1, (1680,)),
+    ((7, 8), 2, (960, 720)),                   # 4/8 + 3/8
+    ((7, 8), 3, (720, 480, 480)),              # 3/8 + 2/8 + 2/8
+    ((7, 8), 7, (240,) * 7),
+    ((7, 8), 8, (210,) * 8),                   # 박보다 코드가 많으면 틱을 고르게 나눔
+    ((5, 4), 2, (1440, 960)),                  # 3박 + 2박
+    ((5, 4), 3, (960, 960, 480)),
+    ((5, 4), 4, (960, 480, 480, 480)),
+    ((5, 4), 6, (400,) * 6),
+    ((4, 4), 3, (960, 480, 480)),
+])
+def test_duration_ticks_for_odd_meters(meter, n, durations):
+    assert ChordEngine.duration_ticks_for_n(n, 480, meter) == durations
+
+
+@pytest.mark.parametrize('tpb', (480, 96, 25, 1))
+def test_splits_always_fill_the_measure(tpb):
+    for meter in [(4, 4), (3, 4), (5, 4), (7, 8), (6, 8), (9, 8), (11, 16), (3, 2), (1, 1)]:
+        for n in range(1, 13):
+            durations = ChordEngine.duration_ticks_for_n(n, tpb, meter)
+            assert len(durations) == n and sum(durations) == ChordEngine.measure_ticks(meter, tpb)
+            # 앞쪽 코드가 같거나 더 깁니다.
+            assert list(durations) == sorted(durations, reverse=True)
+
+
+def test_compiled_chords_start_on_the_split():
+    seven_eight, five_four = ChordEngine.Timing((7, 8)), ChordEngine.Timing((5, 4))
+    measures = [('C G', 'C', seven_eight), ('Am F G', 'C', seven_eight), ('Dm % G', 'C', five_four), ('C', 'C', five_four)]
+    score = ScoreCompiler().compile(measures, True, False)
+    assert list(score.measure_ticks) == [0, 1680, 3360, 5760, 8160]
+    chord_starts = [score.start[row] for row in score.chord_rows[:-1]]
+    # 'Dm % G'는 5/4 를 2 + 2 + 1 박으로 나누고, '%'는 자기 칸에서 Dm 을 다시 칩니다.
+    assert chord_starts == [0, 960, 1680, 2400, 2880, 3360, 4320, 5280, 5760]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""The native SMF encoder must write byte for byte the file the mido reference path saves."""
+
+import io
+
+import pytest
+
+from benchmarks.bench_engine import compare_export_backends, generate_corpus, generate_export_charts
+from chord_engine import ChordEngine, ScoreCompiler
+
+CHART_TEXT = """\
+[Intro] (Key:Eb) (Tempo:84) (Time:3/4)
+| % | EbM7 | Cm7 F7 | % |
+| Bb7sus4 Bb7 |  | Abm6/Eb % | EbM7(#11) |
+[Verse] (Key:F#) (Time:7/8)
+| F#M9 % | D#m7 G#13 | C#7(b9,#13)/F |  |
+| blk F#m7 | % | IIm7 V7 | I6 |
+[Bridge] (Key:C) (Tempo:132.5) (Time:6/8)
+| Am7b5 D7(b9) | Gm(b6) C7alt | Fdim7 % | E+7 |
+"""
+
+
+def reference_bytes(measures, **options) -> bytes:
+    out = io.BytesIO()
+    ChordEngine.render_midi(measures, **options).save(file=out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('pattern', (None,) + tuple(ChordEngine.COMPING_PATTERNS))
+@pytest.mark.parametrize('omit5_on_conflict, omit_duplicated_bass', [(True, False), (False, True)])
+def test_chart_with_parts_matches_mido(pattern, omit5_on_conflict, omit_duplicated_bass):
+    parts = ChordEngine.group_chart_rows(ChordEngine.parse_chart_text(CHART_TEXT))
+    measures = ChordEngine.chart_measures(parts)
+    options = dict(omit5_on_conflict=omit5_on_conflict, omit_duplicated_bass=omit_duplicated_bass, initial_key='Eb', bpm=84,
+                   pattern=pattern)
+    native = ChordEngine.encode_smf(measures, **options)
+    assert native == reference_bytes(measures, **options)
+    compiled = io.BytesIO()
+    ScoreCompiler().compile(measures, omit5_on_conflict, omit_duplicated_bass, 480, 84, pattern=pattern).write_smf(compiled, 'Eb')
+    assert compiled.getvalue() == native
+
+
+def test_generated_corpus_matches_mido():
+    charts = generate_export_charts(generate_corpus(400, seed=7), seed=7)
+    assert compare_export_backends(charts) == []
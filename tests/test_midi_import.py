@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""MIDI import: charts exported with encode_smf come back from import_midi, and broken files raise ValueError."""
+
+import io
+
+import pytest
+
+from chord_engine import ChordEngine
+
+CHART_TEXT = """\
+[Part 1] (Key:Bb) (Tempo:96)
+| BbM7 | Gm7 C7 | Cm7 F7(b9) | BbM7/D |
+
+[Part 2] (Key:Bb) (Time:3/4)
+| EbM7 | Ebm6 | Dm7 | G7(#9) |
+
+[Part 3] (Key:Bb) (Tempo:140) (Time:7/8)
+| Cm9 | F13 | Bb6 | Bdim7 |
+"""
+
+# '%', 빈 마디, 자리바꿈, 여러 조가 섞인 차트: 표기는 달라질 수 있어도(E+7 -> E7(b6)) 울리는 음은 같아야 합니다.
+MIXED_CHART_TEXT = """\
+[Intro] (Key:Eb) (Tempo:84) (Time:3/4)
+| % | EbM7 | Cm7 F7 | % |
+| Bb7sus4 Bb7 |  | Abm6/Eb % | EbM7(#11) |
+[Verse] (Key:F#) (Time:7/8)
+| F#M9 % | D#m7 G#13 | C#7(b9,#13)/F | B6 |
+[Bridge] (Key:C) (Tempo:132.5) (Time:5/4)
+| Am7b5 D7(b9) | Gm(b6) C7alt | Fdim7 % | E+7 |
+"""
+
+
+def export(text: str, **options) -> bytes:
+    parts = ChordEngine.group_chart_rows(ChordEngine.parse_chart_text(text))
+    return ChordEngine.encode_smf(ChordEngine.chart_measures(parts), True, False, initial_key=parts[0]['key'], **options)
+
+
+def sounding(data: bytes):
+    """(tick, pitch-class mask, bass pitch class) at every tick where what sounds changes."""
+    notes = ChordEngine.read_midi_notes(io.BytesIO(data))
+    ticks = sorted(set(notes.starts) | set(notes.ends))
+    changes = []
+    for tick in ticks:
+        pitches = [p for s, e, p in zip(notes.starts, notes.ends, notes.pitches) if s <= tick < e]
+        state = (sum({1 << p % 12 for p in pitches}), min(pitches) % 12) if pitches else None
+        if not changes or changes[-1][1:] != (state,): changes.append((tick, state))
+    return changes
+
+
+def test_round_trip_recovers_the_chart():
+    data = export(CHART_TEXT)
+    parts = ChordEngine.import_midi(io.BytesIO(data), key='Bb')
+    assert ChordEngine.format_chart_text(parts) == CHART_TEXT
+    degrees = ChordEngine.import_midi(io.BytesIO(data), key='Bb', is_roman=True)
+    assert [p['measures'] for p in degrees] == [['IM7', 'VIm7 II7', 'IIm7 V7(b9)', 'IM7/D'], ['IVM7', 'IVm6', 'IIIm7', 'VI7(#9)'],
+                                                ['IIm9', 'V13', 'I6', 'bIIdim7']]
+
+
+@pytest.mark.parametrize('ticks_per_beat', (96, 480, 960))
+def test_round_trip_keeps_the_sounding_chords(ticks_per_beat):
+    data = export(MIXED_CHART_TEXT, ticks_per_beat=ticks_per_beat)
+    parts = ChordEngine.import_midi(io.BytesIO(data))
+    assert [(p.get('meter'), p.get('tempo')) for p in parts] == [('3/4', '84'), ('7/8', None), ('5/4', '132.5')]
+    reexported = ChordEngine.encode_smf(ChordEngine.chart_measures(parts), True, False, ticks_per_beat=ticks_per_beat,
+                                        initial_key=parts[0]['key'])
+    assert sounding(reexported) == sounding(data)
+
+
+def test_tracks_option_and_unnamed_parts():
+    data = export(CHART_TEXT)
+    assert ChordEngine.import_midi(io.BytesIO(data), tracks=[5]) == []
+    assert [p['part'] for p in ChordEngine.import_midi(io.BytesIO(data), tracks=[0])] == ['Part 1', 'Part 2', 'Part 3']
+
+
+def test_recognize_chord():
+    c, eb, e, g, b = 0, 3, 4, 7, 11
+    index = ChordEngine.chord_index(True)
+    assert len(index) == 1 << 12
+    cost, match = ChordEngine.recognize_chord(1 << c | 1 << e | 1 << g | 1 << b, c)
+    assert (cost, match.root_above_bass) == (len("M7"), 0)
+    assert ChordEngine.chord_symbol_for(match, c, 'C') == 'CM7'
+    # 3음이 베이스면 자리바꿈으로 적고, 기본 자리보다 비쌉니다.
+    slash_cost, match = ChordEngine.recognize_chord(1 << c | 1 << e | 1 << g, e)
+    assert ChordEngine.chord_symbol_for(match, e, 'C') == 'C/E' and slash_cost > ChordEngine.recognize_chord(1 << c | 1 << e | 1 << g, c)[0]
+    assert ChordEngine.chord_symbol_for(match, e, 'C', is_roman=True) == 'I/E'
+    # 색인에 없는 C-Eb 는 5음을 더한 Cm 으로 찾고 그 값을 더합니다.
+    cost, match = ChordEngine.recognize_chord(1 << c | 1 << eb, c)
+    assert ChordEngine.chord_symbol_for(match, c, 'C') == 'Cm'
+    assert cost == match.cost + ChordEngine.RECOGNITION_MISSING_COST
+    assert ChordEngine.recognize_chord(0xFFF, c) is None
+
+
+VALID = export(CHART_TEXT)
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'RIFF\x00\x00\x00\x06\x00\x00\x00\x01\x01\xe0',
+    VALID[:12],                                            # 헤더가 잘림
+    VALID[:8] + VALID[8:12] + b'\xe7\x28',                 # SMPTE 시간 단위
+    VALID[:len(VALID) // 2],                               # 트랙이 잘림
+    VALID[:14] + b'MTrk\x00\x00\x00\x04\x00\x40\x40\x00',  # 상태 바이트 없는 데이터
+    VALID[:14] + b'MTrk\x00\x00\x00\x02\x00\xf4',          # 정의되지 않은 상태 바이트
+], ids=['empty', 'not-midi', 'truncated-header', 'smpte', 'truncated-track', 'no-status', 'bad-status'])
+def test_broken_files_raise_value_error(data):
+    with pytest.raises(ValueError):
+        ChordEngine.import_midi(io.BytesIO(data))
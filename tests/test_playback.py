@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""ChordPlayer against the in-memory RecordingSink: message order, seeking and the note_offs sent on stop."""
+
+import time
+
+from chord_engine import ChordEngine, ScoreCompiler
+from playback import ChordPlayer, RecordingSink, timeline_from_score
+
+MEASURES = [('CM7', 'C'), ('Dm7 G7', 'C'), ('% Am7', 'C'), ('FM7(#11)', 'C')]
+
+
+def make_timeline(bpm: float, pattern=None):
+    return timeline_from_score(ScoreCompiler().compile(MEASURES, True, False, bpm=bpm, pattern=pattern))
+
+
+def play(timeline, measure: int = 0) -> RecordingSink:
+    sink = RecordingSink()
+    player = ChordPlayer(sink)
+    player.load(timeline)
+    player.start(measure)
+    assert player.wait(10)
+    # 스케줄러는 어떤 메시지도 예정 시각보다 먼저 보내지 않습니다.
+    assert player.stats.count == len(sink.messages) and min(player.stats.recent) >= 0
+    return sink
+
+
+def test_messages_follow_the_timeline():
+    for pattern in (None, 'bossa'):
+        timeline = make_timeline(bpm=3000, pattern=pattern)
+        sink = play(timeline)
+        assert [m[1:] for m in sink.messages] == list(timeline.events)
+        sent_at = [m[0] for m in sink.messages]
+        assert sent_at == sorted(sent_at)
+
+
+def test_start_at_measure_skips_the_previous_measures_note_offs():
+    timeline = make_timeline(bpm=3000)
+    bar = timeline.measure_times[2]
+    sink = play(timeline, measure=2)
+    # 마디 경계에서 끝나는 앞 마디의 note_off 는 보내지 않고, 그 마디의 note_on 부터 시작합니다.
+    expected = [e for t, e in zip(timeline.times, timeline.events) if t > bar or (t == bar and e[0] == ChordEngine.NOTE_ON)]
+    assert [m[1:] for m in sink.messages] == expected
+    assert sink.messages[0][1] == ChordEngine.NOTE_ON
+
+
+def test_stop_turns_off_every_sounding_note():
+    timeline = make_timeline(bpm=30)  # 첫 코드가 8초 동안 울립니다
+    sink = RecordingSink()
+    player = ChordPlayer(sink)
+    player.load(timeline)
+    player.start(0)
+    deadline = time.perf_counter() + 5
+    while not sink.messages and time.perf_counter() < deadline: time.sleep(0.01)
+    time.sleep(0.05)
+    player.stop()
+    assert not player.is_playing
+    on = [note for _, status, note, _ in sink.messages if status == ChordEngine.NOTE_ON]
+    off = [note for _, status, note, _ in sink.messages if status == ChordEngine.NOTE_OFF]
+    first_chord = [note for status, note, _ in timeline.events[:len(on)]]
+    assert on == first_chord and sorted(off) == sorted(on)
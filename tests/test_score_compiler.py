@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""ScoreCompiler re-voices only the measures whose inputs changed, and still writes the file encode_smf does."""
+
+import io
+
+from chord_engine import ChordEngine, ScoreCompiler
+
+CHART = [('CM7', 'C'), ('Dm7 G7', 'C'), ('% Am7', 'C'), ('', 'C'), ('FM7(#11)', 'C', ChordEngine.Timing((3, 4), 90)),
+         ('Bb7 %', 'C', ChordEngine.Timing((3, 4), 90)), ('EbM7', 'Eb'), ('%', 'Eb')]
+
+
+def compile_bytes(compiler: ScoreCompiler, measures, pattern=None) -> bytes:
+    out = io.BytesIO()
+    compiler.compile(measures, True, False, pattern=pattern).write_smf(out, 'C')
+    return out.getvalue()
+
+
+def full_bytes(measures, pattern=None) -> bytes:
+    return ChordEngine.encode_smf(measures, True, False, initial_key='C', pattern=pattern)
+
+
+def test_unchanged_chart_is_fully_reused():
+    compiler = ScoreCompiler()
+    assert compile_bytes(compiler, CHART) == full_bytes(CHART)
+    assert (compiler.compiled, compiler.reused) == (len(CHART), 0)
+    assert compile_bytes(compiler, CHART) == full_bytes(CHART)
+    assert (compiler.compiled, compiler.reused) == (0, len(CHART))
+
+
+def test_editing_one_measure_recompiles_only_that_measure():
+    compiler = ScoreCompiler()
+    compile_bytes(compiler, CHART)
+    edited = list(CHART)
+    edited[6] = ('EbM7 Ab7', 'Eb')   # 마디 7의 마지막 코드가 바뀌므로 그 코드를 반복하는 마디 8('%')도 다시 만듭니다
+    assert compile_bytes(compiler, edited) == full_bytes(edited)
+    assert (compiler.compiled, compiler.reused) == (2, len(CHART) - 2)
+
+    edited[0] = ('CM7', 'G')         # 조만 바뀐 마디
+    assert compile_bytes(compiler, edited) == full_bytes(edited)
+    assert (compiler.compiled, compiler.reused) == (1, len(CHART) - 1)
+
+
+def test_a_leading_percent_follows_the_chord_it_repeats():
+    compiler = ScoreCompiler()
+    compile_bytes(compiler, CHART)
+    edited = list(CHART)
+    edited[1] = ('Dm7 G7(b9)', 'C')  # 마디 3의 '%'가 반복하는 코드
+    assert compile_bytes(compiler, edited) == full_bytes(edited)
+    assert (compiler.compiled, compiler.reused) == (2, len(CHART) - 2)
+
+
+def test_length_and_option_changes():
+    compiler = ScoreCompiler()
+    compile_bytes(compiler, CHART)
+    shorter = CHART[:5]
+    assert compile_bytes(compiler, shorter) == full_bytes(shorter)
+    assert (compiler.compiled, compiler.reused) == (0, 5)
+    assert compile_bytes(compiler, CHART) == full_bytes(CHART)
+    assert (compiler.compiled, compiler.reused) == (3, 5)
+    # 반주 패턴은 모든 마디의 입력입니다.
+    assert compile_bytes(compiler, CHART, 'bossa') == full_bytes(CHART, 'bossa')
+    assert (compiler.compiled, compiler.reused) == (len(CHART), 0)
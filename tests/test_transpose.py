@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""transpose_part, used when a part's key changes in degree mode: degrees stay, letter names and slash basses move with the key."""
+
+from chord_engine import ChordEngine
+
+
+def test_degrees_stay_and_letters_move():
+    part = {'part': 'B', 'key': 'Eb', 'tempo': '90', 'measures': ['IM7 VIm7', 'IIm7 V7(b9)', 'Fm7 Bb7', 'EbM7/G']}
+    moved = ChordEngine.transpose_part(part, 'G', is_roman=True)
+    assert moved == {'part': 'B', 'key': 'G', 'tempo': '90', 'measures': ['IM7 VIm7', 'IIm7 V7(b9)', 'IIm7 V7', 'IM7/B']}
+    assert part['key'] == 'Eb' and part['measures'][2] == 'Fm7 Bb7'
+    letters = ChordEngine.transpose_part(part, 'G', is_roman=False)
+    assert letters['measures'] == ['GM7 Em7', 'Am7 D7(b9)', 'Am7 D7', 'GM7/B']
+
+
+def test_part_in_another_key_is_moved_by_its_own_interval():
+    # 다른 파트가 C 라도, Eb 파트는 Eb -> F# 로 옮겨지고 새 조의 표기(샵)를 씁니다.
+    part = {'part': 'Bridge', 'key': 'Eb', 'measures': ['Ab7 Db7', 'Cm7/Bb']}
+    assert ChordEngine.transpose_part(part, 'F#', is_roman=False)['measures'] == ['B7 E7', 'D#m7/C#']
+    assert ChordEngine.transpose_part(part, 'Db', is_roman=False)['measures'] == ['Gb7 B7', 'Bbm7/Ab']
+    assert ChordEngine.transpose_part(part, 'Eb', is_roman=False) is part
+
+
+def test_roman_slash_basses():
+    part = {'key': 'C', 'measures': ['V7/B', 'I/E IV/A', 'V7/VII']}
+    # 음이름 베이스는 조와 함께 옮겨지고, 도수로 적은 베이스는 파싱에서 버려지므로 코드만 남습니다.
+    assert ChordEngine.transpose_part(part, 'Bb', is_roman=True)['measures'] == ['V7/A', 'I/D IV/G', 'V7']
+    assert ChordEngine.transpose_part(part, 'Bb', is_roman=False)['measures'] == ['F7/A', 'Bb/D Eb/G', 'F7']
+
+
+def test_percent_empty_and_unparseable_measures_are_kept():
+    part = {'key': 'A', 'measures': ['%', '', 'A7 %', '?? E7', 'IIm7 %']}
+    assert ChordEngine.transpose_part(part, 'D', is_roman=True)['measures'] == ['%', '', 'I7 %', '?? V7', 'IIm7 %']
+    assert ChordEngine.transpose_part({'measures': ['C Am']}, 'A', is_roman=False) == {'key': 'A', 'measures': ['A F#m']}
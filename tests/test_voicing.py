@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""The NumPy batch voicer must give build_voicing's notes for every chord, row for row."""
+
+import pytest
+
+from benchmarks.bench_engine import generate_corpus
+from chord_engine import ChordEngine
+
+pytest.importorskip('numpy')
+
+# 표의 빈 칸을 건드리는 경우들: 5음과 부딪히는 텐션, 근음/3음/텐션 위의 베이스, blk, 생략, 변화음.
+EDGE_CASES = [('C7(#11)', 'C'), ('Cm7(b13)', 'C'), ('CM7(#11)/E', 'C'), ('C/C', 'C'), ('C7/Bb', 'C'), ('C9/D', 'C'),
+              ('blk C', 'C'), ('blk Dm7', 'F'), ('blk G7/B', 'C'), ('C7omit3', 'C'), ('C9omit5/E', 'C'), ('C-5', 'C'),
+              ('C+7(b9)', 'C'), ('Cdim7/A', 'C'), ('Am7b5(11)', 'G'), ('Fsus4(9)/G', 'Bb'), ('IIm7/b3', 'Eb'), ('V7(b9,#11)/VII', 'F#')]
+
+
+def parsed_corpus():
+    chords = []
+    for symbol, key in generate_corpus(1500, seed=11) + EDGE_CASES:
+        try: chords.append(ChordEngine.parse_chord_symbol(symbol, key))
+        except ValueError: pass
+    return chords
+
+
+CHORDS = parsed_corpus()
+
+
+@pytest.mark.parametrize('omit5_on_conflict, omit_duplicated_bass', [(True, False), (True, True), (False, False), (False, True)])
+def test_batch_matches_build_voicing(omit5_on_conflict, omit_duplicated_bass):
+    assert any(p.bass_note for p in CHORDS) and any(p.tensions or p.paren_contents for p in CHORDS)
+    notes, counts = ChordEngine.build_voicings(CHORDS, omit5_on_conflict, omit_duplicated_bass)
+    assert notes.shape[0] == counts.shape[0] == len(CHORDS)
+    for row, (p, count) in enumerate(zip(CHORDS, counts)):
+        expected = ChordEngine.build_voicing(p, omit5_on_conflict, omit_duplicated_bass)
+        assert notes[row, :count].tolist() == expected, ChordEngine.build_string_from_parsed(p, False, 'C')
+        assert (notes[row, count:] == ChordEngine.VOICING_PAD).all()
+
+
+def test_empty_batch():
+    notes, counts = ChordEngine.build_voicings([], True, False)
+    assert notes.shape[0] == counts.shape[0] == 0
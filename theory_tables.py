@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Immutable music-theory lookup tables shared by the chord engine.
+
+Everything here is computed once at import: note names <-> pitch classes,
+roman degrees <-> semitones, key spellings, tension intervals and the
+(key, pc) -> roman / (key, roman) -> root cross indexes. Mappings are
+read-only views so the hot paths can index them without copying.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+NOTE_NAMES_SHARP: Tuple[str, ...] = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+NOTE_NAMES_FLAT: Tuple[str, ...] = ('C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B')
+
+NOTE_TO_PC: Mapping[str, int] = MappingProxyType({
+    'C': 0, 'B#': 0, 'C#': 1, 'Db': 1, 'D': 2, 'D#': 3, 'Eb': 3, 'E': 4, 'Fb': 4, 'F': 5, 'E#': 5,
+    'F#': 6, 'Gb': 6, 'G': 7, 'G#': 8, 'Ab': 8, 'A': 9, 'A#': 10, 'Bb': 10, 'B': 11, 'Cb': 11,
+})
+
+KEYS: Tuple[str, ...] = ('C', 'C#', 'Db', 'D', 'Eb', 'E', 'F', 'F#', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B', 'Cb')
+KEY_PREFERS_SHARPS: Mapping[str, bool] = MappingProxyType({
+    'C': True, 'G': True, 'D': True, 'A': True, 'E': True, 'B': True, 'F#': True, 'C#': True,
+    'F': False, 'Bb': False, 'Eb': False, 'Ab': False, 'Db': False, 'Gb': False, 'Cb': False,
+})
+# 조 이름을 피치클래스로 고를 때 쓰는 표기 (샵 선호 / 플랫 선호)
+KEY_BY_PC: Mapping[bool, Tuple[str, ...]] = MappingProxyType({
+    True: ('C', 'C#', 'D', 'Eb', 'E', 'F', 'F#', 'G', 'Ab', 'A', 'Bb', 'B'),
+    False: ('C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B'),
+})
+
+MAJOR_DEGREE_TO_SEMITONES: Mapping[str, int] = MappingProxyType({'I': 0, 'II': 2, 'III': 4, 'IV': 5, 'V': 7, 'VI': 9, 'VII': 11})
+SEMITONES_TO_MAJOR_DEGREE: Mapping[int, str] = MappingProxyType({sem: deg for deg, sem in MAJOR_DEGREE_TO_SEMITONES.items()})
+ROMAN_DEGREES_BUILDER: Tuple[str, ...] = ('I', 'bII', 'II', 'bIII', 'III', 'IV', '#IV', 'V', 'bVI', 'VI', 'bVII', 'VII')
+
+# 조 이름 -> MIDI key_signature (샵 개수(플랫은 음수), 단조 여부)
+KEY_SIGNATURES: Mapping[str, Tuple[int, int]] = MappingProxyType({
+    'Cb': (-7, 0), 'Gb': (-6, 0), 'Db': (-5, 0), 'Ab': (-4, 0), 'Eb': (-3, 0), 'Bb': (-2, 0), 'F': (-1, 0), 'C': (0, 0),
+    'G': (1, 0), 'D': (2, 0), 'A': (3, 0), 'E': (4, 0), 'B': (5, 0), 'F#': (6, 0), 'C#': (7, 0),
+    'Abm': (-7, 1), 'Ebm': (-6, 1), 'Bbm': (-5, 1), 'Fm': (-4, 1), 'Cm': (-3, 1), 'Gm': (-2, 1), 'Dm': (-1, 1), 'Am': (0, 1),
+    'Em': (1, 1), 'Bm': (2, 1), 'F#m': (3, 1), 'C#m': (4, 1), 'G#m': (5, 1), 'D#m': (6, 1), 'A#m': (7, 1),
+})
+
+TENSIONS_LIST: Tuple[str, ...] = ('b9', '9', '#9', '11', '#11', 'b6', 'b13', '13')
+TENSION_INTERVALS: Mapping[str, int] = MappingProxyType({'6': 9, 'b6': 8, '9': 14, 'b9': 13, '#9': 15, '11': 17, '#11': 18, '13': 21, 'b13': 20})
+
+
+def _roman_for_interval(diff: int, use_sharps: bool) -> str:
+    # 장음계에 없는 음은 샵 선호 조에서는 #도수, 플랫 선호 조에서는 b도수로 적습니다.
+    if diff in SEMITONES_TO_MAJOR_DEGREE: return SEMITONES_TO_MAJOR_DEGREE[diff]
+    raised_pc, flatted_pc = (diff - 1) % 12, (diff + 1) % 12
+    if use_sharps and raised_pc in SEMITONES_TO_MAJOR_DEGREE: return '#' + SEMITONES_TO_MAJOR_DEGREE[raised_pc]
+    return 'b' + SEMITONES_TO_MAJOR_DEGREE.get(flatted_pc, 'I')
+
+
+# (샵 선호 여부) -> 조 근음으로부터의 반음 수별 도수 표기
+DEGREE_BY_INTERVAL: Mapping[bool, Tuple[str, ...]] = MappingProxyType(
+    {use_sharps: tuple(_roman_for_interval(diff, use_sharps) for diff in range(12)) for use_sharps in (True, False)})
+
+# 표준 표기의 도수('V', 'bVII', '#iv' 등) -> 조 근음으로부터의 반음 수
+_ACCIDENTAL_SHIFT = {'': 0, 'b': -1, '#': 1}
+ROMAN_TO_SEMITONES: Mapping[str, int] = MappingProxyType({
+    acc + (deg if upper else deg.lower()): (semis + shift) % 12
+    for deg, semis in MAJOR_DEGREE_TO_SEMITONES.items() for acc, shift in _ACCIDENTAL_SHIFT.items() for upper in (True, False)})
+
+
+def _build_key_tables() -> Tuple[Dict[str, int], Dict[str, Tuple[str, ...]], Dict[Tuple[str, str], int],
+                                 Dict[Tuple[str, int], str], Dict[Tuple[str, str], str]]:
+    key_pcs = {k: NOTE_TO_PC[k] for k in KEYS}
+    spellings = {k: NOTE_NAMES_SHARP if KEY_PREFERS_SHARPS[k] else NOTE_NAMES_FLAT for k in KEYS}
+    intervals = {(old, new): (key_pcs[new] - key_pcs[old]) % 12 for old in KEYS for new in KEYS}
+    pc_to_roman = {(k, pc): DEGREE_BY_INTERVAL[KEY_PREFERS_SHARPS[k]][(pc - key_pcs[k]) % 12] for k in KEYS for pc in range(12)}
+    roman_to_root = {(k, roman): spellings[k][(key_pcs[k] + semis) % 12] for k in KEYS for roman, semis in ROMAN_TO_SEMITONES.items()}
+    return key_pcs, spellings, intervals, pc_to_roman, roman_to_root
+
+
+_key_pcs, _key_spellings, _key_intervals, _key_pc_to_roman, _key_roman_to_root = _build_key_tables()
+KEY_PCS: Mapping[str, int] = MappingProxyType(_key_pcs)
+KEY_SPELLINGS: Mapping[str, Tuple[str, ...]] = MappingProxyType(_key_spellings)
+KEY_INTERVALS: Mapping[Tuple[str, str], int] = MappingProxyType(_key_intervals)
+KEY_PC_TO_ROMAN: Mapping[Tuple[str, int], str] = MappingProxyType(_key_pc_to_roman)
+KEY_ROMAN_TO_ROOT: Mapping[Tuple[str, str], str] = MappingProxyType(_key_roman_to_root)
+del _key_pcs, _key_spellings, _key_intervals, _key_pc_to_roman, _key_roman_to_root
+
+# 반주 패턴: 이름 -> (한 마디(셀) 길이(4분음표 박), ((시작 박, 길이 박, 세기 배율, 음 선택), ...)).
+# 셀은 마디 길이만큼 되풀이되고 넘치는 부분은 잘립니다. 음 선택: 'all', 'bass', 'upper',
+# 정수 i는 보이싱 아래에서 i번째 음(음수는 위에서부터, 보이싱 음 수로 나머지), 'strum' / 'strum_down'은 모든 음을 조금씩 어긋나게 칩니다.
+COMPING_PATTERNS: Mapping[str, Tuple[float, Tuple[Tuple[float, float, float, Any], ...]]] = MappingProxyType({
+    'quarters': (1, ((0, 0.9, 1.0, 'all'),)),
+    'bossa': (4, ((0, 1.5, 1.0, 'bass'), (1.5, 0.5, 0.8, 'bass'), (2, 1.5, 1.0, 'bass'), (3.5, 0.5, 0.8, 'bass'),
+                  (0, 0.5, 0.85, 'upper'), (1.5, 1.0, 0.9, 'upper'), (3, 0.5, 0.85, 'upper'))),
+    'arpeggio_up': (4, tuple((i / 2, 0.5, 1.0 if i % 2 == 0 else 0.85, i) for i in range(8))),
+    'arpeggio_down': (4, tuple((i / 2, 0.5, 1.0 if i % 2 == 0 else 0.85, -1 - i) for i in range(8))),
+    'strum': (2, ((0, 1.0, 1.0, 'strum'), (1, 1.0, 0.8, 'strum_down'))),
+    'charleston': (4, ((0, 1.0, 1.0, 'all'), (1.5, 0.75, 0.9, 'all'))),
+})
+COMPING_STRUM_BEATS = 1 / 32  # 스트럼에서 음 사이 간격(4분음표 박)
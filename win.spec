@@ -13,7 +13,7 @@ a = Analysis(
         ('pro_theme.json', '.'),
         ('root.json', '.')
     ],
-    hiddenimports=[],
+    hiddenimports=['mido.backends.rtmidi', 'rtmidi'],  # mido가 백엔드를 동적으로 불러오므로 직접 넣어 줍니다
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],